@@ -5,9 +5,330 @@ This module implements the core coherence measurement function that quantifies
 a system's ability to maintain structural integrity under recursive strain.
 """
 
+import math
+import os
+import sys
 import numpy as np
-import torch
-from typing import Dict, List, Tuple, Optional, Union
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple, Optional, Union
+
+
+class CoherenceHistory:
+    """
+    Bounded, columnar ring buffer for coherence and component histories.
+
+    Each column is stored twice back-to-back in a [columns, 2 * allocated] array so
+    that the retained window is always contiguous: appends are amortized O(1) and
+    readers get zero-copy views in chronological order. The allocation starts
+    small and doubles as records arrive, up to `capacity`.
+    """
+
+    COLUMNS = ('coherence', 'signal_alignment', 'feedback_responsiveness',
+               'bounded_integrity', 'elastic_tolerance')
+    OVERFLOW_POLICIES = ('overwrite', 'error', 'spill')
+    INITIAL_ALLOCATION = 1024
+
+    def __init__(self,
+                 capacity: int = 65536,
+                 dtype: Union[str, np.dtype] = np.float64,
+                 overflow: str = 'overwrite',
+                 spill_path: Optional[str] = None,
+                 spill_block: Optional[int] = None):
+        """
+        Initialize the history buffer.
+
+        Memory is allocated on demand, so an unused history stays small. Once
+        `capacity` records are held, the default 'overwrite' policy silently
+        drops the oldest records to make room for new ones; use 'error' or
+        'spill' to keep every record.
+
+        Args:
+            capacity: Maximum number of records held in memory
+            dtype: Storage dtype (float64 or float32)
+            overflow: What to do when full - 'overwrite' drops the oldest records,
+                'error' raises OverflowError, 'spill' appends the oldest records to
+                `spill_path` before dropping them
+            spill_path: Raw binary file receiving spilled records
+            spill_block: Number of records spilled at once (default capacity // 4)
+        """
+        if capacity < 1:
+            raise ValueError("History capacity must be at least 1")
+        if overflow not in self.OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        if overflow == 'spill' and spill_path is None:
+            raise ValueError("Overflow policy 'spill' requires a spill_path")
+
+        self.capacity = int(capacity)
+        self.dtype = np.dtype(dtype)
+        self.overflow = overflow
+        self.spill_path = spill_path
+        self.spill_block = max(1, spill_block or self.capacity // 4)
+        self.spilled = 0  # Number of records spilled by this buffer
+        self._spill_offset = (os.path.getsize(spill_path)
+                              if spill_path is not None and os.path.exists(spill_path) else 0)
+
+        self._allocated = min(self.capacity, self.INITIAL_ALLOCATION)
+        self._buffer = np.zeros((len(self.COLUMNS), 2 * self._allocated), dtype=self.dtype)
+        self._start = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, *values: float) -> None:
+        """
+        Append one record (one value per column, in COLUMNS order).
+
+        Args:
+            values: Coherence followed by the four component values
+        """
+        if self._size == self.capacity:
+            self._evict(1)
+        elif self._size == self._allocated:
+            self._grow(self._size + 1)
+
+        pos = (self._start + self._size) % self._allocated
+        self._buffer[:, pos] = values
+        self._buffer[:, pos + self._allocated] = values
+        self._size += 1
+
+    def extend(self, values: np.ndarray) -> None:
+        """
+        Append many records at once.
+
+        Args:
+            values: Array of shape [columns, n] in COLUMNS order
+        """
+        values = np.asarray(values, dtype=self.dtype)
+        if values.ndim != 2 or values.shape[0] != len(self.COLUMNS):
+            raise ValueError(f"Expected values of shape [{len(self.COLUMNS)}, n]")
+
+        n = values.shape[1]
+        if n == 0:
+            return
+
+        overflow = self._size + n - self.capacity
+        if overflow > 0:
+            self._evict(min(overflow, self._size))
+
+        # Records older than the newest `capacity` never reach the buffer
+        if n > self.capacity:
+            self._discard(values[:, :n - self.capacity])
+            values = values[:, n - self.capacity:]
+            n = self.capacity
+        self._grow(self._size + n)
+
+        positions = (self._start + self._size + np.arange(n)) % self._allocated
+        self._buffer[:, positions] = values
+        self._buffer[:, positions + self._allocated] = values
+        self._size += n
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        Get a zero-copy, read-only view of one column (oldest first).
+
+        The view aliases the ring buffer, so it is only valid until the next
+        append, extend or clear; copy it to keep the values.
+
+        Args:
+            name: Column name from COLUMNS
+
+        Returns:
+            View of the retained values
+        """
+        view = self._buffer[self.COLUMNS.index(name), self._start:self._start + self._size]
+        view.flags.writeable = False
+        return view
+
+    def as_dict(self) -> Dict[str, np.ndarray]:
+        """Get read-only views of all columns (valid until the next write, see `column`)."""
+        return {name: self.column(name) for name in self.COLUMNS}
+
+    def clear(self) -> None:
+        """Drop all in-memory records (spilled records are kept on disk)."""
+        self._start = 0
+        self._size = 0
+
+    def load_spilled(self) -> Dict[str, np.ndarray]:
+        """
+        Memory-map the records spilled to disk.
+
+        Returns:
+            Dictionary of column views over the spill file (oldest first)
+        """
+        record = np.dtype([(name, self.dtype) for name in self.COLUMNS])
+        if self.spill_path is None or self.spilled == 0:
+            spilled = np.zeros(0, dtype=record)
+        else:
+            spilled = np.memmap(self.spill_path, dtype=record, mode='r',
+                                offset=self._spill_offset, shape=(self.spilled,))
+        return {name: spilled[name] for name in self.COLUMNS}
+
+    def _evict(self, needed: int) -> None:
+        """Make room for `needed` records according to the overflow policy."""
+        if self.overflow == 'error':
+            raise OverflowError(f"Coherence history is full (capacity {self.capacity})")
+
+        count = needed
+        if self.overflow == 'spill':
+            count = min(self._size, max(needed, self.spill_block))
+            self._discard(self._buffer[:, self._start:self._start + count])
+
+        self._start = (self._start + count) % self._allocated
+        self._size -= count
+
+    def _grow(self, needed: int) -> None:
+        """Enlarge the allocation (at least doubling, up to capacity) to hold `needed` records."""
+        if needed <= self._allocated:
+            return
+        allocated = min(self.capacity, max(needed, 2 * self._allocated))
+        window = self._buffer[:, self._start:self._start + self._size]
+        buffer = np.zeros((len(self.COLUMNS), 2 * allocated), dtype=self.dtype)
+        buffer[:, :self._size] = window
+        buffer[:, allocated:allocated + self._size] = window
+        self._buffer, self._allocated, self._start = buffer, allocated, 0
+
+    def _discard(self, values: np.ndarray) -> None:
+        """Handle records leaving the buffer without ever being evicted."""
+        if self.overflow == 'error':
+            raise OverflowError(f"Coherence history is full (capacity {self.capacity})")
+        if self.overflow != 'spill':
+            return
+
+        record = np.dtype([(name, self.dtype) for name in self.COLUMNS])
+        rows = np.empty(values.shape[1], dtype=record)
+        for i, name in enumerate(self.COLUMNS):
+            rows[name] = values[i]
+        with open(self.spill_path, 'ab') as f:
+            rows.tofile(f)
+        self.spilled += len(rows)
+
+
+class NumpyBackend:
+    """Array operations for NumPy inputs (the default backend)."""
+
+    name = 'numpy'
+
+    def is_array(self, x) -> bool:
+        return isinstance(x, np.ndarray)
+
+    def asarray(self, x, like=None) -> np.ndarray:
+        return np.asarray(x, dtype=float if like is None else like.dtype)
+
+    def to_numpy(self, x) -> np.ndarray:
+        return np.asarray(x)
+
+    def norm(self, x):
+        return np.linalg.norm(x, axis=-1)
+
+    def clip(self, x, low: float, high: float):
+        return np.clip(x, low, high)
+
+    def where(self, condition, x, y):
+        return np.where(condition, x, y)
+
+    def broadcast(self, *arrays) -> List:
+        return [np.array(a) for a in np.broadcast_arrays(*arrays)]
+
+    def zeros(self, shape: Tuple[int, ...], like, dtype=None) -> np.ndarray:
+        return np.zeros(shape, dtype=like.dtype if dtype is None else dtype)
+
+
+class TorchBackend:
+    """
+    Array operations for torch tensors.
+
+    Results stay on the device (and in the floating dtype) of the inputs, so
+    model outputs are scored without host round trips.
+    """
+
+    name = 'torch'
+
+    def __init__(self, device=None, dtype=None):
+        import torch  # Imported only when the torch backend is used
+        self.torch = torch
+        self.device = device
+        self.dtype = dtype
+
+    def is_array(self, x) -> bool:
+        return self.torch.is_tensor(x)
+
+    def asarray(self, x, like=None):
+        if like is not None:
+            return self.torch.as_tensor(x, dtype=like.dtype, device=like.device)
+        dtype = self.dtype
+        if dtype is None:
+            dtype = x.dtype if self.torch.is_tensor(x) and x.is_floating_point() else self.torch.get_default_dtype()
+        return self.torch.as_tensor(x, dtype=dtype, device=self.device)
+
+    def to_numpy(self, x) -> np.ndarray:
+        return x.detach().cpu().numpy()
+
+    def norm(self, x):
+        return self.torch.linalg.vector_norm(x, dim=-1)
+
+    def clip(self, x, low: float, high: float):
+        return self.torch.clamp(x, low, high)
+
+    def where(self, condition, x, y):
+        if not self.torch.is_tensor(x):
+            x = self.torch.as_tensor(x, dtype=y.dtype, device=y.device)
+        if not self.torch.is_tensor(y):
+            y = self.torch.as_tensor(y, dtype=x.dtype, device=x.device)
+        return self.torch.where(condition, x, y)
+
+    def broadcast(self, *arrays) -> List:
+        return list(self.torch.broadcast_tensors(*arrays))
+
+    def zeros(self, shape: Tuple[int, ...], like, dtype=None):
+        if dtype is None:
+            dtype = like.dtype
+        elif not isinstance(dtype, self.torch.dtype):
+            dtype = getattr(self.torch, np.dtype(dtype).name)
+        return self.torch.zeros(shape, dtype=dtype, device=like.device)
+
+
+def is_tensor(x) -> bool:
+    """Check for a torch tensor without importing torch."""
+    torch = sys.modules.get('torch')
+    return torch is not None and torch.is_tensor(x)
+
+
+def get_backend(*arrays, name: Optional[str] = None):
+    """
+    Select the array backend for a computation.
+
+    Args:
+        arrays: Inputs of the computation; any torch tensor selects the torch backend
+        name: Explicit backend name ('numpy' or 'torch'), overriding inference
+
+    Returns:
+        Backend instance
+    """
+    if name is None:
+        name = 'torch' if any(is_tensor(a) for a in arrays) else 'numpy'
+
+    if name == 'numpy':
+        return NumpyBackend()
+    if name == 'torch':
+        tensor = next((a for a in arrays if is_tensor(a)), None)
+        if tensor is None:
+            return TorchBackend()
+        dtype = tensor.dtype if tensor.is_floating_point() else None
+        return TorchBackend(device=tensor.device, dtype=dtype)
+    raise ValueError(f"Unknown backend: {name}")
+
+
+@dataclass
+class CollapseEvent:
+    """Coherence collapse detected at a single recursive depth."""
+    depth: int
+    coherence: float
+    threshold: float
+    severity: float
+    motion: float
+    components: Dict[str, float] = field(default_factory=dict)
 
 
 class RecursiveCoherenceFunction:
@@ -27,15 +348,25 @@ class RecursiveCoherenceFunction:
         self.s_max = self.config.get('s_max', 1.0)  # Maximum allowable phase divergence
         self.alpha = self.config.get('alpha', 0.6)  # Balance between internal/external feedback
         self.layer_weights = self.config.get('layer_weights', None)  # Optional layer-specific weights
+        self.backend = self.config.get('backend', None)  # 'numpy', 'torch' or None to infer from inputs
         
-        # Initialize tracking variables
-        self.historical_coherence = []
-        self.component_history = {
-            'signal_alignment': [],
-            'feedback_responsiveness': [],
-            'bounded_integrity': [],
-            'elastic_tolerance': []
-        }
+        # Initialize tracking variables (bounded, array-backed)
+        self.history = CoherenceHistory(
+            capacity=self.config.get('history_capacity', 65536),
+            dtype=self.config.get('history_dtype', np.float64),
+            overflow=self.config.get('history_overflow', 'overwrite'),
+            spill_path=self.config.get('history_spill_path', None)
+        )
+
+    @property
+    def historical_coherence(self) -> np.ndarray:
+        """Read-only view of the recorded overall coherence values (valid until the next record)."""
+        return self.history.column('coherence')
+
+    @property
+    def component_history(self) -> Dict[str, np.ndarray]:
+        """Read-only views of the recorded component values (valid until the next record)."""
+        return {name: self.history.column(name) for name in CoherenceHistory.COLUMNS[1:]}
         
     def signal_alignment(self, 
                         phase_vector: np.ndarray, 
@@ -50,8 +381,15 @@ class RecursiveCoherenceFunction:
             coherence_motion: Change in recursive coherence over time
             
         Returns:
-            Signal Alignment value between 0 and 1
+            Signal Alignment value between 0 and 1 (a tensor of values over the
+            leading dimensions for torch inputs)
         """
+        if is_tensor(phase_vector) or is_tensor(coherence_motion):
+            xp = get_backend(phase_vector, coherence_motion)
+            phase_vector = xp.asarray(phase_vector)
+            return self._signal_alignment_array(xp, phase_vector,
+                                                xp.asarray(coherence_motion, like=phase_vector))
+
         # Normalize vectors
         phase_norm = np.linalg.norm(phase_vector)
         motion_norm = np.linalg.norm(coherence_motion)
@@ -164,11 +502,8 @@ class RecursiveCoherenceFunction:
                     elastic_tolerance)
         
         # Update tracking variables
-        self.historical_coherence.append(coherence)
-        self.component_history['signal_alignment'].append(signal_alignment)
-        self.component_history['feedback_responsiveness'].append(feedback_responsiveness)
-        self.component_history['bounded_integrity'].append(bounded_integrity)
-        self.component_history['elastic_tolerance'].append(elastic_tolerance)
+        self.history.append(coherence, signal_alignment, feedback_responsiveness,
+                            bounded_integrity, elastic_tolerance)
         
         return coherence
     
@@ -195,8 +530,17 @@ class RecursiveCoherenceFunction:
             used_capacity: Used tolerance capacity
             
         Returns:
-            Dictionary with overall coherence and component values
+            Dictionary with overall coherence and component values (tensors, not
+            recorded in the history, when any input is a torch tensor)
         """
+        if any(is_tensor(x) for x in (phase_vector, coherence_motion, internal_feedback,
+                                             external_feedback, internal_integrity,
+                                             phase_alignment, total_capacity, used_capacity)):
+            return self.measure_coherence_batch(phase_vector, coherence_motion,
+                                                internal_feedback, external_feedback,
+                                                internal_integrity, phase_alignment,
+                                                total_capacity, used_capacity)
+
         # Calculate individual components
         s_p = self.signal_alignment(phase_vector, coherence_motion)
         f_p = self.feedback_responsiveness(internal_feedback, external_feedback)
@@ -213,7 +557,168 @@ class RecursiveCoherenceFunction:
             'bounded_integrity': b_p,
             'elastic_tolerance': lambda_p
         }
-    
+
+    def measure_coherence_fast(self,
+                               phase_vector: np.ndarray,
+                               coherence_motion: np.ndarray,
+                               internal_feedback: float,
+                               external_feedback: float,
+                               internal_integrity: float,
+                               phase_alignment: float,
+                               total_capacity: float,
+                               used_capacity: float,
+                               record_history: bool = False) -> Tuple[float, float, float, float, float]:
+        """
+        Low-overhead coherence measurement for a single point.
+
+        Same result as `measure_coherence`, computed with plain float arithmetic
+        on short vectors (no temporary arrays, no NumPy scalar boxing) and without
+        history recording unless requested. Intended for inline per-token gating.
+
+        Args:
+            phase_vector: Current phase vector
+            coherence_motion: Change in coherence over time
+            internal_feedback: Internal feedback responsiveness
+            external_feedback: External feedback responsiveness
+            internal_integrity: Internal bounded integrity
+            phase_alignment: Phase alignment between layers
+            total_capacity: Total tolerance capacity
+            used_capacity: Used tolerance capacity
+            record_history: Whether to append the result to the history
+
+        Returns:
+            Tuple of (coherence, signal_alignment, feedback_responsiveness,
+            bounded_integrity, elastic_tolerance)
+        """
+        phase = phase_vector.tolist() if hasattr(phase_vector, 'tolist') else phase_vector
+        motion = coherence_motion.tolist() if hasattr(coherence_motion, 'tolist') else coherence_motion
+
+        # S(p)
+        phase_norm = math.hypot(*phase)
+        motion_norm = math.hypot(*motion)
+        if phase_norm < 1e-6 or motion_norm < 1e-6:
+            s_p = 0.0
+        else:
+            divergence = math.dist([x / phase_norm for x in phase],
+                                   [y / motion_norm for y in motion])
+            s_p = min(1.0, max(0.0, 1.0 - divergence / self.s_max))
+
+        # F(p)
+        f_p = float(self.alpha * internal_feedback + (1.0 - self.alpha) * external_feedback)
+        f_p = min(1.0, max(0.0, f_p))
+
+        # B(p)
+        b_p = min(1.0, max(0.0, float(internal_integrity * (1.0 - phase_alignment))))
+
+        # λ(p)
+        if total_capacity < 1e-6:
+            lambda_p = 0.0
+        else:
+            lambda_p = min(1.0, max(0.0, float((total_capacity - used_capacity) / total_capacity)))
+
+        delta_p = s_p * f_p * b_p * lambda_p
+        if record_history:
+            self.history.append(delta_p, s_p, f_p, b_p, lambda_p)
+
+        return delta_p, s_p, f_p, b_p, lambda_p
+
+    def measure_coherence_batch(self,
+                                phase_vectors: np.ndarray,
+                                coherence_motions: np.ndarray,
+                                internal_feedback: np.ndarray,
+                                external_feedback: np.ndarray,
+                                internal_integrity: np.ndarray,
+                                phase_alignment: np.ndarray,
+                                total_capacity: np.ndarray,
+                                used_capacity: np.ndarray,
+                                record_history: bool = False) -> Dict[str, np.ndarray]:
+        """
+        Perform coherence measurement for many (sample, depth) points at once.
+
+        Vectorized equivalent of calling `measure_coherence` once per point. Scalar
+        inputs have shape [N, D] (any shape that broadcasts works), phase vectors
+        and coherence motions have shape [N, D, dim].
+
+        Args:
+            phase_vectors: Phase vectors [N, D, dim]
+            coherence_motions: Coherence motion vectors [N, D, dim]
+            internal_feedback: Internal feedback responsiveness [N, D]
+            external_feedback: External feedback responsiveness [N, D]
+            internal_integrity: Internal bounded integrity [N, D]
+            phase_alignment: Phase alignment between layers [N, D]
+            total_capacity: Total tolerance capacity [N, D]
+            used_capacity: Used tolerance capacity [N, D]
+            record_history: Whether to append the results (row-major) to history
+
+        Returns:
+            Dictionary with overall coherence and component value arrays
+        """
+        xp = get_backend(phase_vectors, coherence_motions, internal_feedback, external_feedback,
+                         internal_integrity, phase_alignment, total_capacity, used_capacity,
+                         name=self.backend)
+        phase_vectors = xp.asarray(phase_vectors)
+        coherence_motions = xp.asarray(coherence_motions, like=phase_vectors)
+
+        # S(p): alignment of normalized phase vector and coherence motion
+        s_p = self._signal_alignment_array(xp, phase_vectors, coherence_motions)
+
+        # F(p): weighted internal/external feedback
+        f_p = xp.clip(self.alpha * xp.asarray(internal_feedback, like=phase_vectors) +
+                      (1.0 - self.alpha) * xp.asarray(external_feedback, like=phase_vectors),
+                      0.0, 1.0)
+
+        # B(p): internal integrity reduced by phase alignment
+        b_p = xp.clip(xp.asarray(internal_integrity, like=phase_vectors) *
+                      (1.0 - xp.asarray(phase_alignment, like=phase_vectors)),
+                      0.0, 1.0)
+
+        # λ(p): remaining fraction of tolerance capacity
+        total_capacity = xp.asarray(total_capacity, like=phase_vectors)
+        used_capacity = xp.asarray(used_capacity, like=phase_vectors)
+        has_capacity = total_capacity >= 1e-6
+        tolerance = (total_capacity - used_capacity) / xp.where(has_capacity, total_capacity, 1.0)
+        lambda_p = xp.where(has_capacity, xp.clip(tolerance, 0.0, 1.0), 0.0)
+
+        # Broadcast all components to a common shape
+        s_p, f_p, b_p, lambda_p = xp.broadcast(s_p, f_p, b_p, lambda_p)
+        delta_p = s_p * f_p * b_p * lambda_p
+
+        if record_history:
+            # Requires a host copy for non-NumPy backends
+            self.history.extend(np.stack([xp.to_numpy(c).ravel()
+                                          for c in (delta_p, s_p, f_p, b_p, lambda_p)]))
+
+        return {
+            'coherence': delta_p,
+            'signal_alignment': s_p,
+            'feedback_responsiveness': f_p,
+            'bounded_integrity': b_p,
+            'elastic_tolerance': lambda_p
+        }
+
+    def _signal_alignment_array(self, xp, phase_vectors, coherence_motions):
+        """Vectorized S(p) over the leading dimensions of [..., dim] inputs."""
+        phase_norm = xp.norm(phase_vectors)
+        motion_norm = xp.norm(coherence_motions)
+        valid = (phase_norm >= 1e-6) & (motion_norm >= 1e-6)
+
+        phase_unit = phase_vectors / xp.where(valid, phase_norm, 1.0)[..., None]
+        motion_unit = coherence_motions / xp.where(valid, motion_norm, 1.0)[..., None]
+        divergence = xp.norm(phase_unit - motion_unit)
+
+        return xp.where(valid, xp.clip(1.0 - divergence / self.s_max, 0.0, 1.0), 0.0)
+
+    def _phase_alignment_array(self, xp, phase_vectors_p, phase_vectors_t):
+        """Vectorized τ(p,t) over the leading dimensions of [..., dim] inputs."""
+        p_norm = xp.norm(phase_vectors_p)
+        t_norm = xp.norm(phase_vectors_t)
+        valid = (p_norm >= 1e-6) & (t_norm >= 1e-6)
+
+        alignment = ((phase_vectors_p * phase_vectors_t).sum(-1) /
+                     xp.where(valid, p_norm * t_norm, 1.0))
+
+        return xp.where(valid, (alignment + 1) / 2, 0.0)
+
     def calculate_beverly_band(self,
                               elastic_tolerance: float,
                               resilience: float,
@@ -257,8 +762,15 @@ class RecursiveCoherenceFunction:
             phase_vector_t: Phase vector at target layer t
             
         Returns:
-            Phase alignment value between -1 and 1
+            Phase alignment value between -1 and 1 (a tensor of values over the
+            leading dimensions for torch inputs)
         """
+        if is_tensor(phase_vector_p) or is_tensor(phase_vector_t):
+            xp = get_backend(phase_vector_p, phase_vector_t)
+            phase_vector_p = xp.asarray(phase_vector_p)
+            return self._phase_alignment_array(xp, phase_vector_p,
+                                               xp.asarray(phase_vector_t, like=phase_vector_p))
+
         # Normalize vectors
         p_norm = np.linalg.norm(phase_vector_p)
         t_norm = np.linalg.norm(phase_vector_t)
@@ -277,6 +789,56 @@ class RecursiveCoherenceFunction:
         
         return normalized_alignment
     
+    def phase_alignment_matrix(self,
+                               phase_vectors_p: np.ndarray,
+                               phase_vectors_t: np.ndarray,
+                               block_size: Optional[int] = None) -> np.ndarray:
+        """
+        Calculate Phase Alignment (τ(p,t)) for every layer/target pair.
+
+        Each vector is normalized once and the full matrix comes from a single
+        matrix multiply, optionally tiled into [block_size, block_size] blocks to
+        bound the size of intermediate products for large inputs.
+
+        Args:
+            phase_vectors_p: Phase vectors for each layer [layers, dim]
+            phase_vectors_t: Phase vectors for each target [targets, dim]
+            block_size: Optional tile size for blocked computation
+
+        Returns:
+            Phase alignment matrix [layers, targets], matching `phase_alignment`
+        """
+        xp = get_backend(phase_vectors_p, phase_vectors_t, name=self.backend)
+        phase_vectors_p = xp.asarray(phase_vectors_p)
+        phase_vectors_t = xp.asarray(phase_vectors_t, like=phase_vectors_p)
+
+        # Normalize once (zero vectors are masked out below)
+        p_norm = xp.norm(phase_vectors_p)
+        t_norm = xp.norm(phase_vectors_t)
+        p_valid = p_norm >= 1e-6
+        t_valid = t_norm >= 1e-6
+        p_unit = phase_vectors_p / xp.where(p_valid, p_norm, 1.0)[:, None]
+        t_unit = phase_vectors_t / xp.where(t_valid, t_norm, 1.0)[:, None]
+
+        if block_size is None:
+            alignment = p_unit @ t_unit.T
+        else:
+            alignment = xp.zeros((len(p_unit), len(t_unit)), like=p_unit)
+            for i in range(0, len(p_unit), block_size):
+                for j in range(0, len(t_unit), block_size):
+                    alignment[i:i + block_size, j:j + block_size] = (
+                        p_unit[i:i + block_size] @ t_unit[j:j + block_size].T)
+
+        # Normalize to [0, 1] in place
+        alignment += 1
+        alignment /= 2
+
+        # Cannot align zero vectors
+        alignment[~p_valid, :] = 0.0
+        alignment[:, ~t_valid] = 0.0
+
+        return alignment
+    
     def recursive_compression_coefficient(self, 
                                        operations: int, 
                                        bandwidth: float) -> float:
@@ -362,6 +924,46 @@ class RecursiveCoherenceFunction:
         # All depths were safe
         return len(coherence_history)
     
+    def safe_recursive_depth_batch(self,
+                                   coherence_histories: np.ndarray,
+                                   threshold: Union[float, np.ndarray] = 0.7) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Determine safe recursive depths for many coherence histories at once.
+
+        Vectorized form of `safe_recursive_depth` over the rows of an [N, D]
+        matrix. The threshold broadcasts against the matrix: a scalar, a per-depth
+        [D] array, a per-row [N, 1] array, or a full [N, D] matrix such as the
+        output of `collapse_threshold_batch`.
+
+        Args:
+            coherence_histories: Coherence values [N, D] across recursive depths
+            threshold: Minimum acceptable coherence
+
+        Returns:
+            Tuple of (safe_depths [N], severities [N]) where severity is measured
+            at the first depth below threshold (0 if none)
+        """
+        coherence_histories = np.asarray(coherence_histories, dtype=float)
+        if coherence_histories.ndim != 2:
+            raise ValueError("Coherence histories must have shape [N, D]")
+        threshold = np.broadcast_to(np.asarray(threshold, dtype=float), coherence_histories.shape)
+
+        n_rows, n_depths = coherence_histories.shape
+        if n_depths == 0:
+            return np.zeros(n_rows, dtype=int), np.zeros(n_rows)
+
+        # First depth where coherence falls below threshold
+        below = coherence_histories < threshold
+        collapsed = below.any(axis=1)
+        first = below.argmax(axis=1)
+        safe_depths = np.where(collapsed, first, n_depths)
+
+        rows = np.arange(n_rows)
+        _, severities = self.detect_collapse_batch(coherence_histories[rows, first],
+                                                   threshold[rows, first])
+
+        return safe_depths, np.where(collapsed, severities, 0.0)
+    
     def symbolic_residue_tensor(self, 
                               coherence_deviations: List[float], 
                               phase_alignments: List[float], 
@@ -377,25 +979,74 @@ class RecursiveCoherenceFunction:
             layer_weights: Optional weights for each layer
             
         Returns:
-            Symbolic Residue tensor
+            Symbolic Residue tensor (a torch tensor for torch inputs)
         """
         if len(coherence_deviations) != len(phase_alignments):
             raise ValueError("Coherence deviations and phase alignments must have same length")
-            
-        # Use uniform weights if none provided
-        if layer_weights is None:
-            layer_weights = np.ones(len(coherence_deviations))
-        elif len(layer_weights) != len(coherence_deviations):
+        if layer_weights is not None and len(layer_weights) != len(coherence_deviations):
             raise ValueError("Layer weights must have same length as coherence deviations")
-            
-        # Calculate residue components
-        residue_components = []
-        for i in range(len(coherence_deviations)):
-            # Calculate residue contribution for this layer
-            residue = coherence_deviations[i] * (1.0 - phase_alignments[i]) * layer_weights[i]
-            residue_components.append(residue)
-            
-        return np.array(residue_components)
+
+        xp = get_backend(coherence_deviations, phase_alignments, layer_weights,
+                         name=self.backend)
+        coherence_deviations = xp.asarray(coherence_deviations)
+        residue = coherence_deviations * (1.0 - xp.asarray(phase_alignments, like=coherence_deviations))
+
+        # Apply layer weights (uniform if none provided)
+        if layer_weights is not None:
+            residue = residue * xp.asarray(layer_weights, like=coherence_deviations)
+
+        return residue
+    
+    def symbolic_residue_matrix(self,
+                                coherence_deviations: np.ndarray,
+                                phase_alignments: np.ndarray,
+                                layer_weights: Optional[np.ndarray] = None,
+                                dtype: Optional[Union[str, np.dtype]] = None,
+                                out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Calculate Symbolic Residue Tensor (RΣ) components for every target at once.
+
+        Vectorized multi-target form of `symbolic_residue_tensor`: row t of the
+        result equals `symbolic_residue_tensor(deviations, alignments[:, t], weights)`.
+
+        Args:
+            coherence_deviations: Coherence deviations at each layer [layers]
+            phase_alignments: Phase alignments between layers and targets [layers, targets]
+            layer_weights: Optional weights for each layer [layers]
+            dtype: Optional output dtype (e.g. float32) when `out` is not given
+            out: Optional preallocated [targets, layers] output buffer
+
+        Returns:
+            Symbolic Residue components [targets, layers]
+        """
+        xp = get_backend(coherence_deviations, phase_alignments, layer_weights, out,
+                         name=self.backend)
+        coherence_deviations = xp.asarray(coherence_deviations)
+        phase_alignments = xp.asarray(phase_alignments, like=coherence_deviations)
+
+        layers = len(coherence_deviations)
+        if phase_alignments.ndim != 2 or phase_alignments.shape[0] != layers:
+            raise ValueError("Phase alignments must have shape [layers, targets]")
+        if layer_weights is not None and len(layer_weights) != layers:
+            raise ValueError("Layer weights must have same length as coherence deviations")
+
+        shape = (phase_alignments.shape[1], layers)
+        if out is None:
+            out = xp.zeros(shape, like=coherence_deviations, dtype=dtype)
+        elif tuple(out.shape) != shape:
+            raise ValueError(f"Output buffer must have shape {shape}")
+
+        weighted_deviations = coherence_deviations
+        if layer_weights is not None:
+            weighted_deviations = weighted_deviations * xp.asarray(layer_weights, like=coherence_deviations)
+
+        # Δp_i · (1 - τ(p_i,t)) · ω_i, broadcast over targets, written into `out`
+        out[...] = phase_alignments.T
+        out *= -1
+        out += 1
+        out *= weighted_deviations
+
+        return out
     
     def collapse_threshold(self, 
                          elastic_tolerance: float, 
@@ -446,6 +1097,55 @@ class RecursiveCoherenceFunction:
             
         return collapse_detected, severity
     
+    def collapse_threshold_batch(self,
+                                 elastic_tolerance: np.ndarray,
+                                 recursive_depth: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Calculate collapse thresholds for many (sample, depth) points at once.
+
+        Vectorized form of `collapse_threshold`.
+
+        Args:
+            elastic_tolerance: Elastic tolerance values [N, D]
+            recursive_depth: Recursive depths broadcasting against the tolerances
+                (defaults to 1..D along the last axis)
+
+        Returns:
+            Collapse threshold values with the shape of the broadcast inputs
+        """
+        elastic_tolerance = np.asarray(elastic_tolerance, dtype=float)
+        if recursive_depth is None:
+            recursive_depth = np.arange(1, elastic_tolerance.shape[-1] + 1)
+
+        # Same base threshold, depth factor and tolerance bonus as the scalar path
+        threshold = 0.3 + 0.1 * np.asarray(recursive_depth) - 0.4 * elastic_tolerance
+
+        return np.clip(threshold, 0.1, 0.9)
+
+    def detect_collapse_batch(self,
+                              coherence: np.ndarray,
+                              threshold: Union[float, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Detect collapse for many coherence values at once.
+
+        Vectorized form of `detect_collapse`.
+
+        Args:
+            coherence: Coherence values
+            threshold: Collapse thresholds broadcasting against `coherence`
+
+        Returns:
+            Tuple of (collapse_detected, collapse_severity) arrays
+        """
+        coherence = np.asarray(coherence, dtype=float)
+        threshold = np.asarray(threshold, dtype=float)
+        collapse_detected = coherence < threshold
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            severity = np.minimum(1.0, (threshold - coherence) / threshold)
+
+        return collapse_detected, np.where(collapse_detected, severity, 0.0)
+    
     def love_equation(self, v: float) -> float:
         """
         Apply the Love Equation - the fundamental constraint for stable recursion.
@@ -463,33 +1163,178 @@ class RecursiveCoherenceFunction:
             
         return np.sqrt(v)
     
-    def get_component_history(self) -> Dict[str, List[float]]:
+    def get_component_history(self) -> Dict[str, np.ndarray]:
         """
         Get historical values of all coherence components.
         
         Returns:
-            Dictionary with component histories
+            Dictionary with copies of the component histories (oldest first)
         """
-        return self.component_history
+        return {name: values.copy() for name, values in self.component_history.items()}
     
-    def get_coherence_history(self) -> List[float]:
+    def get_coherence_history(self) -> np.ndarray:
         """
         Get historical overall coherence values.
         
         Returns:
-            List of historical coherence values
+            Copy of the historical coherence values (oldest first)
         """
-        return self.historical_coherence
+        return self.historical_coherence.copy()
     
     def reset_history(self) -> None:
-        """Reset all historical tracking data."""
-        self.historical_coherence = []
-        self.component_history = {
-            'signal_alignment': [],
-            'feedback_responsiveness': [],
-            'bounded_integrity': [],
-            'elastic_tolerance': []
-        }
+        """Reset all in-memory historical tracking data."""
+        self.history.clear()
+
+
+class CollapseMonitor:
+    """
+    Online collapse detector that consumes one recursive depth at a time.
+
+    Each `update` measures coherence, coherence motion, the collapse threshold and
+    severity for the new depth in O(1) and emits a `CollapseEvent` (via callback
+    and the pending-event queue) as soon as coherence drops below threshold, so
+    callers can stop a runaway recursive generation early.
+    """
+
+    def __init__(self,
+                 coherence_function: Optional[RecursiveCoherenceFunction] = None,
+                 on_collapse: Optional[Callable[[CollapseEvent], None]] = None,
+                 stop_on_collapse: bool = False,
+                 first_depth: int = 1,
+                 max_pending: int = 1024):
+        """
+        Initialize the collapse monitor.
+
+        Args:
+            coherence_function: Coherence function used for measurements
+            on_collapse: Optional callback invoked with each collapse event
+            stop_on_collapse: Whether `watch` stops after the first collapse
+            first_depth: Recursive depth assigned to the first update
+            max_pending: Maximum number of undrained events kept in the queue
+        """
+        if max_pending < 1:
+            raise ValueError("max_pending must be at least 1")
+        self.rcf = coherence_function or RecursiveCoherenceFunction()
+        self.on_collapse = on_collapse
+        self.stop_on_collapse = stop_on_collapse
+        self.first_depth = first_depth
+        self.pending = deque(maxlen=max_pending)
+        self.reset()
+
+    def reset(self) -> None:
+        """Reset the monitor for a new depth sweep."""
+        self.depths_seen = 0
+        self.previous_coherence = None
+        self.motion = 0.0
+        self.threshold = None
+        self.severity = 0.0
+        self.max_severity = 0.0
+        self.safe_depth = 0
+        self.collapsed = False
+        self.last_result = None
+        self.pending.clear()
+
+    @property
+    def should_stop(self) -> bool:
+        """Whether the caller should abort the current recursive generation."""
+        return self.stop_on_collapse and self.collapsed
+
+    def update(self,
+               phase_vector: np.ndarray,
+               coherence_motion: np.ndarray,
+               internal_feedback: float,
+               external_feedback: float,
+               internal_integrity: float,
+               phase_alignment: float,
+               total_capacity: float,
+               used_capacity: float) -> Optional[CollapseEvent]:
+        """
+        Consume the measurement inputs for the next recursive depth.
+
+        Args:
+            phase_vector: Current phase vector
+            coherence_motion: Change in coherence over time
+            internal_feedback: Internal feedback responsiveness
+            external_feedback: External feedback responsiveness
+            internal_integrity: Internal bounded integrity
+            phase_alignment: Phase alignment between layers
+            total_capacity: Total tolerance capacity
+            used_capacity: Used tolerance capacity
+
+        Returns:
+            Collapse event if coherence collapsed at this depth, otherwise None
+        """
+        depth = self.first_depth + self.depths_seen
+        result = self.rcf.measure_coherence(phase_vector, coherence_motion,
+                                            internal_feedback, external_feedback,
+                                            internal_integrity, phase_alignment,
+                                            total_capacity, used_capacity)
+        coherence = result['coherence']
+
+        if self.previous_coherence is not None:
+            self.motion = self.rcf.coherence_motion(coherence, self.previous_coherence)
+        self.previous_coherence = coherence
+
+        self.threshold = self.rcf.collapse_threshold(result['elastic_tolerance'], depth)
+        collapse_detected, self.severity = self.rcf.detect_collapse(coherence, self.threshold)
+        self.max_severity = max(self.max_severity, self.severity)
+
+        self.depths_seen += 1
+        self.last_result = result
+
+        if not collapse_detected:
+            if not self.collapsed:
+                self.safe_depth = self.depths_seen
+            return None
+
+        self.collapsed = True
+        event = CollapseEvent(
+            depth=depth,
+            coherence=coherence,
+            threshold=self.threshold,
+            severity=self.severity,
+            motion=self.motion,
+            components=result
+        )
+        self.pending.append(event)
+        if self.on_collapse is not None:
+            self.on_collapse(event)
+        return event
+
+    def drain(self) -> Iterator[CollapseEvent]:
+        """
+        Iterate over (and remove) collapse events not yet consumed.
+
+        Returns:
+            Iterator over pending collapse events, oldest first
+        """
+        while self.pending:
+            yield self.pending.popleft()
+
+    def watch(self, depth_inputs: Iterable[Dict]) -> Iterator[CollapseEvent]:
+        """
+        Consume a (possibly lazy) stream of per-depth inputs, yielding collapses.
+
+        The stream is only advanced as far as needed: with `stop_on_collapse` the
+        generator returns right after the first collapse, so the remaining depths
+        are never produced.
+
+        Args:
+            depth_inputs: Iterable of keyword-argument dicts for `update`
+
+        Returns:
+            Iterator over collapse events as they are detected
+        """
+        for inputs in depth_inputs:
+            event = self.update(**inputs)
+            if event is None:
+                continue
+            # Events yielded here are consumed; the callback may already have drained it
+            if self.pending and self.pending[-1] is event:
+                self.pending.pop()
+            yield event
+            if self.should_stop:
+                return
 
 
 # Example usage
@@ -576,3 +1421,12 @@ if __name__ == "__main__":
         print(f"  Collapse Threshold: {threshold:.4f}")
         print(f"  Collapsed: {collapsed} (Severity: {severity:.4f})")
         print()
+
+    # Per-call latency of the scalar paths (inline per-token gating)
+    import timeit
+    gating_args = (phase_vectors[2], coherence_motions[2], 0.63, 0.6, 0.67, 0.3, 1.0, 0.5)
+    calls = 20000
+    for name, fn in [("measure_coherence", rcf.measure_coherence),
+                     ("measure_coherence_fast", rcf.measure_coherence_fast)]:
+        seconds = min(timeit.repeat(lambda: fn(*gating_args), number=calls, repeat=5))
+        print(f"{name}: {seconds / calls * 1e6:.2f} us/call")
@@ -0,0 +1,696 @@
+"""
+Residue Recorders
+
+This module implements thread-safe and asyncio recording front ends for the
+Symbolic Residue Tensor and the Recursive Coherence Function, for use from
+thread-pooled or event-loop model servers that record residue per token step.
+"""
+
+import asyncio
+import itertools
+import json
+import random
+import threading
+import numpy as np
+from concurrent.futures import Executor
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from delta_p import RecursiveCoherenceFunction
+from tensor import SymbolicResidueTensor
+
+
+class _Stage:
+    """Events staged by one thread, flushed in batches."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.voids: List[tuple] = []
+        self.hesitations: List[tuple] = []
+        self.collapses: List[tuple] = []
+        self.coherence: List[tuple] = []
+
+    def __len__(self) -> int:
+        return len(self.voids) + len(self.hesitations) + len(self.collapses) + len(self.coherence)
+
+    def take(self) -> Tuple[List[tuple], ...]:
+        """Swap out the staged events (caller holds `lock`)."""
+        staged = (self.voids, self.hesitations, self.collapses, self.coherence)
+        self.voids, self.hesitations, self.collapses, self.coherence = [], [], [], []
+        return staged
+
+
+def _runs(rows: List[tuple]) -> Iterator[Tuple[str, List[tuple]]]:
+    """Split staged rows into consecutive runs sharing metadata."""
+    for metadata, run in itertools.groupby(rows, key=lambda row: row[1]):
+        yield metadata, list(run)
+
+
+def _columns(run: List[tuple], dtypes: Tuple[Optional[type], ...]) -> List[Any]:
+    """
+    Convert staged rows (step, metadata key, *values) to per-event columns.
+
+    Raises before anything is recorded when a value does not convert to a
+    scalar of its column's dtype (None marks the affected circuits column).
+    """
+    steps, _, *values = zip(*run)
+    columns = [np.asarray(steps, dtype=np.int64)]
+    for column, dtype in zip(values, dtypes):
+        if dtype is None:
+            columns.append([[int(c) for c in circuits] for circuits in column])
+            continue
+        column = np.asarray(column, dtype=dtype)
+        if column.ndim != 1:
+            raise ValueError("Staged event values must be scalars")
+        columns.append(column)
+    return columns
+
+
+def _record_voids(residue_tensor: SymbolicResidueTensor, metadata: Dict[str, Any], columns: List[Any]) -> None:
+    steps, layers, tokens, depths, magnitudes = columns
+    residue_tensor.record_attribution_voids(layers, tokens, depths, magnitudes, metadata, timestamps=steps)
+
+
+def _record_hesitations(residue_tensor: SymbolicResidueTensor, metadata: Dict[str, Any], columns: List[Any]) -> None:
+    steps, tokens, entropies, oscillations, splittings, depths = columns
+    residue_tensor.record_token_hesitations(tokens, entropies, oscillations, splittings, depths, metadata,
+                                            timestamps=steps)
+
+
+def _record_collapses(residue_tensor: SymbolicResidueTensor, metadata: Dict[str, Any], columns: List[Any]) -> None:
+    steps, depths, coherences, thresholds, severities, circuits = columns
+    residue_tensor.record_recursive_collapses(depths, coherences, thresholds, severities, circuits,
+                                              metadata, timestamps=steps)
+
+
+# Column dtypes and batch recording of each staged event kind
+_VOIDS = ((int, int, int, float), _record_voids)
+_HESITATIONS = ((int, float, float, float, int), _record_hesitations)
+_COLLAPSES = ((int, float, float, float, None), _record_collapses)
+
+
+class ConcurrentRecorder:
+    """
+    Thread-safe recording for a SymbolicResidueTensor and RecursiveCoherenceFunction.
+
+    Each thread records into its own staging buffer, guarded by a lock that only
+    that thread and flushes take, so recording threads never wait on each other.
+    A buffer is flushed once it holds `batch_size` events: its events are applied
+    to the tensor through the batch `record_*` APIs and to the coherence history
+    with one `extend`, under a single apply lock. Events of one thread are applied
+    in the order they were recorded.
+
+    Reads (`reading`, `analyze`, `coherence_history`) first flush every thread's
+    buffer and then hold the apply lock, so they see all events recorded before
+    the read started and never a half-applied batch. The wrapped objects must
+    not be written directly while the recorder is in use.
+    """
+
+    def __init__(self,
+                 residue_tensor: Optional[SymbolicResidueTensor] = None,
+                 coherence_function: Optional[RecursiveCoherenceFunction] = None,
+                 batch_size: int = 256):
+        """
+        Initialize the recorder.
+
+        Args:
+            residue_tensor: Tensor receiving residue events
+            coherence_function: Coherence function whose history receives
+                coherence measurements
+            batch_size: Staged events per thread that trigger a flush
+        """
+        if batch_size < 1:
+            raise ValueError("Batch size must be at least 1")
+        self.residue_tensor = residue_tensor
+        self.coherence_function = coherence_function
+        self.batch_size = batch_size
+
+        self._local = threading.local()
+        self._stages: List[_Stage] = []
+        self._stages_lock = threading.Lock()
+        self._apply_lock = threading.Lock()
+
+        # Incremented by every applied batch (analysis is cached per version)
+        self.version = 0
+        self._analysis = None
+        self._analysis_version = -1
+
+    def _stage(self) -> _Stage:
+        stage = getattr(self._local, "stage", None)
+        if stage is None:
+            stage = self._local.stage = _Stage()
+            with self._stages_lock:
+                self._stages.append(stage)
+        return stage
+
+    def _step(self, step: Optional[int]) -> int:
+        if step is not None or self.residue_tensor is None:
+            return step or 0
+        return self.residue_tensor.config.get("current_step", 0)
+
+    def _staged(self, stage: _Stage) -> None:
+        """Flush the calling thread's buffer once it is full (caller holds its lock)."""
+        if len(stage) >= self.batch_size:
+            self._flush_stage(stage)
+
+    def record_attribution_void(self,
+                                layer: int,
+                                token_position: int,
+                                depth: int,
+                                magnitude: float,
+                                metadata: Dict[str, Any] = None,
+                                step: Optional[int] = None) -> None:
+        """
+        Stage an Attribution Void (see `SymbolicResidueTensor.record_attribution_void`).
+
+        Args:
+            layer: Model layer where the void occurred
+            token_position: Token position in the sequence
+            depth: Recursive depth
+            magnitude: Magnitude of the attribution void
+            metadata: Additional information about this void
+            step: Event timestamp (default: the tensor's current_step)
+        """
+        stage = self._stage()
+        with stage.lock:
+            stage.voids.append((self._step(step), _metadata_key(metadata), layer, token_position, depth, magnitude))
+            self._staged(stage)
+
+    def record_token_hesitation(self,
+                                token_position: int,
+                                entropy: float,
+                                oscillation: float,
+                                splitting: float,
+                                depth: int,
+                                metadata: Dict[str, Any] = None,
+                                step: Optional[int] = None) -> None:
+        """
+        Stage a Token Hesitation (see `SymbolicResidueTensor.record_token_hesitation`).
+
+        Args:
+            token_position: Token position in the sequence
+            entropy: Entropy of the token probability distribution
+            oscillation: Oscillation between top candidates
+            splitting: Splitting into distinct probability clusters
+            depth: Recursive depth
+            metadata: Additional information about this hesitation
+            step: Event timestamp (default: the tensor's current_step)
+        """
+        stage = self._stage()
+        with stage.lock:
+            stage.hesitations.append((self._step(step), _metadata_key(metadata), token_position,
+                                      entropy, oscillation, splitting, depth))
+            self._staged(stage)
+
+    def record_recursive_collapse(self,
+                                  depth: int,
+                                  coherence: float,
+                                  collapse_threshold: float,
+                                  severity: float,
+                                  affected_circuits: List[int],
+                                  metadata: Dict[str, Any] = None,
+                                  step: Optional[int] = None) -> None:
+        """
+        Stage a Recursive Collapse (see `SymbolicResidueTensor.record_recursive_collapse`).
+
+        Args:
+            depth: Recursive depth where collapse occurred
+            coherence: Coherence value at collapse
+            collapse_threshold: Threshold that was crossed
+            severity: Severity of the collapse
+            affected_circuits: List of circuits affected by collapse
+            metadata: Additional information about this collapse
+            step: Event timestamp (default: the tensor's current_step)
+        """
+        stage = self._stage()
+        with stage.lock:
+            stage.collapses.append((self._step(step), _metadata_key(metadata), depth, coherence,
+                                    collapse_threshold, severity, list(affected_circuits)))
+            self._staged(stage)
+
+    def record_coherence(self,
+                         coherence: float,
+                         signal_alignment: float,
+                         feedback_responsiveness: float,
+                         bounded_integrity: float,
+                         elastic_tolerance: float) -> None:
+        """
+        Stage one coherence history record (values in CoherenceHistory.COLUMNS order).
+        """
+        stage = self._stage()
+        with stage.lock:
+            stage.coherence.append((coherence, signal_alignment, feedback_responsiveness,
+                                    bounded_integrity, elastic_tolerance))
+            self._staged(stage)
+
+    def measure_coherence(self, *args: Any) -> Dict[str, float]:
+        """
+        Measure coherence and stage the result for the history.
+
+        Takes the arguments of `RecursiveCoherenceFunction.measure_coherence`; the
+        measurement itself runs without locks.
+
+        Returns:
+            Dictionary with overall coherence and component values
+        """
+        values = self.coherence_function.measure_coherence_fast(*args)
+        self.record_coherence(*values)
+        return dict(zip(("coherence", "signal_alignment", "feedback_responsiveness",
+                         "bounded_integrity", "elastic_tolerance"), values))
+
+    def _flush_stage(self, stage: _Stage) -> None:
+        """Apply one thread's staged events (caller holds the stage lock)."""
+        voids, hesitations, collapses, coherence = stage.take()
+        if not (voids or hesitations or collapses or coherence):
+            return
+
+        with self._apply_lock:
+            try:
+                if coherence:
+                    self.coherence_function.history.extend(np.array(coherence, dtype=np.float64).T)
+                if voids or hesitations or collapses:
+                    self._apply(self.residue_tensor, voids, hesitations, collapses)
+            finally:
+                self.version += 1
+
+    def _apply(self,
+               residue_tensor: SymbolicResidueTensor,
+               voids: List[tuple],
+               hesitations: List[tuple],
+               collapses: List[tuple]) -> None:
+        """
+        Record staged events with the batch APIs, one call per metadata run.
+
+        Steps are passed as per-event timestamps; the tensor's config (and its
+        current_step, owned by the driving loop) is never written here.
+
+        Each run is converted and validated before anything is written. Events
+        that fail validation are skipped and the rest of their run is recorded.
+        A batch call that fails afterwards is not retried, since it may already
+        have written cells or events. The first error is raised after every run
+        is applied.
+        """
+        error = None
+        for rows, (dtypes, record) in ((voids, _VOIDS), (hesitations, _HESITATIONS), (collapses, _COLLAPSES)):
+            for metadata, run in _runs(rows):
+                try:
+                    columns = _columns(run, dtypes)
+                except Exception:
+                    valid = []
+                    for row in run:
+                        try:
+                            _columns([row], dtypes)
+                            valid.append(row)
+                        except Exception as event_error:
+                            error = error or event_error
+                    if not valid:
+                        continue
+                    columns = _columns(valid, dtypes)
+                try:
+                    record(residue_tensor, json.loads(metadata), columns)
+                except Exception as run_error:
+                    error = error or run_error
+        if error is not None:
+            raise error
+
+    def flush(self) -> None:
+        """Apply the staged events of every thread (raising the first failure after all are applied)."""
+        with self._stages_lock:
+            stages = list(self._stages)
+        error = None
+        for stage in stages:
+            with stage.lock:
+                try:
+                    self._flush_stage(stage)
+                except Exception as stage_error:
+                    error = error or stage_error
+        if error is not None:
+            raise error
+
+    @contextmanager
+    def reading(self):
+        """
+        Context giving consistent read access to the wrapped objects.
+
+        All events staged before entering are applied, and no batch is applied
+        while the context is held (recording threads keep staging meanwhile).
+
+        Yields:
+            Tuple of (residue tensor, coherence function)
+        """
+        self.flush()
+        with self._apply_lock:
+            yield self.residue_tensor, self.coherence_function
+
+    def analyze(self) -> Dict[str, Any]:
+        """
+        Analyze the residue tensor as of now.
+
+        Returns:
+            Result of `analyze_residue_pattern`, cached until more events are applied
+        """
+        with self.reading() as (residue_tensor, _):
+            if self._analysis_version != self.version:
+                self._analysis = residue_tensor.analyze_residue_pattern()
+                self._analysis_version = self.version
+            return self._analysis
+
+    def coherence_history(self) -> Dict[str, np.ndarray]:
+        """
+        Get a copy of the coherence history as of now.
+
+        Returns:
+            Dictionary of column arrays (oldest first)
+        """
+        with self.reading() as (_, coherence_function):
+            return {name: column.copy() for name, column in coherence_function.history.as_dict().items()}
+
+
+class AsyncResidueRecorder:
+    """
+    Asyncio facade over a SymbolicResidueTensor and RecursiveCoherenceFunction.
+
+    Record calls only enqueue the event on a bounded queue; a drain task moves
+    queued events in batches to a ConcurrentRecorder on an executor, so neither
+    recording nor analysis runs on the event loop. When the queue is full the
+    backpressure policy decides what happens:
+        block        - the record call waits for room
+        drop_oldest  - the oldest queued event is dropped to make room
+        sample       - from half full, events are kept with probability
+                       `sample_rate`; when full, new events are dropped
+
+    An event that fails to record does not stop the drain task: the rest of its
+    batch and later batches are still applied, and the first such error is
+    re-raised by the next `join`, `snapshot` or `close`.
+
+    Usage:
+        async with AsyncResidueRecorder(residue_tensor) as recorder:
+            await recorder.record_token_hesitation(...)
+            analysis = await recorder.snapshot()
+    """
+
+    BACKPRESSURE = ("block", "drop_oldest", "sample")
+
+    def __init__(self,
+                 residue_tensor: Optional[SymbolicResidueTensor] = None,
+                 coherence_function: Optional[RecursiveCoherenceFunction] = None,
+                 maxsize: int = 8192,
+                 backpressure: str = "block",
+                 sample_rate: float = 0.1,
+                 batch_size: int = 512,
+                 executor: Optional[Executor] = None,
+                 seed: Optional[int] = None):
+        """
+        Initialize the recorder (the drain task starts with `start`).
+
+        Args:
+            residue_tensor: Tensor receiving residue events
+            coherence_function: Coherence function whose history receives
+                coherence measurements
+            maxsize: Queue capacity in events
+            backpressure: Policy when the queue is full ("block", "drop_oldest"
+                or "sample")
+            sample_rate: Fraction of events kept under "sample" backpressure
+            batch_size: Maximum events moved to the executor at once
+            executor: Executor running batches and analysis (default: the
+                event loop's default executor)
+            seed: Random seed for "sample" backpressure
+        """
+        if backpressure not in self.BACKPRESSURE:
+            raise ValueError(f"Unknown backpressure policy: {backpressure}")
+        if maxsize < 1:
+            raise ValueError("Queue size must be at least 1")
+        self.recorder = ConcurrentRecorder(residue_tensor, coherence_function, batch_size)
+        self.maxsize = maxsize
+        self.backpressure = backpressure
+        self.sample_rate = sample_rate
+        self.batch_size = batch_size
+        self.executor = executor
+        self.dropped = 0  # Events discarded by backpressure
+        self.error: Optional[BaseException] = None  # First recording error not yet re-raised
+
+        self._random = random.Random(seed)
+        self._queue: Optional[asyncio.Queue] = None
+        self._drainer: Optional[asyncio.Task] = None
+        self._snapshot: Optional[asyncio.Future] = None
+
+    async def start(self) -> None:
+        """Start the drain task on the running event loop."""
+        if self._drainer is None:
+            self._queue = asyncio.Queue(self.maxsize)
+            self._drainer = asyncio.get_running_loop().create_task(self._drain())
+
+    async def close(self) -> None:
+        """Apply all queued events and stop the drain task."""
+        if self._drainer is None:
+            return
+        try:
+            await self.join()
+        finally:
+            self._drainer.cancel()
+            try:
+                await self._drainer
+            except asyncio.CancelledError:
+                pass
+            self._drainer = None
+
+    async def __aenter__(self) -> "AsyncResidueRecorder":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    async def _put(self, event: tuple) -> None:
+        """Enqueue one event according to the backpressure policy."""
+        if self._drainer is None:
+            await self.start()
+        queue = self._queue
+
+        if self.backpressure == "block":
+            await queue.put(event)
+            return
+        if self.backpressure == "sample" and queue.qsize() >= self.maxsize // 2:
+            if queue.full() or self._random.random() >= self.sample_rate:
+                self.dropped += 1
+                return
+        elif queue.full():
+            # drop_oldest
+            queue.get_nowait()
+            queue.task_done()
+            self.dropped += 1
+        queue.put_nowait(event)
+
+    async def _drain(self) -> None:
+        """Move queued events to the executor in batches."""
+        loop = asyncio.get_running_loop()
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < self.batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+            try:
+                await loop.run_in_executor(self.executor, self._apply, batch)
+            except Exception as error:
+                # Keep draining; the error surfaces from join/snapshot/close
+                if self.error is None:
+                    self.error = error
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    def _apply(self, batch: List[tuple]) -> None:
+        """
+        Record a batch of events and flush them (runs on the executor).
+
+        Events after a failing one are still recorded; the first error is
+        raised once the batch is flushed.
+        """
+        recorder = self.recorder
+        error = None
+        for method, args, kwargs in batch:
+            try:
+                getattr(recorder, method)(*args, **kwargs)
+            except Exception as event_error:
+                error = error or event_error
+        recorder.flush()
+        if error is not None:
+            raise error
+
+    def _raise_error(self) -> None:
+        """Re-raise (and clear) the first error of the drain task."""
+        error, self.error = self.error, None
+        if error is not None:
+            raise error
+
+    def _step(self) -> int:
+        return self.recorder._step(None)
+
+    async def record_attribution_void(self,
+                                      layer: int,
+                                      token_position: int,
+                                      depth: int,
+                                      magnitude: float,
+                                      metadata: Dict[str, Any] = None) -> None:
+        """Enqueue an Attribution Void (see `SymbolicResidueTensor.record_attribution_void`)."""
+        await self._put(("record_attribution_void", (layer, token_position, depth, magnitude),
+                         {"metadata": metadata, "step": self._step()}))
+
+    async def record_token_hesitation(self,
+                                      token_position: int,
+                                      entropy: float,
+                                      oscillation: float,
+                                      splitting: float,
+                                      depth: int,
+                                      metadata: Dict[str, Any] = None) -> None:
+        """Enqueue a Token Hesitation (see `SymbolicResidueTensor.record_token_hesitation`)."""
+        await self._put(("record_token_hesitation", (token_position, entropy, oscillation, splitting, depth),
+                         {"metadata": metadata, "step": self._step()}))
+
+    async def record_recursive_collapse(self,
+                                        depth: int,
+                                        coherence: float,
+                                        collapse_threshold: float,
+                                        severity: float,
+                                        affected_circuits: List[int],
+                                        metadata: Dict[str, Any] = None) -> None:
+        """Enqueue a Recursive Collapse (see `SymbolicResidueTensor.record_recursive_collapse`)."""
+        await self._put(("record_recursive_collapse",
+                         (depth, coherence, collapse_threshold, severity, list(affected_circuits)),
+                         {"metadata": metadata, "step": self._step()}))
+
+    async def record_coherence(self, *values: float) -> None:
+        """Enqueue one coherence history record (values in CoherenceHistory.COLUMNS order)."""
+        await self._put(("record_coherence", values, {}))
+
+    async def measure_coherence(self, *args: Any) -> Dict[str, float]:
+        """
+        Measure coherence inline (a few float operations) and enqueue the result.
+
+        Takes the arguments of `RecursiveCoherenceFunction.measure_coherence`.
+
+        Returns:
+            Dictionary with overall coherence and component values
+        """
+        values = self.recorder.coherence_function.measure_coherence_fast(*args)
+        await self.record_coherence(*values)
+        return dict(zip(("coherence", "signal_alignment", "feedback_responsiveness",
+                         "bounded_integrity", "elastic_tolerance"), values))
+
+    async def join(self) -> None:
+        """
+        Wait until every event enqueued so far has been applied.
+
+        Raises:
+            Exception: The first error raised while recording queued events
+        """
+        if self._queue is not None:
+            await self._queue.join()
+        self._raise_error()
+
+    async def snapshot(self) -> Dict[str, Any]:
+        """
+        Get the residue analysis of all events applied so far.
+
+        Runs `analyze_residue_pattern` on the executor only when events were
+        applied since the last snapshot, and concurrent callers share one run.
+        Events still queued are not waited for (see `join`).
+
+        Returns:
+            Cached result of `analyze_residue_pattern`
+
+        Raises:
+            Exception: The first error raised while recording queued events
+        """
+        self._raise_error()
+        recorder = self.recorder
+        if recorder._analysis_version == recorder.version and recorder._analysis is not None:
+            return recorder._analysis
+        if self._snapshot is None or self._snapshot.done():
+            loop = asyncio.get_running_loop()
+            self._snapshot = loop.run_in_executor(self.executor, recorder.analyze)
+        return await asyncio.shield(self._snapshot)
+
+    async def coherence_history(self) -> Dict[str, np.ndarray]:
+        """Get a copy of the coherence history of all events applied so far."""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, self.recorder.coherence_history)
+
+
+def _metadata_key(metadata: Optional[Dict[str, Any]]) -> str:
+    return json.dumps(metadata, sort_keys=True, default=repr) if metadata else "{}"
+
+
+if __name__ == "__main__":
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+
+    config = {"layers": 24, "tokens": 512, "depths": 5}
+    events_per_thread = 200000
+
+    def run(thread_count: int, concurrent: bool) -> float:
+        """Record from `thread_count` threads; returns events per second."""
+        residue_tensor = SymbolicResidueTensor(dict(config))
+        coherence_function = RecursiveCoherenceFunction()
+        recorder = ConcurrentRecorder(residue_tensor, coherence_function)
+        lock = threading.Lock()
+        count = events_per_thread // thread_count
+
+        def worker(seed: int) -> None:
+            rng = np.random.default_rng(seed)
+            layers = rng.integers(0, 24, count).tolist()
+            tokens = rng.integers(0, 512, count).tolist()
+            depths = rng.integers(0, 5, count).tolist()
+            magnitudes = rng.random(count).tolist()
+            for i in range(count):
+                if concurrent:
+                    recorder.record_attribution_void(layers[i], tokens[i], depths[i], magnitudes[i])
+                    if i % 8 == 0:
+                        recorder.record_coherence(0.5, 0.9, 0.8, 0.9, 0.8)
+                else:
+                    # Baseline: one global lock around every call
+                    with lock:
+                        residue_tensor.record_attribution_void(layers[i], tokens[i], depths[i], magnitudes[i])
+                        if i % 8 == 0:
+                            coherence_function.history.append(0.5, 0.9, 0.8, 0.9, 0.8)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(thread_count) as pool:
+            list(pool.map(worker, range(thread_count)))
+        recorder.flush()
+        elapsed = time.perf_counter() - start
+
+        assert len(residue_tensor.attribution_voids) == count * thread_count
+        return count * thread_count / elapsed
+
+    print("Recording throughput (attribution voids/s)")
+    for thread_count in (1, 8, 32):
+        locked = run(thread_count, concurrent=False)
+        staged = run(thread_count, concurrent=True)
+        print(f"  {thread_count:2d} threads: global lock {locked:10,.0f}   "
+              f"staged batches {staged:10,.0f}   ({staged / locked:.1f}x)")
+
+    async def serve(backpressure: str) -> None:
+        """Simulated token loop: record hesitations, snapshot every 1000 steps."""
+        residue_tensor = SymbolicResidueTensor({"layers": 48, "tokens": 2048, "depths": 8})
+        rng = np.random.default_rng(0)
+        slowest = 0.0
+        start = time.perf_counter()
+        async with AsyncResidueRecorder(residue_tensor, maxsize=2048, backpressure=backpressure,
+                                        seed=0) as recorder:
+            for step in range(20000):
+                tick = time.perf_counter()
+                residue_tensor.config["current_step"] = step
+                await recorder.record_token_hesitation(int(rng.integers(0, 2048)), float(rng.random()),
+                                                       0.1, 0.2, int(rng.integers(0, 8)))
+                if step % 1000 == 999:
+                    await recorder.snapshot()
+                await asyncio.sleep(0)  # Rest of the (simulated) token step
+                slowest = max(slowest, time.perf_counter() - tick)
+            analysis = await recorder.snapshot()
+        print(f"  {backpressure:11s}: {time.perf_counter() - start:.2f} s, "
+              f"{len(residue_tensor.token_hesitations)} recorded, {recorder.dropped} dropped, "
+              f"slowest loop step {slowest * 1e3:.1f} ms, signature {analysis.get('primary_signature')}")
+
+    print("Async recording (20000 hesitations, snapshot every 1000)")
+    for backpressure in AsyncResidueRecorder.BACKPRESSURE:
+        asyncio.run(serve(backpressure))
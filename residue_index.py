@@ -0,0 +1,424 @@
+"""
+Residue Incident Index
+
+This module implements a persistent nearest-neighbour index over residue signature
+feature vectors, so that a new run can be compared against every past run rather
+than only against the reference signatures.
+"""
+
+import json
+import os
+import numpy as np
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+class ResidueIndex:
+    """
+    Append-only, memory-mapped index of residue feature vectors.
+
+    Vectors are stored unit-normalized as float32 rows in a raw file, so cosine
+    similarity is a dot product. Exact search scans the memory-mapped rows in
+    blocks. For approximate search every row is hashed into one of 2**hash_bits
+    cells by the signs of random hyperplane projections (SimHash); each insert
+    batch becomes a segment whose rows are also stored grouped by cell, so a
+    query only reads the contiguous cells whose hash is closest to its own.
+    Segments are merged like a binary counter, so there are O(log n) of them.
+
+    Rewriting the header is the commit point of every change: appended bytes
+    past the committed count and segment files it does not list are discarded
+    on the next open, and merged segments are written to new files, so an
+    interrupted add or merge leaves the previous state intact.
+
+    Directory layout:
+        index.json        - dimension, hash settings, committed count and segments
+        vectors.f32       - [count, dim] float32 unit vectors
+        keys.jsonl        - one JSON key per row (run path, metadata, ...)
+        keys.i64          - [count] end offset of each key in keys.jsonl
+        segment-<id>.i64  - row numbers of one segment, grouped by cell
+        segment-<id>.f32  - unit vectors of one segment in the same order
+    """
+
+    def __init__(self, directory: str, dim: Optional[int] = None, hash_bits: int = 8, seed: int = 0):
+        """
+        Open an index, creating it if the directory holds none.
+
+        Args:
+            directory: Index directory
+            dim: Feature dimension (required when creating; checked when opening)
+            hash_bits: Hyperplanes per SimHash code of a new index (2**hash_bits cells)
+            seed: Seed for the hyperplanes of a new index
+        """
+        self.directory = directory
+        self._header_path = os.path.join(directory, "index.json")
+        self._vectors_path = os.path.join(directory, "vectors.f32")
+        self._keys_path = os.path.join(directory, "keys.jsonl")
+        self._key_ends_path = os.path.join(directory, "keys.i64")
+
+        if os.path.exists(self._header_path):
+            with open(self._header_path) as f:
+                header = json.load(f)
+            if dim is not None and dim != header["dim"]:
+                raise ValueError(f"Index dimension is {header['dim']}, not {dim}")
+        else:
+            if dim is None:
+                raise ValueError("A new index requires a feature dimension")
+            if not 1 <= hash_bits <= 16:
+                raise ValueError("hash_bits must be between 1 and 16")
+            os.makedirs(directory, exist_ok=True)
+            header = {"dim": int(dim), "hash_bits": int(hash_bits), "seed": int(seed),
+                      "count": 0, "next_segment": 0, "segments": []}
+
+        self.dim = header["dim"]
+        self.hash_bits = header["hash_bits"]
+        self.seed = header["seed"]
+        self.count = header["count"]
+        self.next_segment = header["next_segment"]
+        # Each segment is (first row, file id, cell offsets [cells + 1]) over its rows
+        self.segments = [(start, segment_id, np.array(offsets))
+                         for start, segment_id, offsets in header["segments"]]
+        self.planes = np.random.default_rng(self.seed).standard_normal(
+            (self.dim, self.hash_bits)).astype(np.float32)
+        # Hamming weight of every cell code, for probing on any NumPy version
+        self._popcount = (np.arange(self.n_cells)[:, None] >> np.arange(self.hash_bits) & 1).sum(axis=1)
+
+        self._vectors = None
+        self._key_ends = None
+        self._key_bytes = None
+        self._segment_maps = {}
+        self._write_header()
+        self._discard_uncommitted()
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def n_cells(self) -> int:
+        """Number of hash cells."""
+        return 1 << self.hash_bits
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """Read-only memory map of the stored unit vectors [count, dim]."""
+        if self._vectors is None:
+            self._vectors = self._map(self._vectors_path, np.float32, (self.count, self.dim))
+        return self._vectors
+
+    def segment(self, i: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Read-only memory maps of one segment.
+
+        Args:
+            i: Segment number
+
+        Returns:
+            Tuple of (row numbers [size], unit vectors [size, dim]), grouped by cell
+        """
+        _, segment_id, offsets = self.segments[i]
+        if segment_id not in self._segment_maps:
+            path = self._segment_path(segment_id)
+            size = int(offsets[-1])
+            self._segment_maps[segment_id] = (np.memmap(path + ".i64", dtype=np.int64, mode="r", shape=(size,)),
+                                              np.memmap(path + ".f32", dtype=np.float32, mode="r",
+                                                        shape=(size, self.dim)))
+        return self._segment_maps[segment_id]
+
+    def key(self, i: int) -> Any:
+        """Get the key stored with row `i` (read from disk on each call)."""
+        i = range(self.count)[i]
+        if self._key_ends is None:
+            self._key_ends = self._map(self._key_ends_path, np.int64, (self.count,))
+            self._key_bytes = self._map(self._keys_path, np.uint8, (int(self._key_ends[-1]) if self.count else 0,))
+        lo = int(self._key_ends[i - 1]) if i else 0
+        return json.loads(bytes(self._key_bytes[lo:int(self._key_ends[i])]))
+
+    def add(self, vectors: np.ndarray, keys: Optional[Iterable[Any]] = None) -> np.ndarray:
+        """
+        Append feature vectors to the index.
+
+        Args:
+            vectors: Feature vectors [n, dim] (or a single vector [dim])
+            keys: JSON-serializable key per vector (default: row number)
+
+        Returns:
+            Row numbers assigned to the new vectors
+        """
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        if vectors.ndim != 2 or vectors.shape[1] != self.dim:
+            raise ValueError(f"Expected vectors of shape [n, {self.dim}]")
+        n = len(vectors)
+        rows = np.arange(self.count, self.count + n)
+        keys = rows.tolist() if keys is None else list(keys)
+        if len(keys) != n:
+            raise ValueError("Expected one key per vector")
+        if n == 0:
+            return rows
+
+        unit = self.normalize(vectors)
+        lines = [(json.dumps(key) + "\n").encode() for key in keys]
+
+        self._discard_uncommitted()
+        key_end = os.path.getsize(self._keys_path) if os.path.exists(self._keys_path) else 0
+        with open(self._vectors_path, "ab") as f:
+            unit.tofile(f)
+        with open(self._keys_path, "ab") as f:
+            f.writelines(lines)
+        with open(self._key_ends_path, "ab") as f:
+            (key_end + np.cumsum([len(line) for line in lines], dtype=np.int64)).tofile(f)
+
+        # The new rows and the trailing segments they merge with become one new segment
+        merged = self._merge_count(n)
+        start = self.segments[-merged][0] if merged else self.count
+        if merged:
+            unit = np.concatenate([np.asarray(self.vectors[start:]), unit])
+        order, offsets = self._segment(self.cells(unit))
+        path = self._segment_path(self.next_segment)
+        with open(path + ".i64", "wb") as f:
+            (start + order).tofile(f)
+        with open(path + ".f32", "wb") as f:
+            unit[order].tofile(f)
+
+        # The header is written last, so rows only count once fully stored
+        replaced = [segment_id for _, segment_id, _ in self.segments[len(self.segments) - merged:]]
+        self.segments[len(self.segments) - merged:] = [(start, self.next_segment, offsets)]
+        self.next_segment += 1
+        self.count += n
+        self._vectors = None
+        self._key_ends = None
+        self._key_bytes = None
+        self._write_header()
+        for segment_id in replaced:
+            self._segment_maps.pop(segment_id, None)
+            self._remove_segment(segment_id)
+        return rows
+
+    def add_tensor(self, residue_tensor, key: Any = None) -> int:
+        """
+        Add the signature features of a residue tensor.
+
+        Args:
+            residue_tensor: SymbolicResidueTensor to index
+            key: Key stored with the entry
+
+        Returns:
+            Row number of the new entry
+        """
+        return int(self.add(residue_tensor.residue_features()[None, :], [key])[0])
+
+    def add_saved_runs(self, paths: Iterable[str]) -> np.ndarray:
+        """
+        Index the feature vectors recorded in saved residue tensors.
+
+        The vectors are read from each save's cached analysis, so the tensors are
+        only loaded for saves written without one.
+
+        Args:
+            paths: Tensors written by SymbolicResidueTensor.save
+
+        Returns:
+            Row numbers assigned to the runs
+        """
+        from tensor import SymbolicResidueTensor
+
+        paths = list(paths)
+        features = []
+        for path in paths:
+            analysis = SymbolicResidueTensor.load_analysis(path)
+            if analysis and "signature_details" in analysis:
+                features.append(analysis["signature_details"]["feature_vector"])
+            else:
+                residue_tensor = SymbolicResidueTensor()
+                residue_tensor.load(path, mmap=True)
+                features.append(residue_tensor.residue_features())
+        if not paths:
+            return np.zeros(0, dtype=int)
+        return self.add(np.array(features), [{"path": path} for path in paths])
+
+    def search(self,
+               queries: np.ndarray,
+               k: int = 10,
+               approximate: bool = False,
+               probes: int = 8,
+               block_size: int = 65536) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the k most cosine-similar stored vectors for each query.
+
+        Args:
+            queries: Query feature vectors [q, dim] (or a single vector [dim])
+            k: Number of neighbours per query
+            approximate: Only score rows in the `probes` hash cells closest to
+                each query's own cell (by Hamming distance)
+            probes: Cells scored per query in approximate mode
+            block_size: Rows scored per block
+
+        Returns:
+            Tuple of (rows, similarities), each [q, min(k, count)], best first;
+            approximate searches pad missing neighbours with row -1
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        if queries.shape[1] != self.dim:
+            raise ValueError(f"Expected queries of shape [q, {self.dim}]")
+        unit = self.normalize(queries)
+        k = min(k, self.count)
+
+        if not approximate:
+            blocks = ((np.arange(lo, min(lo + block_size, self.count)), self.vectors[lo:lo + block_size])
+                      for lo in range(0, self.count, block_size))
+            return self._top_k(unit, blocks, k)
+
+        rows = np.full((len(unit), k), -1, dtype=np.int64)
+        similarities = np.full((len(unit), k), -np.inf, dtype=np.float32)
+        probed_cells = self._probe(self.cells(unit), probes)
+        for q in range(len(unit)):
+            # Each probed cell is one contiguous slice per segment
+            ranges = [(i, offsets[cell], offsets[cell + 1])
+                      for i, (_, _, offsets) in enumerate(self.segments) for cell in probed_cells[q]]
+            blocks = ((self.segment(i)[0][lo:hi], self.segment(i)[1][lo:hi]) for i, lo, hi in ranges if hi > lo)
+            found, scores = self._top_k(unit[q:q + 1], blocks, k)
+            rows[q, :found.shape[1]] = found[0]
+            similarities[q, :found.shape[1]] = scores[0]
+        return rows, similarities
+
+    def nearest(self, query: np.ndarray, k: int = 10, approximate: bool = False) -> List[Dict[str, Any]]:
+        """
+        Find the past runs most similar to one feature vector.
+
+        Args:
+            query: Feature vector [dim]
+            k: Number of neighbours
+            approximate: Use the approximate search mode
+
+        Returns:
+            List of {"row", "key", "similarity"} dictionaries, best first
+        """
+        rows, similarities = self.search(query, k=k, approximate=approximate)
+        return [{"row": int(row), "key": self.key(int(row)), "similarity": float(similarity)}
+                for row, similarity in zip(rows[0], similarities[0]) if row >= 0]
+
+    def normalize(self, vectors: np.ndarray) -> np.ndarray:
+        """Scale rows to unit length (zero rows stay zero)."""
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return (vectors / np.where(norms > 0, norms, 1)).astype(np.float32)
+
+    def cells(self, unit: np.ndarray) -> np.ndarray:
+        """Hash unit vectors to cells (one sign bit per hyperplane)."""
+        bits = (unit @ self.planes) > 0
+        return bits @ (1 << np.arange(self.hash_bits))
+
+    def _probe(self, query_cells: np.ndarray, probes: int) -> np.ndarray:
+        """Pick the `probes` cells nearest (in Hamming distance) to each query cell."""
+        distances = self._popcount[query_cells[:, None] ^ np.arange(self.n_cells)[None, :]]
+        return np.argsort(distances, axis=1, kind="stable")[:, :min(probes, self.n_cells)]
+
+    def _segment(self, cells: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Group rows by cell: (row order, cell offsets)."""
+        order = np.argsort(cells, kind="stable")
+        offsets = np.zeros(self.n_cells + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cells, minlength=self.n_cells), out=offsets[1:])
+        return order, offsets
+
+    def _merge_count(self, n: int) -> int:
+        """Number of trailing segments a new segment of `n` rows merges with.
+
+        Segments merge while the newest is at least as large as the one before.
+        """
+        merged = 0
+        while merged < len(self.segments) and n >= self.segments[-merged - 1][2][-1]:
+            n += int(self.segments[-merged - 1][2][-1])
+            merged += 1
+        return merged
+
+    def _top_k(self, unit: np.ndarray, blocks: Iterable[Tuple[np.ndarray, np.ndarray]],
+               k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Exact top-k of unit queries over (row numbers, vectors) blocks."""
+        best_rows = np.zeros((len(unit), 0), dtype=np.int64)
+        best_scores = np.zeros((len(unit), 0), dtype=np.float32)
+        for block, vectors in blocks:
+            scores = np.concatenate([best_scores, unit @ vectors.T], axis=1)
+            block_rows = np.concatenate([best_rows, np.broadcast_to(block, (len(unit), len(block)))], axis=1)
+            if scores.shape[1] > k:
+                keep = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+                scores = np.take_along_axis(scores, keep, axis=1)
+                block_rows = np.take_along_axis(block_rows, keep, axis=1)
+            best_scores, best_rows = scores, block_rows
+
+        order = np.argsort(-best_scores, axis=1, kind="stable")
+        return np.take_along_axis(best_rows, order, axis=1), np.take_along_axis(best_scores, order, axis=1)
+
+    def _map(self, path: str, dtype, shape: Tuple[int, ...]) -> np.ndarray:
+        """Memory-map the committed part of a raw file."""
+        if self.count == 0:
+            return np.zeros(shape, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode="r", shape=shape)
+
+    def _truncate(self, path: str, size: int) -> None:
+        """Cut a raw file back to `size` bytes if it is longer."""
+        if os.path.exists(path) and os.path.getsize(path) > size:
+            os.truncate(path, size)
+
+    def _segment_path(self, segment_id: int) -> str:
+        """Path of a segment's files, without the extension."""
+        return os.path.join(self.directory, f"segment-{segment_id}")
+
+    def _remove_segment(self, segment_id: int) -> None:
+        """Delete a segment's files."""
+        for extension in (".i64", ".f32"):
+            path = self._segment_path(segment_id) + extension
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _discard_uncommitted(self) -> None:
+        """Drop rows, keys and segment files written by an interrupted add or merge."""
+        self._truncate(self._vectors_path, self.count * self.dim * 4)
+        self._truncate(self._key_ends_path, self.count * 8)
+        key_end = int(self._map(self._key_ends_path, np.int64, (self.count,))[-1]) if self.count else 0
+        self._truncate(self._keys_path, key_end)
+
+        committed = {f"segment-{segment_id}{extension}" for _, segment_id, _ in self.segments
+                     for extension in (".i64", ".f32")}
+        for name in os.listdir(self.directory):
+            if name.startswith("segment-") and name not in committed:
+                os.remove(os.path.join(self.directory, name))
+
+    def _write_header(self) -> None:
+        """Atomically replace the header with the current count and segments."""
+        header = {"dim": self.dim, "hash_bits": self.hash_bits, "seed": self.seed, "count": self.count,
+                  "next_segment": self.next_segment,
+                  "segments": [(start, segment_id, offsets.tolist()) for start, segment_id, offsets in self.segments]}
+        tmp = self._header_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(header, f)
+        os.replace(tmp, self._header_path)
+
+
+# Example usage
+if __name__ == "__main__":
+    import tempfile
+    import time
+
+    rng = np.random.default_rng(0)
+    centers = rng.standard_normal((64, 7))
+    labels = rng.integers(0, len(centers), 1_000_000)
+    features = centers[labels] + 0.3 * rng.standard_normal((len(labels), 7))
+
+    with tempfile.TemporaryDirectory() as directory:
+        index = ResidueIndex(directory, dim=7)
+        for lo in range(0, len(features), 250_000):
+            index.add(features[lo:lo + 250_000], [{"run": i} for i in range(lo, min(lo + 250_000, len(features)))])
+
+        # Reopening maps the stored vectors instead of loading them
+        index = ResidueIndex(directory)
+        queries = centers[:16] + 0.3 * rng.standard_normal((16, 7))
+
+        start = time.perf_counter()
+        exact_rows, _ = index.search(queries, k=10)
+        exact_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        approx_rows, _ = index.search(queries, k=10, approximate=True)
+        approx_time = time.perf_counter() - start
+
+        recall = np.mean([len(np.intersect1d(a, e)) / 10 for a, e in zip(approx_rows, exact_rows)])
+        print(f"{len(index)} entries")
+        print(f"exact search:       {exact_time * 1e3:.1f} ms for {len(queries)} queries")
+        print(f"approximate search: {approx_time * 1e3:.1f} ms for {len(queries)} queries (recall@10 {recall:.2f})")
+        print("Nearest runs:", index.nearest(queries[0], k=3))
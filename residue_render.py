@@ -0,0 +1,333 @@
+"""
+Residue Rendering
+
+This module implements a headless renderer for the six-panel residue figure of
+`SymbolicResidueTensor.visualize_residue`. Panels are built from the tensor's
+cached marginals, the token axis is pooled down to the output pixel width, figures
+are reused across calls, and rendering can run in a background process pool.
+"""
+
+import math
+import numpy as np
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+
+RESIDUE_LABELS = ['Attribution Voids', 'Token Hesitations', 'Recursive Collapses']
+POOLING_METHODS = ('max', 'mean')
+
+
+def pool_tokens(heatmap: np.ndarray, width: Optional[int], method: str = 'max') -> np.ndarray:
+    """
+    Pool the last (token) axis of a heatmap down to at most `width` columns.
+
+    Args:
+        heatmap: Array [rows, tokens]
+        width: Maximum number of columns (None keeps every token)
+        method: "max" or "mean" over each group of adjacent tokens
+
+    Returns:
+        Pooled heatmap [rows, ceil(tokens / factor)] (the input if already narrow)
+    """
+    if method not in POOLING_METHODS:
+        raise ValueError(f"Unknown pooling method: {method}")
+    tokens = heatmap.shape[-1]
+    if width is None or tokens <= width:
+        return heatmap
+
+    factor = math.ceil(tokens / width)
+    columns = math.ceil(tokens / factor)
+    padded = np.full(heatmap.shape[:-1] + (columns * factor,), np.nan)
+    padded[..., :tokens] = heatmap
+    grouped = padded.reshape(heatmap.shape[:-1] + (columns, factor))
+    return np.nanmax(grouped, axis=-1) if method == 'max' else np.nanmean(grouped, axis=-1)
+
+
+def residue_panels(marginals, max_tokens: Optional[int] = None, pooling: str = 'max') -> Dict[str, Any]:
+    """
+    Collect the data of the six residue panels from cached marginals.
+
+    The result only holds small arrays, so it is cheap to send to a worker process.
+
+    Args:
+        marginals: ResidueMarginals of the tensor
+        max_tokens: Maximum token columns per heatmap (None keeps every token)
+        pooling: Token pooling method ("max" or "mean")
+
+    Returns:
+        Dictionary of panel arrays and the number of token positions
+    """
+    # Token panels only cover the populated extent of a growable token axis
+    tokens = max(marginals.extent, 1)
+    return {
+        "attribution": pool_tokens(marginals.layer_token[:, :tokens], max_tokens, pooling),  # Sum over depths
+        "hesitation": pool_tokens(marginals.token_depth[:tokens].T, max_tokens, pooling),  # Sum over layers
+        "collapse": marginals.layer_depth.copy(),  # Sum over tokens
+        "depth": marginals.depth.copy(),
+        "layer": marginals.layer.copy(),
+        "total": marginals.total.copy(),
+        "tokens": tokens,
+    }
+
+
+def draw_residue_panels(fig, panels: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Draw the six residue panels onto an (empty) matplotlib figure.
+
+    Args:
+        fig: Figure to draw on
+        panels: Panel data from `residue_panels`
+
+    Returns:
+        Dictionary of the artists that `update_residue_panels` changes in place
+    """
+    axes = [fig.add_subplot(231 + i) for i in range(6)]
+    artists = {"axes": axes, "shapes": _panel_shapes(panels)}
+
+    # 1-3. Heatmaps (token axes keep token-position units when pooled)
+    heatmaps = [
+        ("attribution", 'Blues', 'Attribution Voids', 'Token Position', 'Layer'),
+        ("hesitation", 'Reds', 'Token Hesitations', 'Token Position', 'Recursive Depth'),
+        ("collapse", 'Greens', 'Recursive Collapses', 'Recursive Depth', 'Layer'),
+    ]
+    for ax, (name, cmap, title, xlabel, ylabel) in zip(axes, heatmaps):
+        image = ax.imshow(panels[name], cmap=cmap, **_token_extent(panels, name))
+        ax.set_title(title)
+        ax.set_xlabel(xlabel)
+        ax.set_ylabel(ylabel)
+        artists[name] = (image, fig.colorbar(image, ax=ax))
+
+    # 4. Line plot of residue by depth
+    depth_sums = panels["depth"]
+    artists["depth"] = [axes[3].plot(range(depth_sums.shape[1]), depth_sums[i], style, label=label)[0]
+                        for i, (style, label) in enumerate(zip(['b-', 'r-', 'g-'], RESIDUE_LABELS))]
+    axes[3].set_title('Residue by Recursive Depth')
+    axes[3].set_xlabel('Recursive Depth')
+    axes[3].set_ylabel('Total Residue')
+    axes[3].legend()
+
+    # 5. Stacked bar chart of residue by layer
+    layer_sums = panels["layer"]
+    bottoms = np.vstack([np.zeros(layer_sums.shape[1]), np.cumsum(layer_sums, axis=0)[:-1]])
+    artists["layer"] = [axes[4].bar(range(layer_sums.shape[1]), layer_sums[i], bottom=bottoms[i],
+                                    color=color, alpha=0.3, label=label)
+                        for i, (color, label) in enumerate(zip(['blue', 'red', 'green'], RESIDUE_LABELS))]
+    axes[4].set_title('Residue by Layer')
+    axes[4].set_xlabel('Layer')
+    axes[4].set_ylabel('Total Residue')
+    axes[4].legend()
+
+    _draw_pie(axes[5], panels["total"])
+    fig.tight_layout()
+    return artists
+
+
+def update_residue_panels(artists: Dict[str, Any], panels: Dict[str, Any]) -> None:
+    """
+    Update a figure drawn by `draw_residue_panels` with new panel data of the same shapes.
+
+    Args:
+        artists: Artists returned by `draw_residue_panels`
+        panels: New panel data from `residue_panels`
+    """
+    for name in ("attribution", "hesitation", "collapse"):
+        image, colorbar = artists[name]
+        image.set_data(panels[name])
+        image.autoscale()
+        colorbar.update_normal(image)
+
+    for line, values in zip(artists["depth"], panels["depth"]):
+        line.set_ydata(values)
+
+    bottoms = np.vstack([np.zeros(panels["layer"].shape[1]), np.cumsum(panels["layer"], axis=0)[:-1]])
+    for bars, heights, bottom in zip(artists["layer"], panels["layer"], bottoms):
+        for bar, height, y in zip(bars, heights, bottom):
+            bar.set_height(height)
+            bar.set_y(y)
+
+    for ax in artists["axes"][3:5]:
+        ax.relim()
+        ax.autoscale_view()
+
+    # Wedge geometry depends on every total, so the pie is simply redrawn
+    artists["axes"][5].clear()
+    _draw_pie(artists["axes"][5], panels["total"])
+
+
+def _draw_pie(ax, totals: np.ndarray) -> None:
+    """Draw the residue type distribution pie chart."""
+    ax.pie(list(totals), labels=RESIDUE_LABELS, autopct='%1.1f%%', startangle=90)
+    ax.set_title('Residue Type Distribution')
+
+
+def _token_extent(panels: Dict[str, Any], name: str) -> Dict[str, Any]:
+    """imshow keyword arguments mapping pooled columns back to token positions."""
+    if name == "collapse" or panels[name].shape[1] == panels["tokens"]:
+        return {}
+    rows = panels[name].shape[0]
+    return {"extent": (-0.5, panels["tokens"] - 0.5, rows - 0.5, -0.5), "aspect": 'auto'}
+
+
+def _panel_shapes(panels: Dict[str, Any]) -> Tuple:
+    shapes = tuple(np.shape(panels[name]) for name in ("attribution", "hesitation", "collapse", "layer"))
+    return shapes + (panels["tokens"],)  # Pooled token axes are labelled by position
+
+
+class ResidueRenderer:
+    """
+    Headless (Agg) renderer for residue panels that reuses one figure across calls.
+
+    The figure is built with the object-oriented API, so it never touches the
+    pyplot state machine and is safe to use off the main thread or in workers.
+    """
+
+    def __init__(self,
+                 figsize: Tuple[float, float] = (15, 10),
+                 dpi: int = 300,
+                 pooling: Optional[str] = 'max'):
+        """
+        Initialize the renderer.
+
+        Args:
+            figsize: Figure size in inches
+            dpi: Output resolution
+            pooling: Token pooling method ("max" or "mean", None for full resolution)
+        """
+        if pooling is not None and pooling not in POOLING_METHODS:
+            raise ValueError(f"Unknown pooling method: {pooling}")
+        self.figsize = figsize
+        self.dpi = dpi
+        self.pooling = pooling
+        self.figure = None
+        self.artists = None
+
+    @property
+    def max_tokens(self) -> Optional[int]:
+        """Token columns that fit the pixel width of one heatmap (a third of the figure)."""
+        if self.pooling is None:
+            return None
+        return max(1, int(self.figsize[0] * self.dpi / 3))
+
+    def panels(self, marginals) -> Dict[str, Any]:
+        """Collect panel data pooled to this renderer's output width."""
+        return residue_panels(marginals, self.max_tokens, self.pooling or 'max')
+
+    def render(self, panels: Dict[str, Any], output_path: str) -> None:
+        """
+        Render panel data to an image file.
+
+        Args:
+            panels: Panel data from `residue_panels` or `panels`
+            output_path: Image path (format from the extension)
+        """
+        from matplotlib.backends.backend_agg import FigureCanvasAgg  # Imported only when plotting
+        from matplotlib.figure import Figure
+
+        if self.figure is None:
+            self.figure = Figure(figsize=self.figsize)
+            FigureCanvasAgg(self.figure)
+
+        # Reuse the drawn figure unless the panel shapes changed
+        if self.artists is not None and self.artists["shapes"] == _panel_shapes(panels):
+            update_residue_panels(self.artists, panels)
+        else:
+            self.figure.clear()
+            self.artists = draw_residue_panels(self.figure, panels)
+            # Positions are fixed by tight_layout; without a layout engine savefig
+            # skips its extra layout draw
+            self.figure.set_layout_engine(None)
+
+        # Layout is already tight (no second draw for bbox_inches), and PNGs use
+        # fast compression since encoding dominates at high dpi
+        options = {"pil_kwargs": {"compress_level": 1}} if str(output_path).endswith(".png") else {}
+        self.figure.savefig(output_path, dpi=self.dpi, **options)
+
+
+# Per-process renderers of pool workers, keyed by options (figures are reused across tasks)
+_worker_renderers: Dict[Tuple, ResidueRenderer] = {}
+
+
+def _render_in_worker(panels: Dict[str, Any], output_path: str, options: Dict[str, Any]) -> str:
+    key = tuple(sorted(options.items()))
+    if key not in _worker_renderers:
+        _worker_renderers[key] = ResidueRenderer(**options)
+    _worker_renderers[key].render(panels, output_path)
+    return output_path
+
+
+class ResidueRenderPool:
+    """Background process pool rendering residue panels, one reused figure per worker."""
+
+    def __init__(self,
+                 workers: int = 1,
+                 figsize: Tuple[float, float] = (15, 10),
+                 dpi: int = 300,
+                 pooling: Optional[str] = 'max'):
+        """
+        Initialize the pool (worker processes start on first use).
+
+        Args:
+            workers: Number of worker processes
+            figsize: Figure size in inches
+            dpi: Output resolution
+            pooling: Token pooling method ("max" or "mean", None for full resolution)
+        """
+        self.options = {"figsize": tuple(figsize), "dpi": dpi, "pooling": pooling}
+        self.renderer = ResidueRenderer(**self.options)  # Only used to pool panel data
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+
+    def submit(self, marginals, output_path: str) -> Future:
+        """
+        Render the panels of a tensor's marginals in the background.
+
+        Panel data is collected (and pooled) in the caller, so later writes to
+        the tensor do not affect the queued image.
+
+        Args:
+            marginals: ResidueMarginals of the tensor
+            output_path: Image path
+
+        Returns:
+            Future resolving to `output_path` once the image is written
+        """
+        return self.executor.submit(_render_in_worker, self.renderer.panels(marginals), output_path, self.options)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker processes."""
+        self.executor.shutdown(wait=wait)
+
+
+# Example usage
+if __name__ == "__main__":
+    import os
+    import tempfile
+    import time
+    from tensor import SymbolicResidueTensor
+
+    residue_tensor = SymbolicResidueTensor({"layers": 24, "tokens": 32768, "depths": 5, "storage": "sparse"})
+    rng = np.random.default_rng(0)
+    n = 50000
+    residue_tensor.record_attribution_voids(rng.integers(0, 24, n), rng.integers(0, 32768, n),
+                                            rng.integers(0, 5, n), rng.random(n))
+    residue_tensor.record_token_hesitations(rng.integers(0, 32768, n), rng.random(n), rng.random(n),
+                                            rng.random(n), rng.integers(0, 5, n))
+
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        residue_tensor.visualize_residue(os.path.join(directory, "full.png"), show_plot=False, pooling=None)
+        print(f"Full-resolution render: {time.perf_counter() - start:.2f} s")
+
+        renderer = ResidueRenderer()
+        for i in range(3):
+            start = time.perf_counter()
+            renderer.render(renderer.panels(residue_tensor.marginals), os.path.join(directory, f"fast{i}.png"))
+            print(f"Pooled render {i} (figure {'reused' if i else 'built'}): {time.perf_counter() - start:.2f} s")
+
+        pool = ResidueRenderPool(workers=2)
+        start = time.perf_counter()
+        futures = [pool.submit(residue_tensor.marginals, os.path.join(directory, f"bg{i}.png")) for i in range(4)]
+        print(f"Background submit of 4 renders: {(time.perf_counter() - start) * 1e3:.1f} ms")
+        for future in futures:
+            future.result()
+        print(f"All 4 background renders done after {time.perf_counter() - start:.2f} s")
+        pool.shutdown()
@@ -0,0 +1,490 @@
+"""
+Shared Residue Tensor
+
+This module places a Symbolic Residue Tensor and its event columns in one shared
+buffer (`multiprocessing.shared_memory` or a memory-mapped file), so writer
+processes on one host can record into it in place while a reader process
+analyzes the combined state live.
+"""
+
+import json
+import os
+import numpy as np
+from contextlib import ExitStack, contextmanager, nullcontext
+from multiprocessing import shared_memory
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from tensor import (DenseResidueStorage, ResidueEventLog, ResidueMarginals,
+                    SymbolicResidueTensor, event_dtype)
+
+
+# Event kinds in tensor order, with their (fields, data width)
+SHARED_EVENT_KINDS = {
+    "attribution_void": (("layer", "token_position", "depth"), 1),
+    "token_hesitation": (("token_position", "depth"), 3),
+    "recursive_collapse": (("depth", "affected_circuits"), 3),
+}
+REGION_AXES = ("classes", "layers", "tokens", "depths")
+
+
+def _aligned(offset: int, alignment: int = 64) -> int:
+    return -(-offset // alignment) * alignment
+
+
+@contextmanager
+def hold_locks(locks: List[Any]) -> Iterator[None]:
+    """Hold several locks, acquired in list order (so callers never deadlock)."""
+    with ExitStack() as stack:
+        for lock in locks:
+            stack.enter_context(lock)
+        yield
+
+
+class SharedResidueStorage(DenseResidueStorage):
+    """
+    Dense residue storage over a shared array, with writer region ownership.
+
+    A writer owns a region given as inclusive (low, high) ranges per axis
+    ("classes", "layers", "tokens", "depths"; missing axes are unrestricted).
+
+    Without locks, writes must stay inside the region and take no lock, since
+    no other writer may touch those cells; writes reaching outside it are
+    rejected. With one lock per writer slot (the same list given to every
+    writer), writes inside the region hold the writer's own lock, and writes
+    reaching outside it (e.g. a collapse from a writer owning a token range)
+    hold every writer's lock. An overlapping read-modify-write therefore never
+    runs concurrently with the owner's own writes, so "add" and "max" updates
+    are never lost.
+    """
+
+    def __init__(self,
+                 array: np.ndarray,
+                 region: Optional[Dict[str, Tuple[int, int]]] = None,
+                 locks: Optional[List[Any]] = None,
+                 slot: int = 0):
+        """
+        Wrap a shared array.
+
+        Args:
+            array: Shared [residue_class, layer, token, depth] array
+            region: Owned inclusive ranges per axis (None owns the whole tensor,
+                which is only safe for a single writer)
+            locks: One lock per writer slot, shared by all writers (e.g.
+                multiprocessing.Lock objects passed to the writer processes when
+                they are started), or None to reject writes outside the region
+            slot: Writer slot whose lock guards the owned region
+        """
+        self.shape = tuple(array.shape)
+        self.dtype = array.dtype
+        self.array = array
+        self.locks = locks
+        self.slot = slot
+
+        region = region or {}
+        unknown = set(region) - set(REGION_AXES)
+        if unknown:
+            raise ValueError(f"Unknown region axes: {sorted(unknown)}")
+        self.region = [tuple(region.get(axis, (0, size - 1))) for axis, size in zip(REGION_AXES, self.shape)]
+
+    def owns(self, index: Tuple) -> bool:
+        """Check whether all cells at `index` lie inside the owned region."""
+        for positions, (low, high) in zip(index, self.region):
+            positions = np.asarray(positions)
+            if positions.size and (positions.min() < low or positions.max() > high):
+                return False
+        return True
+
+    def guard(self, index: Tuple):
+        """
+        Context held while cells at `index` are read, modified and written.
+
+        Returns:
+            Without locks a null context; with locks this writer's lock inside
+            the owned region, and every writer's lock outside it
+
+        Raises:
+            ValueError: If the cells leave the owned region and there are no locks
+        """
+        owned = self.owns(index)
+        if self.locks is None:
+            if not owned:
+                raise ValueError(f"Write outside the owned region {self.region} requires shared locks")
+            return nullcontext()
+        return self.locks[self.slot] if owned else hold_locks(self.locks)
+
+    def grow_tokens(self, tokens: int) -> None:
+        raise ValueError("The token axis of shared residue storage is fixed")
+
+
+class SharedEventLog(ResidueEventLog):
+    """
+    Fixed-capacity residue event log in one writer's slot of a shared buffer.
+
+    Rows, circuits and interned metadata (as JSON lines) live in the slot; the
+    row, circuit and metadata byte counts live in a shared counter array. Only
+    the owning writer appends, and it publishes the row count after the rows
+    are written, so readers never see partially written events.
+    """
+
+    def __init__(self,
+                 name: str,
+                 fields: Tuple[str, ...],
+                 data_width: int,
+                 records: np.ndarray,
+                 circuits: np.ndarray,
+                 metadata: np.ndarray,
+                 counters: np.ndarray):
+        """
+        Attach to a writer slot (existing events are kept).
+
+        Args:
+            name: Component name of the events
+            fields: Positional fields of the event kind
+            data_width: Number of data values per event
+            records: Shared row array of the slot
+            circuits: Shared flat circuit array of the slot
+            metadata: Shared byte array holding metadata JSON lines
+            counters: Shared [rows, circuits, metadata bytes] counters of the slot
+        """
+        self.name = name
+        self.fields = fields
+        self.data_width = data_width
+        self.dtype = event_dtype(fields, data_width)
+        self._records = records
+        self._circuits = circuits
+        self._metadata_bytes = metadata
+        self._counters = counters
+        self._metadata = [{}] + read_metadata(metadata, int(counters[2]))
+        self._metadata_ids = {json.dumps(m, sort_keys=True, default=repr): i
+                              for i, m in enumerate(self._metadata)}
+
+    @property
+    def _size(self) -> int:
+        return int(self._counters[0])
+
+    @_size.setter
+    def _size(self, value: int) -> None:
+        self._counters[0] = value
+
+    @property
+    def _circuit_size(self) -> int:
+        return int(self._counters[1])
+
+    @_circuit_size.setter
+    def _circuit_size(self, value: int) -> None:
+        self._counters[1] = value
+
+    def _reserve(self, rows: int, circuits: int = 0) -> None:
+        if self._size + rows > len(self._records):
+            raise ValueError(f"Shared {self.name} event slot is full ({len(self._records)} events)")
+        if self._circuit_size + circuits > len(self._circuits):
+            raise ValueError(f"Shared {self.name} circuit slot is full ({len(self._circuits)} circuits)")
+
+    def intern_metadata(self, metadata: Optional[Dict[str, Any]]) -> int:
+        """Get the id of a metadata dictionary, appending it to the slot on first use."""
+        if not metadata:
+            return 0
+        key = json.dumps(metadata, sort_keys=True, default=repr)
+        metadata_id = self._metadata_ids.get(key)
+        if metadata_id is None:
+            line = key.encode() + b"\n"
+            used = int(self._counters[2])
+            if used + len(line) > len(self._metadata_bytes):
+                raise ValueError(f"Shared {self.name} metadata slot is full ({len(self._metadata_bytes)} bytes)")
+            self._metadata_bytes[used:used + len(line)] = np.frombuffer(line, dtype=np.uint8)
+            self._counters[2] = used + len(line)
+            metadata_id = self._metadata_ids[key] = len(self._metadata)
+            self._metadata.append(json.loads(key))
+        return metadata_id
+
+    def clear(self) -> None:
+        """Drop all events of this slot."""
+        self._counters[:] = 0
+        self._metadata = [{}]
+        self._metadata_ids = {"{}": 0}
+
+    def restore(self, records: np.ndarray, circuits: np.ndarray, metadata: List[Dict[str, Any]]) -> None:
+        raise ValueError("Shared event slots cannot be restored; load into a regular tensor instead")
+
+
+def read_metadata(buffer: np.ndarray, used: int) -> List[Dict[str, Any]]:
+    """Parse the metadata JSON lines in the first `used` bytes of a slot."""
+    return [json.loads(line) for line in buffer[:used].tobytes().splitlines()]
+
+
+class SharedResidueBuffer:
+    """
+    One shared buffer holding a residue tensor and per-writer event slots.
+
+    Layout (each part 64-byte aligned):
+        tensor                               float64 [3, layers, tokens, depths]
+        per event kind:
+            counters                         int64 [writers, 3] (rows, circuits, metadata bytes)
+            records                          [writers, event_capacity] event rows
+            circuits                         int32 [writers, circuit_capacity]
+            metadata                         uint8 [writers, metadata_bytes]
+
+    Ownership: writer `i` is the only process appending to event slot `i`, so
+    events never need a lock. Tensor cells are owned through each writer's
+    region (see `SharedResidueStorage`): regions of different writers must be
+    disjoint, and cells outside a writer's region may only be written when all
+    writers share one lock per slot. The reader takes no lock; it sees every
+    published event, and tensor cells as of the moment each is read (pass the
+    `locks` to `refresh` to get a view that no write is midway through).
+
+    The creating process owns the buffer and must `unlink` it when done; other
+    processes `attach` using `spec` and only `close`.
+    """
+
+    def __init__(self,
+                 spec: Dict[str, Any],
+                 create: bool = False):
+        """
+        Create or attach to a shared buffer (use `create` / `attach`).
+
+        Args:
+            spec: Buffer layout (see `create`) plus its "name" or "path"
+            create: Allocate the buffer instead of attaching to it
+        """
+        self.spec = dict(spec)
+        self.shape = (3, spec["layers"], spec["tokens"], spec["depths"])
+        writers = spec["writers"]
+
+        # Offsets of each part within the buffer
+        parts = [("tensor", np.dtype(np.float64), self.shape)]
+        for kind, (fields, data_width) in SHARED_EVENT_KINDS.items():
+            parts += [
+                (f"{kind}.counters", np.dtype(np.int64), (writers, 3)),
+                (f"{kind}.records", event_dtype(fields, data_width), (writers, spec["event_capacity"])),
+                (f"{kind}.circuits", np.dtype(np.int32), (writers, spec["circuit_capacity"])),
+                (f"{kind}.metadata", np.dtype(np.uint8), (writers, spec["metadata_bytes"])),
+            ]
+        layout, size = [], 0
+        for name, dtype, shape in parts:
+            layout.append((name, dtype, shape, size))
+            size = _aligned(size + dtype.itemsize * int(np.prod(shape)))
+        self.nbytes = size
+
+        # Map the buffer
+        self._memory = None
+        if spec.get("path"):
+            if create:
+                with open(spec["path"], "wb") as file:
+                    file.truncate(size)
+            block = np.memmap(spec["path"], dtype=np.uint8, mode="r+", shape=(size,))
+        else:
+            self._memory = shared_memory.SharedMemory(name=spec.get("name"), create=create, size=size)
+            self.spec["name"] = self._memory.name
+            block = np.ndarray((size,), dtype=np.uint8, buffer=self._memory.buf)
+            if create:
+                block[:] = 0
+
+        self.arrays = {name: block[offset:offset + dtype.itemsize * int(np.prod(shape))].view(dtype).reshape(shape)
+                       for name, dtype, shape, offset in layout}
+        self._block = block
+
+    @classmethod
+    def create(cls,
+               config: Dict[str, Any],
+               writers: int,
+               event_capacity: int = 65536,
+               circuit_capacity: int = 65536,
+               metadata_bytes: int = 65536,
+               path: Optional[str] = None) -> "SharedResidueBuffer":
+        """
+        Allocate a zeroed shared buffer.
+
+        Args:
+            config: Tensor config (its layers, tokens and depths set the shape)
+            writers: Number of writer slots
+            event_capacity: Events per writer and event kind
+            circuit_capacity: Affected circuits per writer (collapse events)
+            metadata_bytes: Interned metadata JSON bytes per writer and event kind
+            path: Memory-map this file instead of using shared memory
+
+        Returns:
+            The new buffer, owned by this process
+        """
+        if writers < 1:
+            raise ValueError("A shared residue buffer needs at least one writer slot")
+        spec = {
+            "layers": config.get("layers", 12),
+            "tokens": config.get("tokens", 100),
+            "depths": config.get("depths", 5),
+            "writers": writers,
+            "event_capacity": event_capacity,
+            "circuit_capacity": circuit_capacity,
+            "metadata_bytes": metadata_bytes,
+            "path": path,
+        }
+        return cls(spec, create=True)
+
+    @classmethod
+    def attach(cls, spec: Dict[str, Any]) -> "SharedResidueBuffer":
+        """Attach to a buffer created in another process, given its `spec`."""
+        return cls(spec)
+
+    def _config(self, config: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        config = dict(config or {})
+        # The shared token axis cannot grow, so positions are clamped to it
+        config.update(layers=self.shape[1], tokens=self.shape[2], depths=self.shape[3], storage="dense",
+                      token_block=0)
+        return config
+
+    def writer(self,
+               slot: int,
+               config: Optional[Dict[str, Any]] = None,
+               region: Optional[Dict[str, Tuple[int, int]]] = None,
+               locks: Optional[List[Any]] = None) -> SymbolicResidueTensor:
+        """
+        Get a tensor recording into the shared buffer through one writer slot.
+
+        Its `record_*` methods write cells straight into the shared tensor and
+        events into the slot. Its marginals only cover this writer's own writes;
+        use `reader` / `refresh` for the combined analysis.
+
+        Args:
+            slot: Writer slot owned by the calling process
+            config: Tensor config (shape entries are taken from the buffer)
+            region: Owned inclusive ranges per axis (see `SharedResidueStorage`)
+            locks: One shared lock per writer slot (the same list for every
+                writer), needed for writes outside the region
+
+        Returns:
+            Writer tensor
+        """
+        if not 0 <= slot < self.spec["writers"]:
+            raise ValueError(f"Writer slot {slot} out of range (0-{self.spec['writers'] - 1})")
+        if locks is not None and len(locks) != self.spec["writers"]:
+            raise ValueError(f"Expected one lock per writer slot ({self.spec['writers']}), got {len(locks)}")
+
+        residue_tensor = SymbolicResidueTensor(self._config(config))
+        residue_tensor.storage = SharedResidueStorage(self.arrays["tensor"], region, locks, slot)
+        residue_tensor.marginals = ResidueMarginals(residue_tensor.storage.shape)
+        residue_tensor.events = {
+            kind: SharedEventLog(kind, fields, data_width,
+                                 self.arrays[f"{kind}.records"][slot],
+                                 self.arrays[f"{kind}.circuits"][slot],
+                                 self.arrays[f"{kind}.metadata"][slot],
+                                 self.arrays[f"{kind}.counters"][slot])
+            for kind, (fields, data_width) in SHARED_EVENT_KINDS.items()
+        }
+        return residue_tensor
+
+    def reader(self, config: Optional[Dict[str, Any]] = None) -> SymbolicResidueTensor:
+        """
+        Get a tensor over the shared cells for live analysis.
+
+        Args:
+            config: Tensor config (shape entries are taken from the buffer)
+
+        Returns:
+            Reader tensor, already refreshed once
+        """
+        residue_tensor = SymbolicResidueTensor(self._config(config))
+        residue_tensor.storage = SharedResidueStorage(self.arrays["tensor"])
+        self.refresh(residue_tensor)
+        return residue_tensor
+
+    def refresh(self, residue_tensor: SymbolicResidueTensor, locks: Optional[List[Any]] = None) -> None:
+        """
+        Bring a reader tensor up to date with all writers.
+
+        Marginals are recomputed from the shared cells, and the events of all
+        writer slots are merged (by timestamp) into the reader's own logs.
+
+        Args:
+            residue_tensor: Tensor from `reader`
+            locks: Writer locks to hold while reading, for a view without
+                half-applied writes
+        """
+        with hold_locks(locks or []):
+            residue_tensor.marginals = ResidueMarginals.from_storage(residue_tensor.storage)
+
+            for kind, (fields, data_width) in SHARED_EVENT_KINDS.items():
+                merged = ResidueEventLog(kind, fields, data_width)
+                counters = self.arrays[f"{kind}.counters"]
+                for slot in range(self.spec["writers"]):
+                    # Counts first: rows below a published count are complete
+                    rows, circuits, used = (int(c) for c in counters[slot])
+                    events = ResidueEventLog(kind, fields, data_width)
+                    events.restore(self.arrays[f"{kind}.records"][slot, :rows].copy(),
+                                   self.arrays[f"{kind}.circuits"][slot, :circuits].copy(),
+                                   [{}] + read_metadata(self.arrays[f"{kind}.metadata"][slot], used))
+                    merged.merge(events)
+                residue_tensor.events[kind] = merged
+
+    def close(self) -> None:
+        """Release this process's mapping of the buffer."""
+        self.arrays = {}
+        self._block = None
+        if self._memory is not None:
+            self._memory.close()
+
+    def unlink(self) -> None:
+        """Destroy the buffer (creating process only, after all writers are done)."""
+        if self._memory is not None:
+            self._memory.unlink()
+        elif self.spec.get("path") and os.path.exists(self.spec["path"]):
+            os.remove(self.spec["path"])
+
+
+def _example_writer(spec: Dict[str, Any], slot: int, locks: List[Any], steps: int) -> None:
+    """Writer process of the example below: owns one block of token positions."""
+    buffer = SharedResidueBuffer.attach(spec)
+    tokens = spec["tokens"] // spec["writers"]
+    low = slot * tokens
+    residue_tensor = buffer.writer(slot, {"current_step": 0}, region={"tokens": (low, low + tokens - 1)},
+                                   locks=locks)
+    rng = np.random.default_rng(slot)
+
+    for step in range(steps):
+        residue_tensor.config["current_step"] = step
+        residue_tensor.record_attribution_voids(rng.integers(0, spec["layers"], 64),
+                                                rng.integers(low, low + tokens, 64),
+                                                rng.integers(0, spec["depths"], 64),
+                                                rng.random(64), metadata={"writer": slot})
+        if step % 50 == 0:
+            # Spans every token, so it is written under every writer's lock
+            residue_tensor.record_recursive_collapse(depth=2, coherence=0.3, collapse_threshold=0.7,
+                                                     severity=0.5, affected_circuits=[slot])
+    buffer.close()
+
+
+if __name__ == "__main__":
+    import multiprocessing
+    import time
+
+    config = {"layers": 24, "tokens": 1024, "depths": 5}
+    writers, steps = 4, 500
+
+    buffer = SharedResidueBuffer.create(config, writers)
+    locks = [multiprocessing.Lock() for _ in range(writers)]
+    print(f"Shared buffer: {buffer.nbytes / 1e6:.1f} MB ({buffer.spec['name']})")
+
+    start = time.perf_counter()
+    processes = [multiprocessing.Process(target=_example_writer, args=(buffer.spec, slot, locks, steps))
+                 for slot in range(writers)]
+    for process in processes:
+        process.start()
+
+    # Analyze live while the writers run
+    reader = buffer.reader()
+    while any(process.is_alive() for process in processes):
+        buffer.refresh(reader)
+        analysis = reader.analyze_residue_pattern()
+        print(f"  live: {len(reader.attribution_voids)} voids, "
+              f"{len(reader.recursive_collapses)} collapses, "
+              f"signature {analysis['primary_signature']}")
+        time.sleep(0.2)
+    for process in processes:
+        process.join()
+    print(f"{writers} writers x {steps} steps in {time.perf_counter() - start:.2f} s")
+
+    buffer.refresh(reader)
+    print(f"Final: {len(reader.attribution_voids)} voids, {len(reader.recursive_collapses)} collapses, "
+          f"marginals exact: {np.allclose(reader.marginals.layer, reader.tensor.sum(axis=(2, 3)))}")
+
+    reader = None
+    buffer.close()
+    buffer.unlink()
@@ -5,12 +5,14 @@ This module implements the Symbolic Residue Tensor (RΣ) that captures and analy
 patterns of coherence breakdown across different dimensions.
 """
 
+import json
+import os
+import struct
 import numpy as np
-import torch
+from contextlib import nullcontext
+from collections.abc import Sequence
 from typing import Dict, List, Tuple, Optional, Union, Any
 from dataclasses import dataclass
-import matplotlib.pyplot as plt
-from scipy.spatial import distance
 
 
 @dataclass
@@ -25,12 +27,1000 @@ class ResidueComponent:
         return float(np.linalg.norm(self.data))
 
 
+def event_dtype(fields: Tuple[str, ...], data_width: int) -> np.dtype:
+    """
+    Build the packed row dtype for residue events with the given fields.
+    
+    Args:
+        fields: Positional fields of the event kind
+        data_width: Number of data values per event
+        
+    Returns:
+        Structured dtype with one typed column per field
+    """
+    columns = []
+    if "layer" in fields:
+        columns.append(("layer", np.int32))
+    if "token_position" in fields:
+        columns.append(("token_position", np.int32))
+    columns.append(("depth", np.int16))
+    columns.append(("timestamp", np.int64))
+    columns.append(("data", np.float64, (data_width,)))
+    if "affected_circuits" in fields:
+        # Circuits live in a shared flat array
+        columns.append(("circuit_offset", np.int64))
+        columns.append(("circuit_count", np.int32))
+    columns.append(("metadata", np.int32))
+    return np.dtype(columns)
+
+
+class ResidueEventLog:
+    """
+    Growable, columnar log of residue events of one kind.
+    
+    Events are rows of a structured array (one typed column per field) and
+    affected circuits live in a shared flat array referenced by offset/count.
+    Metadata dictionaries are interned, so events with identical metadata share
+    one stored copy. Components are only materialized on access.
+    """
+    
+    def __init__(self,
+                 name: str,
+                 fields: Tuple[str, ...],
+                 data_width: int,
+                 capacity: int = 64):
+        """
+        Initialize an empty event log.
+        
+        Args:
+            name: Component name of the events (e.g. "attribution_void")
+            fields: Positional fields exposed in component metadata, in order
+            data_width: Number of meaningful entries in each event's data
+            capacity: Initial row capacity
+        """
+        self.name = name
+        self.fields = fields
+        self.data_width = data_width
+        self.dtype = event_dtype(fields, data_width)
+        self._records = np.zeros(max(1, capacity), dtype=self.dtype)
+        self._size = 0
+        self._circuits = np.zeros(max(1, capacity), dtype=np.int32)
+        self._circuit_size = 0
+        self._metadata = [{}]
+        self._metadata_ids = {"{}": 0}
+        
+    def __len__(self) -> int:
+        return self._size
+        
+    @property
+    def records(self) -> np.ndarray:
+        """Zero-copy view of the recorded events."""
+        return self._records[:self._size]
+        
+    @property
+    def nbytes(self) -> int:
+        return self._records.nbytes + self._circuits.nbytes
+        
+    def intern_metadata(self, metadata: Optional[Dict[str, Any]]) -> int:
+        """Get the id of a metadata dictionary, storing it on first use."""
+        if not metadata:
+            return 0
+        key = json.dumps(metadata, sort_keys=True, default=repr)
+        metadata_id = self._metadata_ids.get(key)
+        if metadata_id is None:
+            metadata_id = self._metadata_ids[key] = len(self._metadata)
+            self._metadata.append(dict(metadata))
+        return metadata_id
+        
+    def _reserve(self, rows: int, circuits: int = 0) -> None:
+        if self._size + rows > len(self._records):
+            grown = np.zeros(max(2 * len(self._records), self._size + rows), dtype=self.dtype)
+            grown[:self._size] = self.records
+            self._records = grown
+        if self._circuit_size + circuits > len(self._circuits):
+            grown = np.zeros(max(2 * len(self._circuits), self._circuit_size + circuits), dtype=np.int32)
+            grown[:self._circuit_size] = self._circuits[:self._circuit_size]
+            self._circuits = grown
+            
+    def append(self,
+               layer: int = -1,
+               token_position: int = -1,
+               depth: int = 0,
+               timestamp: int = 0,
+               data: Tuple[float, ...] = (),
+               circuits: Optional[List[int]] = None,
+               metadata: Optional[Dict[str, Any]] = None) -> None:
+        """Append one event."""
+        circuits = circuits or []
+        self._reserve(1, len(circuits))
+        
+        self._records[self._size] = self._row(
+            layer=layer,
+            token_position=token_position,
+            depth=depth,
+            timestamp=timestamp,
+            data=data,
+            circuit_offset=self._circuit_size,
+            circuit_count=len(circuits),
+            metadata=self.intern_metadata(metadata)
+        )
+        
+        self._circuits[self._circuit_size:self._circuit_size + len(circuits)] = circuits
+        self._circuit_size += len(circuits)
+        self._size += 1
+        
+    def _row(self, **values: Any) -> tuple:
+        return tuple(values[name] for name in self.dtype.names)
+        
+    def extend(self,
+               layer: Union[int, np.ndarray] = -1,
+               token_position: Union[int, np.ndarray] = -1,
+               depth: Union[int, np.ndarray] = 0,
+               timestamp: Union[int, np.ndarray] = 0,
+               data: Optional[np.ndarray] = None,
+               circuits: Optional[List[List[int]]] = None,
+               metadata: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Append many events at once.
+        
+        Args:
+            layer: Layers [n] (or a scalar shared by all events)
+            token_position: Token positions [n]
+            depth: Recursive depths [n]
+            timestamp: Timestamps [n]
+            data: Event data [n, data_width]
+            circuits: Optional affected circuits for each event (n lists)
+            metadata: Metadata shared by all events
+        """
+        data = np.asarray(data, dtype=np.float64).reshape(-1, self.data_width)
+        n = len(data)
+        counts = np.array([len(c) for c in circuits] if circuits is not None else np.zeros(n), dtype=np.int64)
+        flat = np.fromiter((c for cs in circuits for c in cs), dtype=np.int32,
+                           count=int(counts.sum())) if circuits is not None else np.zeros(0, np.int32)
+        self._reserve(n, len(flat))
+        
+        rows = self._records[self._size:self._size + n]
+        columns = {
+            "layer": layer,
+            "token_position": token_position,
+            "depth": depth,
+            "timestamp": timestamp,
+            "data": data,
+            "circuit_offset": self._circuit_size + np.cumsum(counts) - counts,
+            "circuit_count": counts,
+            "metadata": self.intern_metadata(metadata),
+        }
+        for name in self.dtype.names:
+            rows[name] = columns[name]
+        
+        self._circuits[self._circuit_size:self._circuit_size + len(flat)] = flat
+        self._circuit_size += len(flat)
+        self._size += n
+        
+    def circuits(self, i: int) -> np.ndarray:
+        """Get the affected circuits of event i."""
+        if "circuit_offset" not in self.dtype.names:
+            return self._circuits[:0]
+        row = self._records[i]
+        return self._circuits[row["circuit_offset"]:row["circuit_offset"] + row["circuit_count"]]
+        
+    def expand_circuits(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Flatten the affected circuits of all events.
+        
+        Returns:
+            Tuple of (event index per circuit, circuits)
+        """
+        if "circuit_offset" not in self.dtype.names:
+            return np.zeros(0, dtype=np.int64), self._circuits[:0]
+        records = self.records
+        counts = records["circuit_count"].astype(np.int64)
+        rows = np.repeat(np.arange(len(records)), counts)
+        starts = np.cumsum(counts) - counts
+        index = np.repeat(records["circuit_offset"], counts) + np.arange(len(rows)) - np.repeat(starts, counts)
+        return rows, self._circuits[index]
+        
+    def metadata(self, i: int) -> Dict[str, Any]:
+        """Get the extra (interned) metadata of event i."""
+        return self._metadata[self._records[i]["metadata"]]
+        
+    def component(self, i: int) -> ResidueComponent:
+        """Materialize event i as a ResidueComponent."""
+        row = self._records[i]
+        metadata = {}
+        for field in self.fields:
+            if field == "affected_circuits":
+                metadata[field] = self.circuits(i).tolist()
+            else:
+                metadata[field] = int(row[field])
+        metadata["timestamp"] = int(row["timestamp"])
+        metadata.update(self._metadata[row["metadata"]])
+        
+        return ResidueComponent(
+            name=self.name,
+            data=row["data"][:self.data_width].copy(),
+            metadata=metadata
+        )
+        
+    def select(self, **conditions: Any) -> np.ndarray:
+        """
+        Vectorized filtering over event columns.
+        
+        Args:
+            conditions: Column name to a value, or to a (low, high) inclusive range
+            
+        Returns:
+            Indices of matching events
+        """
+        records = self.records
+        mask = np.ones(len(records), dtype=bool)
+        for column, condition in conditions.items():
+            if isinstance(condition, tuple):
+                low, high = condition
+                mask &= (records[column] >= low) & (records[column] <= high)
+            else:
+                mask &= records[column] == condition
+        return np.flatnonzero(mask)
+        
+    def clear(self) -> None:
+        """Drop all events."""
+        self._size = 0
+        self._circuit_size = 0
+        self._metadata = [{}]
+        self._metadata_ids = {"{}": 0}
+        
+    def merge(self, other: "ResidueEventLog") -> None:
+        """
+        Merge another log of the same kind into this one, ordered by timestamp.
+        
+        Events with equal timestamps keep their order, with this log's first.
+        
+        Args:
+            other: Log to merge (left unchanged)
+        """
+        if other.dtype != self.dtype:
+            raise ValueError(f"Cannot merge {other.name} events into {self.name} events")
+            
+        records = other.records.copy()
+        if "circuit_offset" in self.dtype.names:
+            records["circuit_offset"] += self._circuit_size
+        metadata_ids = np.array([self.intern_metadata(m) for m in other._metadata], dtype=np.int32)
+        records["metadata"] = metadata_ids[records["metadata"]]
+        
+        self._reserve(len(records), other._circuit_size)
+        self._circuits[self._circuit_size:self._circuit_size + other._circuit_size] = \
+            other._circuits[:other._circuit_size]
+        self._circuit_size += other._circuit_size
+        
+        combined = np.concatenate([self.records, records])
+        order = np.argsort(combined["timestamp"], kind="stable")
+        self._records[:len(combined)] = combined[order]
+        self._size = len(combined)
+        
+    def restore(self, records: np.ndarray, circuits: np.ndarray, metadata: List[Dict[str, Any]]) -> None:
+        """
+        Replace the log contents with saved columns (used by `load`).
+        
+        Args:
+            records: Event rows with this log's dtype (may be a memory map)
+            circuits: Flat affected-circuit array referenced by the rows
+            metadata: Interned metadata table (entry 0 is the empty dictionary)
+        """
+        self._records = records
+        self._size = len(records)
+        self._circuits = circuits
+        self._circuit_size = len(circuits)
+        self._metadata = [dict(m) for m in metadata] or [{}]
+        self._metadata_ids = {json.dumps(m, sort_keys=True, default=repr): i
+                              for i, m in enumerate(self._metadata)}
+        
+    def extend_components(self, components: List[ResidueComponent]) -> None:
+        """Append events from ResidueComponent objects (e.g. from older saves)."""
+        for component in components:
+            metadata = dict(component.metadata)
+            values = {field: metadata.pop(field, -1) for field in self.fields}
+            self.append(
+                layer=values.get("layer", -1),
+                token_position=values.get("token_position", -1),
+                depth=values.get("depth", 0),
+                timestamp=metadata.pop("timestamp", 0),
+                data=np.asarray(component.data)[:self.data_width],
+                circuits=values.get("affected_circuits"),
+                metadata=metadata
+            )
+
+
+class ResidueComponentView(Sequence):
+    """Read-only ResidueComponent sequence over a ResidueEventLog."""
+    
+    def __init__(self, log: ResidueEventLog):
+        self.log = log
+        
+    def __len__(self) -> int:
+        return len(self.log)
+        
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self.log.component(j) for j in range(*i.indices(len(self.log)))]
+        if i < 0:
+            i += len(self.log)
+        if not 0 <= i < len(self.log):
+            raise IndexError("Residue event index out of range")
+        return self.log.component(i)
+
+
+class DenseResidueStorage:
+    """Dense [residue_class, layer, token, depth] array storage (the default)."""
+    
+    kind = "dense"
+    
+    def __init__(self, shape: Tuple[int, ...], dtype: Union[str, np.dtype] = np.float64):
+        """
+        Initialize dense storage filled with zeros.
+        
+        Args:
+            shape: Tensor shape [residue_class, layer, token, depth]
+            dtype: Storage dtype
+        """
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.array = np.zeros(self.shape, dtype=self.dtype)
+        
+    @classmethod
+    def from_array(cls, array: np.ndarray) -> "DenseResidueStorage":
+        """Wrap an existing dense array."""
+        storage = cls(array.shape, array.dtype)
+        storage.array = array
+        return storage
+        
+    @property
+    def nbytes(self) -> int:
+        return self.array.nbytes
+        
+    def get(self, index: Tuple) -> np.ndarray:
+        """Read cells at a tuple of broadcastable integer index arrays."""
+        return self.array[index]
+        
+    def put(self, index: Tuple, values: Union[float, np.ndarray]) -> None:
+        """Write cells at a tuple of broadcastable integer index arrays."""
+        self.array[index] = values
+        
+    def get_cell(self, cell: Tuple[int, int, int, int]) -> float:
+        """Read one cell at (residue_class, layer, token, depth)."""
+        return float(self.array[cell])
+        
+    def put_cell(self, cell: Tuple[int, int, int, int], value: float) -> None:
+        """Write one cell at (residue_class, layer, token, depth)."""
+        self.array[cell] = value
+        
+    def items(self) -> Tuple[Tuple[np.ndarray, ...], np.ndarray]:
+        """Get the (index arrays, values) of all non-zero cells."""
+        index = np.nonzero(self.array)
+        return index, self.array[index]
+        
+    def sum(self, axis: Optional[Union[int, Tuple[int, ...]]] = None) -> np.ndarray:
+        return self.array.sum(axis=axis)
+        
+    def max(self) -> float:
+        return float(self.array.max()) if self.array.size else 0.0
+        
+    def toarray(self) -> np.ndarray:
+        """Get the dense array (the live storage, not a copy)."""
+        return self.array
+        
+    def guard(self, index: Tuple):
+        """Context held while cells at `index` are read, modified and written."""
+        return nullcontext()
+        
+    def grow_tokens(self, tokens: int) -> None:
+        """Extend the token axis to `tokens` positions (new cells are zero)."""
+        array = np.zeros(self.shape[:2] + (tokens,) + self.shape[3:], dtype=self.dtype)
+        array[:, :, :self.shape[2]] = self.array
+        self.array = array
+        self.shape = array.shape
+        
+    def save(self, directory: str) -> None:
+        """Write the cells as tensor.npy."""
+        np.save(os.path.join(directory, "tensor.npy"), self.array, allow_pickle=False)
+        
+    @classmethod
+    def load(cls,
+             directory: str,
+             shape: Tuple[int, ...],
+             mmap: bool = False,
+             classes: Optional[List[int]] = None,
+             layers: Optional[Tuple[int, int]] = None) -> "DenseResidueStorage":
+        """
+        Read storage written by `save`.
+        
+        Args:
+            directory: Saved tensor directory
+            shape: Tensor shape
+            mmap: Map the file copy-on-write instead of reading it
+            classes: Only load these residue classes (others are zero)
+            layers: Only load this inclusive (low, high) layer range (others are zero)
+        """
+        array = np.load(os.path.join(directory, "tensor.npy"), mmap_mode="c" if mmap else None)
+        if array.shape != tuple(shape):
+            raise ValueError(f"Saved tensor has shape {array.shape}, expected {tuple(shape)}")
+        if classes is None and layers is None:
+            return cls.from_array(array)
+            
+        # Partial loads only read the selected blocks
+        storage = cls(array.shape, array.dtype)
+        classes = range(array.shape[0]) if classes is None else classes
+        low, high = layers if layers is not None else (0, array.shape[1] - 1)
+        for residue_class in classes:
+            storage.array[residue_class, low:high + 1] = array[residue_class, low:high + 1]
+        return storage
+
+
+class SparseResidueStorage:
+    """
+    Dictionary-of-keys storage for mostly-empty residue tensors.
+    
+    Only non-zero cells are kept, keyed by their flat (C-order) index. Reductions
+    are computed from the stored cells, and a dense array is only built when
+    `toarray` is called.
+    """
+    
+    kind = "sparse"
+    
+    def __init__(self, shape: Tuple[int, ...], dtype: Union[str, np.dtype] = np.float64):
+        """
+        Initialize empty sparse storage.
+        
+        Args:
+            shape: Tensor shape [residue_class, layer, token, depth]
+            dtype: Value dtype
+        """
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.cells: Dict[int, float] = {}
+        
+    @classmethod
+    def from_array(cls, array: np.ndarray) -> "SparseResidueStorage":
+        """Build sparse storage from the non-zero cells of a dense array."""
+        storage = cls(array.shape, array.dtype)
+        keys = np.flatnonzero(array)
+        storage.cells = dict(zip(keys.tolist(), array.ravel()[keys].tolist()))
+        return storage
+        
+    @property
+    def nbytes(self) -> int:
+        # Rough estimate of dictionary slot plus key and value objects
+        return len(self.cells) * 100
+        
+    def _keys(self, index: Tuple) -> np.ndarray:
+        # ravel_multi_index broadcasts the index arrays itself
+        return np.ravel_multi_index(index, self.shape)
+        
+    def get(self, index: Tuple) -> np.ndarray:
+        """Read cells at a tuple of broadcastable integer index arrays."""
+        keys = self._keys(index)
+        cells = self.cells
+        values = np.fromiter((cells.get(k, 0.0) for k in keys.ravel().tolist()),
+                             dtype=self.dtype, count=keys.size)
+        return values.reshape(keys.shape)
+        
+    def put(self, index: Tuple, values: Union[float, np.ndarray]) -> None:
+        """Write cells at a tuple of broadcastable integer index arrays."""
+        keys = self._keys(index)
+        values = np.broadcast_to(np.asarray(values, dtype=self.dtype), keys.shape)
+        
+        # Zero writes remove cells so storage stays proportional to non-zeros
+        nonzero = values != 0
+        self.cells.update(zip(keys[nonzero].tolist(), values[nonzero].tolist()))
+        for key in keys[~nonzero].tolist():
+            self.cells.pop(key, None)
+            
+    def _key(self, cell: Tuple[int, int, int, int]) -> int:
+        _, layers, tokens, depths = self.shape
+        residue_class, layer, token, depth = cell
+        return ((residue_class * layers + layer) * tokens + token) * depths + depth
+        
+    def get_cell(self, cell: Tuple[int, int, int, int]) -> float:
+        """Read one cell at (residue_class, layer, token, depth)."""
+        return self.cells.get(self._key(cell), 0.0)
+        
+    def put_cell(self, cell: Tuple[int, int, int, int], value: float) -> None:
+        """Write one cell at (residue_class, layer, token, depth)."""
+        if value != 0:
+            self.cells[self._key(cell)] = float(value)
+        else:
+            self.cells.pop(self._key(cell), None)
+            
+    def items(self) -> Tuple[Tuple[np.ndarray, ...], np.ndarray]:
+        """Get the (index arrays, values) of all non-zero cells."""
+        keys = np.fromiter(self.cells.keys(), dtype=np.int64, count=len(self.cells))
+        values = np.fromiter(self.cells.values(), dtype=self.dtype, count=len(self.cells))
+        return np.unravel_index(keys, self.shape), values
+        
+    def sum(self, axis: Optional[Union[int, Tuple[int, ...]]] = None) -> np.ndarray:
+        index, values = self.items()
+        if axis is None:
+            return values.sum()
+            
+        axes = {a % len(self.shape) for a in np.atleast_1d(axis)}
+        kept = [a for a in range(len(self.shape)) if a not in axes]
+        out = np.zeros([self.shape[a] for a in kept], dtype=self.dtype)
+        np.add.at(out, tuple(index[a] for a in kept), values)
+        return out
+        
+    def max(self) -> float:
+        if not self.cells:
+            return 0.0
+        largest = max(self.cells.values())
+        # Cells not stored are zero
+        if len(self.cells) < int(np.prod(self.shape)):
+            largest = max(largest, 0.0)
+        return float(largest)
+        
+    def toarray(self) -> np.ndarray:
+        """Build a dense copy of the stored cells."""
+        array = np.zeros(self.shape, dtype=self.dtype)
+        index, values = self.items()
+        array[index] = values
+        return array
+        
+    def guard(self, index: Tuple):
+        """Context held while cells at `index` are read, modified and written."""
+        return nullcontext()
+        
+    def grow_tokens(self, tokens: int) -> None:
+        """Extend the token axis to `tokens` positions (flat keys are recomputed)."""
+        index, values = self.items()
+        self.shape = self.shape[:2] + (tokens,) + self.shape[3:]
+        keys = np.ravel_multi_index(index, self.shape)
+        self.cells = dict(zip(keys.tolist(), values.tolist()))
+        
+    def save(self, directory: str) -> None:
+        """Write the cells as flat keys (cell_keys.npy) and values (cell_values.npy)."""
+        keys = np.fromiter(self.cells.keys(), dtype=np.int64, count=len(self.cells))
+        values = np.fromiter(self.cells.values(), dtype=self.dtype, count=len(self.cells))
+        order = np.argsort(keys)
+        np.save(os.path.join(directory, "cell_keys.npy"), keys[order], allow_pickle=False)
+        np.save(os.path.join(directory, "cell_values.npy"), values[order], allow_pickle=False)
+        
+    @classmethod
+    def load(cls,
+             directory: str,
+             shape: Tuple[int, ...],
+             mmap: bool = False,
+             classes: Optional[List[int]] = None,
+             layers: Optional[Tuple[int, int]] = None) -> "SparseResidueStorage":
+        """
+        Read storage written by `save`.
+        
+        Args:
+            directory: Saved tensor directory
+            shape: Tensor shape
+            mmap: Map the files instead of reading them
+            classes: Only load these residue classes
+            layers: Only load this inclusive (low, high) layer range
+        """
+        mode = "r" if mmap else None
+        keys = np.load(os.path.join(directory, "cell_keys.npy"), mmap_mode=mode)
+        values = np.load(os.path.join(directory, "cell_values.npy"), mmap_mode=mode)
+        storage = cls(shape, values.dtype)
+        
+        if classes is not None or layers is not None:
+            cell_classes, cell_layers, _, _ = np.unravel_index(keys, shape)
+            mask = np.ones(len(keys), dtype=bool)
+            if classes is not None:
+                mask &= np.isin(cell_classes, classes)
+            if layers is not None:
+                mask &= (cell_layers >= layers[0]) & (cell_layers <= layers[1])
+            keys, values = keys[mask], values[mask]
+            
+        storage.cells = dict(zip(keys.tolist(), values.tolist()))
+        return storage
+
+
+RESIDUE_STORAGE_BACKENDS = {
+    "dense": DenseResidueStorage,
+    "sparse": SparseResidueStorage,
+}
+
+
+class ResidueMarginals:
+    """
+    Running aggregates of a residue tensor, updated as cells are written.
+    
+    Keeps per-class layer/token/depth marginals, the pairwise (two-axis)
+    marginals drawn by `visualize_residue` (layer×token of R_A, token×depth of
+    R_T and layer×depth of R_R, which R_A and R_T also keep for their products
+    with R_R), and the sufficient statistics (totals, cross-class products,
+    non-zero and negative counts) needed by `analyze_residue_pattern`, so
+    analysis and plotting never rescan the tensor.
+    
+    Recursive collapses are stored once per (layer, depth), at token 0, and
+    cover every token position of the extent: the aggregates keep that plane
+    and the public statistics broadcast it over the current extent. For a
+    growable token axis, the extent is the populated one (token positions up
+    to the last one holding residue) rather than the allocation.
+    """
+    
+    def __init__(self, shape: Tuple[int, int, int, int], growable: bool = False):
+        """
+        Initialize empty aggregates.
+        
+        Args:
+            shape: Tensor shape [residue_class, layer, token, depth]
+            growable: Whether the token axis grows on demand
+        """
+        self.shape = tuple(shape)
+        self.growable = growable
+        classes, layers, tokens, depths = self.shape
+        # Aggregates of the stored cells (R_R as its collapse plane)
+        self._layer = np.zeros((classes, layers))
+        self._token = np.zeros((classes, tokens))
+        self._depth = np.zeros((classes, depths))
+        self.layer_token = np.zeros((layers, tokens))  # R_A summed over depths
+        self.token_depth = np.zeros((tokens, depths))  # R_T summed over layers
+        self._layer_depth = np.zeros((classes, layers, depths))  # Summed over tokens
+        self._total = np.zeros(classes)
+        # cross[a, b] = sum of tensor[a] * tensor[b] over aligned cells (diagonal = sum of squares)
+        self._cross = np.zeros((classes, classes))
+        self._nonzero = np.zeros(classes, dtype=np.int64)
+        self._negative = np.zeros(classes, dtype=np.int64)
+        self.populated = 0  # One past the last token position written with residue
+        
+    @property
+    def extent(self) -> int:
+        """Number of token positions covered by the statistics."""
+        return self.populated if self.growable else self.shape[2]
+        
+    @property
+    def cells(self) -> int:
+        """Number of tensor cells covered by the statistics."""
+        return self.shape[0] * self.shape[1] * self.extent * self.shape[3]
+        
+    @property
+    def collapse_plane(self) -> np.ndarray:
+        """Recursive Collapse residue per (layer, depth), covering every token of the extent."""
+        return self._layer_depth[2]
+        
+    def _broadcast(self, stored: np.ndarray) -> np.ndarray:
+        """Scale the R_R row of a token-summed aggregate by the extent."""
+        out = stored.copy()
+        out[2] *= self.extent
+        return out
+        
+    @property
+    def layer(self) -> np.ndarray:
+        """Residue per class and layer [classes, layers]."""
+        return self._broadcast(self._layer)
+        
+    @property
+    def token(self) -> np.ndarray:
+        """Residue per class and token position [classes, tokens]."""
+        out = self._token.copy()
+        out[2] = 0.0
+        out[2, :self.extent] = self._total[2]
+        return out
+        
+    @property
+    def depth(self) -> np.ndarray:
+        """Residue per class and depth [classes, depths]."""
+        return self._broadcast(self._depth)
+        
+    @property
+    def layer_depth(self) -> np.ndarray:
+        """R_R residue per layer and depth, summed over tokens [layers, depths]."""
+        return self.collapse_plane * self.extent
+        
+    @property
+    def total(self) -> np.ndarray:
+        """Residue per class [classes]."""
+        return self._broadcast(self._total)
+        
+    @property
+    def cross(self) -> np.ndarray:
+        """Sums of cell products between classes [classes, classes]."""
+        out = self._cross.copy()
+        out[2, 2] *= self.extent
+        # R_A and R_T only hold residue inside the extent, where R_R is the plane
+        for other in (0, 1):
+            out[other, 2] = out[2, other] = np.sum(self._layer_depth[other] * self.collapse_plane)
+        return out
+        
+    @property
+    def nonzero(self) -> int:
+        """Number of non-zero cells."""
+        return int(self._nonzero[:2].sum() + self._nonzero[2] * self.extent)
+        
+    @property
+    def negative(self) -> int:
+        """Number of negative cells."""
+        return int(self._negative[:2].sum() + self._negative[2] * self.extent)
+        
+    @property
+    def positive(self) -> int:
+        return self.nonzero - self.negative
+        
+    def grow_tokens(self, tokens: int) -> None:
+        """Extend the token axis of the aggregates to `tokens` positions."""
+        padding = tokens - self.shape[2]
+        self._token = np.pad(self._token, ((0, 0), (0, padding)))
+        self.layer_token = np.pad(self.layer_token, ((0, 0), (0, padding)))
+        self.token_depth = np.pad(self.token_depth, ((0, padding), (0, 0)))
+        self.shape = self.shape[:2] + (tokens,) + self.shape[3:]
+        
+    def update(self,
+               residue_class: int,
+               index: Tuple[np.ndarray, np.ndarray, np.ndarray],
+               old: np.ndarray,
+               new: np.ndarray,
+               others: Dict[int, np.ndarray]) -> None:
+        """
+        Account for cells of one class changing from `old` to `new`.
+        
+        Args:
+            residue_class: Residue class that was written (R_R at token 0)
+            index: Flat (layer, token, depth) arrays of the written cells (no duplicates)
+            old: Previous cell values
+            new: New cell values
+            others: Values of the other classes at the same cells (products
+                with R_R are derived from the collapse plane instead)
+        """
+        layers, tokens, depths = index
+        delta = new - old
+        
+        self._layer[residue_class] += np.bincount(layers, delta, minlength=self.shape[1])
+        self._token[residue_class] += np.bincount(tokens, delta, minlength=self.shape[2])
+        self._depth[residue_class] += np.bincount(depths, delta, minlength=self.shape[3])
+        if residue_class == 0:
+            np.add.at(self.layer_token, (layers, tokens), delta)
+        elif residue_class == 1:
+            np.add.at(self.token_depth, (tokens, depths), delta)
+        np.add.at(self._layer_depth[residue_class], (layers, depths), delta)
+        self._total[residue_class] += delta.sum()
+        
+        self._cross[residue_class, residue_class] += np.dot(new, new) - np.dot(old, old)
+        for other, values in others.items():
+            change = np.dot(delta, values)
+            self._cross[residue_class, other] += change
+            self._cross[other, residue_class] += change
+            
+        self._nonzero[residue_class] += int(np.count_nonzero(new) - np.count_nonzero(old))
+        self._negative[residue_class] += int(np.count_nonzero(new < 0) - np.count_nonzero(old < 0))
+        written = tokens[new != 0]
+        if len(written):
+            self.populated = max(self.populated, int(written.max()) + 1)
+        
+    def update_cell(self,
+                    residue_class: int,
+                    cell: Tuple[int, int, int],
+                    old: float,
+                    new: float,
+                    others: Dict[int, float]) -> None:
+        """
+        Account for one cell changing from `old` to `new` (scalar form of `update`).
+        
+        Args:
+            residue_class: Residue class that was written (R_R at token 0)
+            cell: (layer, token, depth) of the written cell
+            old: Previous cell value
+            new: New cell value
+            others: Values of the other classes at the same cell
+        """
+        layer, token, depth = cell
+        delta = new - old
+        
+        self._layer[residue_class, layer] += delta
+        self._token[residue_class, token] += delta
+        self._depth[residue_class, depth] += delta
+        if residue_class == 0:
+            self.layer_token[layer, token] += delta
+        elif residue_class == 1:
+            self.token_depth[token, depth] += delta
+        self._layer_depth[residue_class, layer, depth] += delta
+        self._total[residue_class] += delta
+        
+        self._cross[residue_class, residue_class] += new * new - old * old
+        for other, value in others.items():
+            change = delta * value
+            self._cross[residue_class, other] += change
+            self._cross[other, residue_class] += change
+            
+        self._nonzero[residue_class] += (new != 0) - (old != 0)
+        self._negative[residue_class] += (new < 0) - (old < 0)
+        if new != 0 and token >= self.populated:
+            self.populated = token + 1
+        
+    def update_column(self,
+                      residue_class: int,
+                      token: int,
+                      depth: int,
+                      old: np.ndarray,
+                      new: np.ndarray,
+                      others: Dict[int, np.ndarray]) -> None:
+        """
+        Account for every layer of one (token, depth) changing from `old` to `new`.
+        
+        Args:
+            residue_class: Residue class that was written
+            token: Token position of the written cells
+            depth: Depth of the written cells
+            old: Previous cell values [layers]
+            new: New cell values [layers]
+            others: Values of the other classes at the same cells [layers]
+        """
+        delta = new - old
+        change = float(delta.sum())
+        
+        self._layer[residue_class] += delta
+        self._token[residue_class, token] += change
+        self._depth[residue_class, depth] += change
+        if residue_class == 0:
+            self.layer_token[:, token] += delta
+        elif residue_class == 1:
+            self.token_depth[token, depth] += change
+        self._layer_depth[residue_class, :, depth] += delta
+        self._total[residue_class] += change
+        
+        self._cross[residue_class, residue_class] += np.dot(new, new) - np.dot(old, old)
+        for other, values in others.items():
+            product = np.dot(delta, values)
+            self._cross[residue_class, other] += product
+            self._cross[other, residue_class] += product
+            
+        self._nonzero[residue_class] += int(np.count_nonzero(new) - np.count_nonzero(old))
+        self._negative[residue_class] += int(np.count_nonzero(new < 0) - np.count_nonzero(old < 0))
+        if token >= self.populated and new.any():
+            self.populated = token + 1
+        
+    @classmethod
+    def from_storage(cls, storage, growable: bool = False) -> "ResidueMarginals":
+        """Recompute all aggregates exactly from a storage backend."""
+        marginals = cls(storage.shape, growable)
+        if isinstance(storage, DenseResidueStorage):
+            # Reduce the array directly instead of gathering non-zero cells
+            array = np.asarray(storage.array, dtype=np.float64)
+            flat = array.reshape(array.shape[0], -1)
+            marginals._layer = array.sum(axis=(2, 3))
+            marginals._token = array.sum(axis=(1, 3))
+            marginals._depth = array.sum(axis=(1, 2))
+            marginals.layer_token = array[0].sum(axis=2)
+            marginals.token_depth = array[1].sum(axis=0)
+            marginals._layer_depth = array.sum(axis=2)
+            marginals._total = flat.sum(axis=1)
+            marginals._cross = flat @ flat.T
+            marginals._nonzero = np.count_nonzero(flat, axis=1)
+            marginals._negative = np.count_nonzero(flat < 0, axis=1)
+            populated = np.flatnonzero(np.any(array != 0, axis=(0, 1, 3)))
+            marginals.populated = int(populated[-1]) + 1 if len(populated) else 0
+            return marginals
+            
+        (classes, layers, tokens, depths), values = storage.items()
+        
+        for residue_class in range(storage.shape[0]):
+            mask = classes == residue_class
+            cells = (layers[mask], tokens[mask], depths[mask])
+            marginals.update(residue_class, cells, np.zeros(mask.sum()), values[mask], {})
+            
+        # Product of R_A and R_T over cells populated in both
+        keys = np.ravel_multi_index((layers, tokens, depths), storage.shape[1:])
+        attribution, hesitation = (np.flatnonzero(classes == c) for c in (0, 1))
+        _, ia, ib = np.intersect1d(keys[attribution], keys[hesitation], assume_unique=True, return_indices=True)
+        marginals._cross[0, 1] = marginals._cross[1, 0] = np.dot(values[attribution[ia]], values[hesitation[ib]])
+        return marginals
+        
+    ARRAYS = ("layer", "token", "depth", "layer_token", "token_depth", "layer_depth", "total", "cross",
+              "nonzero", "negative")
+    
+    def _stored(self, name: str) -> str:
+        """Attribute holding the stored aggregate saved under `name`."""
+        return name if name in ("layer_token", "token_depth") else "_" + name
+        
+    def save(self, path: str) -> None:
+        """Write the aggregates to an .npz archive."""
+        np.savez(path, counts=np.array([self.populated]),
+                 **{name: getattr(self, self._stored(name)) for name in self.ARRAYS})
+        
+    @classmethod
+    def load(cls,
+             path: str,
+             shape: Tuple[int, int, int, int],
+             growable: bool = False) -> Optional["ResidueMarginals"]:
+        """Read aggregates written by `save` (None if the archive lacks or mis-shapes any of them)."""
+        marginals = cls(shape, growable)
+        with np.load(path, allow_pickle=False) as saved:
+            if any(name not in saved or saved[name].shape != getattr(marginals, marginals._stored(name)).shape
+                   for name in cls.ARRAYS):
+                return None
+            for name in cls.ARRAYS:
+                setattr(marginals, marginals._stored(name), saved[name])
+            marginals.populated = int(saved["counts"][-1])
+        return marginals
+        
+    def correlation(self, a: int, b: int) -> float:
+        """Pearson correlation between two residue classes over all cells."""
+        n = self.cells // self.shape[0]
+        if n == 0:
+            return float('nan')
+        total, cross = self.total, self.cross
+        mean_a, mean_b = total[a] / n, total[b] / n
+        covariance = cross[a, b] / n - mean_a * mean_b
+        variance = (cross[a, a] / n - mean_a ** 2) * (cross[b, b] / n - mean_b ** 2)
+        if variance <= 0:
+            return float('nan')  # Undefined for a constant class, as with np.corrcoef
+        return float(covariance / np.sqrt(variance))
+        
+    def variance(self) -> float:
+        """Variance of all tensor cells."""
+        n = self.cells
+        if n == 0:
+            return 0.0
+        mean = self.total.sum() / n
+        return float(max(0.0, np.trace(self.cross) / n - mean ** 2))
+        
+    def median(self, storage) -> float:
+        """
+        Median of all tensor cells by selection.
+        
+        Zero cells are counted rather than materialized; non-zero values are only
+        read from storage (and partially partitioned, never sorted) when the
+        median falls outside the block of zeros. Each collapse plane value
+        stands for `extent` cells.
+        """
+        n = self.cells
+        if n == 0:
+            return 0.0
+        ranks = [n // 2] if n % 2 else [n // 2 - 1, n // 2]
+        nonzero, negative = self.nonzero, self.negative
+        zeros = n - nonzero
+        
+        values = None
+        order_statistics = []
+        for rank in ranks:
+            if negative <= rank < negative + zeros:
+                order_statistics.append(0.0)
+                continue
+            if values is None:
+                (classes, _, _, _), values = storage.items()
+                plane = np.sort(values[(classes == 2) & (values != 0)])
+                values = values[(classes != 2) & (values != 0)]
+                # Cells grouped between consecutive plane values, then the
+                # alternating runs of grouped cells and repeated plane values
+                group = np.searchsorted(plane, values, side="right")
+                counts = np.bincount(group, minlength=len(plane) + 1)
+                runs = np.empty(2 * len(plane) + 1, dtype=np.int64)
+                runs[0::2] = counts
+                runs[1::2] = self.extent
+                ends = np.cumsum(runs)
+            # Rank among non-zero values once the zero block is skipped
+            k = rank if rank < negative else rank - zeros
+            run = int(np.searchsorted(ends, k, side="right"))
+            if run % 2:
+                order_statistics.append(float(plane[run // 2]))
+                continue
+            grouped = values[group == run // 2]
+            k -= int(ends[run] - runs[run])
+            order_statistics.append(float(np.partition(grouped, k)[k]))
+            
+        return float(np.mean(order_statistics))
+
+
+# Known residue signatures (reference feature vectors)
+RESIDUE_SIGNATURES = {
+    "attribution_gap": np.array([0.7, 0.2, 0.1, 0.6, 0.3, 0.1, 0.2]),
+    "phase_misalignment": np.array([0.2, 0.3, 0.5, 0.2, 0.2, 0.6, 0.8]),
+    "boundary_erosion": np.array([0.4, 0.4, 0.2, 0.2, 0.6, 0.2, 0.1]),
+    "temporal_instability": np.array([0.3, 0.6, 0.1, 0.4, 0.4, 0.2, -0.5]),
+    "attractor_dissolution": np.array([0.2, 0.3, 0.5, 0.3, 0.3, 0.4, 0.3])
+}
+
+
 class SymbolicResidueTensor:
     """
     Implementation of the Symbolic Residue Tensor (RΣ) that captures patterns of
     coherence breakdown across different dimensions.
     """
     
+    DEFAULT_TOKEN_BLOCK = 64
+    
     def __init__(self, config: Dict = None):
         """
         Initialize the Symbolic Residue Tensor.
@@ -42,26 +1032,244 @@ class SymbolicResidueTensor:
         
         # Initialize tensor dimensions
         self.layers = self.config.get('layers', 12)  # Number of model layers
-        self.tokens = self.config.get('tokens', 100)  # Maximum token sequence length
+        self.tokens = self.config.get('tokens', 100)  # Allocated token positions
         self.depths = self.config.get('depths', 5)  # Maximum recursive depths
         
-        # Initialize residue class trackers
-        self.attribution_voids = []  # R_A: Attribution Voids
-        self.token_hesitations = []  # R_T: Token Hesitations
-        self.recursive_collapses = []  # R_R: Recursive Collapses
+        # Token axis growth in blocks of positions (0 for a fixed axis that clamps positions)
+        self.token_block = self.config.get('token_block', self.DEFAULT_TOKEN_BLOCK)
+        
+        # Initialize residue class trackers (columnar event logs)
+        self.events = {
+            "attribution_void": ResidueEventLog(  # R_A: Attribution Voids
+                "attribution_void", ("layer", "token_position", "depth"), 1),
+            "token_hesitation": ResidueEventLog(  # R_T: Token Hesitations
+                "token_hesitation", ("token_position", "depth"), 3),
+            "recursive_collapse": ResidueEventLog(  # R_R: Recursive Collapses
+                "recursive_collapse", ("depth", "affected_circuits"), 3),
+        }
+        
+        # Tensor storage backend: "dense", "sparse" or a storage class
+        storage = self.config.get('storage', 'dense')
+        self.storage_class = RESIDUE_STORAGE_BACKENDS.get(storage, storage)
+        if isinstance(self.storage_class, str):
+            raise ValueError(f"Unknown residue storage backend: {storage}")
         
         # Full tensor representation
-        self.tensor = None
+        self.storage = None
         self.initialize_tensor()
         
+        # Precompiled reference signatures for classification
+        self._compile_signatures(RESIDUE_SIGNATURES)
+        
         # Historical tracking
         self.history = []
         
+        # Analysis stored with the last loaded save (if any)
+        self.saved_analysis = None
+        
+        # Optional append-only log receiving every recorded event (see residue_log)
+        self.event_log = None
+        
+        # Headless renderer reused by visualize_residue (see residue_render)
+        self._renderer = None
+        
     def initialize_tensor(self) -> None:
         """Initialize the full residue tensor with zeros."""
         # Structure: [residue_class, layer, token, depth]
         # residue_class: 0=R_A, 1=R_T, 2=R_R
-        self.tensor = np.zeros((3, self.layers, self.tokens, self.depths))
+        self.storage = self.storage_class((3, self.layers, self.tokens, self.depths))
+        self.marginals = ResidueMarginals(self.storage.shape, growable=bool(self.token_block))
+        
+    @property
+    def tensor(self) -> np.ndarray:
+        """Dense copy of the residue tensor, with collapses covering every token of the extent."""
+        array = self.storage.toarray().copy()
+        array[2, :, :self.marginals.extent] = array[2, :, :1]
+        return array
+        
+    @tensor.setter
+    def tensor(self, array: np.ndarray) -> None:
+        # Collapses are stored once per (layer, depth), at token 0
+        array = np.array(array)
+        array[2, :, 1:] = 0
+        self.storage = self.storage_class.from_array(array)
+        self.tokens = self.storage.shape[2]
+        self.rebuild_marginals()
+        
+    @property
+    def attribution_voids(self) -> ResidueComponentView:
+        """Recorded Attribution Voids as ResidueComponent objects."""
+        return ResidueComponentView(self.events["attribution_void"])
+        
+    @attribution_voids.setter
+    def attribution_voids(self, components: List[ResidueComponent]) -> None:
+        self._replace_events("attribution_void", components)
+        
+    @property
+    def token_hesitations(self) -> ResidueComponentView:
+        """Recorded Token Hesitations as ResidueComponent objects."""
+        return ResidueComponentView(self.events["token_hesitation"])
+        
+    @token_hesitations.setter
+    def token_hesitations(self, components: List[ResidueComponent]) -> None:
+        self._replace_events("token_hesitation", components)
+        
+    @property
+    def recursive_collapses(self) -> ResidueComponentView:
+        """Recorded Recursive Collapses as ResidueComponent objects."""
+        return ResidueComponentView(self.events["recursive_collapse"])
+        
+    @recursive_collapses.setter
+    def recursive_collapses(self, components: List[ResidueComponent]) -> None:
+        self._replace_events("recursive_collapse", components)
+        
+    def _replace_events(self, name: str, components: List[ResidueComponent]) -> None:
+        log = self.events[name]
+        if isinstance(components, ResidueComponentView) and components.log is log:
+            return
+        components = list(components)
+        log.clear()
+        log.extend_components(components)
+        
+    def attach_log(self, event_log) -> None:
+        """
+        Append every subsequently recorded event to an event log.
+        
+        Args:
+            event_log: ResidueLog (or any object with a compatible `append`), or
+                None to stop logging
+        """
+        self.event_log = event_log
+        
+    def _log_events(self, name: str, mode: str, metadata: Optional[Dict[str, Any]], **columns: Any) -> None:
+        """Forward recorded events to the attached event log."""
+        if self.event_log is not None:
+            self.event_log.append(name, self.config.get("current_step", 0), mode, metadata, **columns)
+            
+    def _timestamps(self, timestamps: Optional[np.ndarray]) -> Union[int, np.ndarray]:
+        """Event timestamps of a batch record call."""
+        if timestamps is None:
+            return self.config.get("current_step", 0)
+        return np.asarray(timestamps, dtype=np.int64).ravel()
+        
+    def _reserve_events(self, name: str, rows: int, circuits: int, metadata: Optional[Dict[str, Any]]) -> None:
+        """
+        Make room for events before any cell is written.
+        
+        Raises (e.g. from a full shared event slot) before the tensor changes,
+        so the cells and the events never disagree.
+        """
+        self.events[name]._reserve(rows, circuits)
+        self.events[name].intern_metadata(metadata)
+        
+    def rebuild_marginals(self) -> None:
+        """Recompute cached marginals from the stored tensor."""
+        self.marginals = ResidueMarginals.from_storage(self.storage, growable=bool(self.token_block))
+        
+    def _token_positions(self, positions: Union[int, np.ndarray]) -> Union[int, np.ndarray]:
+        """
+        Prepare token positions for writing.
+        
+        Negative positions are clamped to 0. On a growable token axis the storage
+        is extended (by whole token blocks, at least doubling) to cover the
+        largest position; on a fixed axis positions are clamped to its end.
+        """
+        if not self.token_block:
+            return np.clip(positions, 0, self.tokens - 1) if isinstance(positions, np.ndarray) \
+                else min(max(0, positions), self.tokens - 1)
+        if isinstance(positions, np.ndarray):
+            positions = np.maximum(positions, 0)
+            needed = int(np.max(positions, initial=-1)) + 1
+        else:
+            positions = max(0, positions)
+            needed = positions + 1
+        if needed > self.tokens:
+            tokens = max(needed, 2 * self.tokens)
+            tokens = -(-tokens // self.token_block) * self.token_block
+            self.storage.grow_tokens(tokens)
+            self.marginals.grow_tokens(tokens)
+            self.tokens = tokens
+        return positions
+        
+    def _write(self,
+               residue_class: int,
+               index: Tuple,
+               values: Union[float, np.ndarray],
+               mode: str = "set") -> None:
+        """
+        Write cells of one residue class and update the cached marginals.
+        
+        Args:
+            residue_class: Residue class to write (0=R_A, 1=R_T, 2=R_R at token 0)
+            index: Broadcastable (layer, token, depth) integer indices
+            values: Values broadcastable against the indices
+            mode: "set" (last write wins), "max" or "add" against existing cells
+        """
+        if mode not in ("set", "max", "add"):
+            raise ValueError(f"Unknown write mode: {mode}")
+            
+        layers, tokens, depths, values = np.broadcast_arrays(*index, values)
+        layers, tokens, depths = layers.ravel(), tokens.ravel(), depths.ravel()
+        values = values.ravel().astype(self.storage.dtype)
+        if len(values) == 1:
+            self._write_cell(residue_class, (int(layers[0]), int(tokens[0]), int(depths[0])), float(values[0]), mode)
+            return
+        
+        # Combine repeated cells within the batch
+        if len(values) > 1:
+            keys = np.ravel_multi_index((layers, tokens, depths), self.storage.shape[1:])
+            unique_keys, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+            if len(unique_keys) < len(keys):
+                if mode == "set":
+                    # Later writes overwrite earlier ones
+                    _, last = np.unique(keys[::-1], return_index=True)
+                    combined = values[len(keys) - 1 - last]
+                elif mode == "max":
+                    combined = np.full(len(unique_keys), -np.inf, dtype=values.dtype)
+                    np.maximum.at(combined, inverse, values)
+                else:
+                    combined = np.zeros(len(unique_keys), dtype=values.dtype)
+                    np.add.at(combined, inverse, values)
+                layers, tokens, depths, values = layers[first], tokens[first], depths[first], combined
+        
+        cells = (layers, tokens, depths)
+        with self.storage.guard((residue_class,) + cells):
+            old = self.storage.get((residue_class,) + cells)
+            if mode == "max":
+                values = np.maximum(old, values)
+            elif mode == "add":
+                values = old + values
+            self.storage.put((residue_class,) + cells, values)
+            # Products with the collapse plane are derived by the marginals
+            others = {other: self.storage.get((other,) + cells)
+                      for other in (0, 1) if residue_class != 2 and other != residue_class}
+        self.marginals.update(residue_class, cells, old, values, others)
+        
+    def _write_cell(self, residue_class: int, cell: Tuple[int, int, int], value: float, mode: str = "set") -> None:
+        """Write one cell with scalar storage and marginal updates (see `_write`)."""
+        key = (residue_class,) + cell
+        with self.storage.guard(key):
+            old = self.storage.get_cell(key)
+            if mode == "max":
+                value = max(old, value)
+            elif mode == "add":
+                value = old + value
+            self.storage.put_cell(key, value)
+            # Products with the collapse plane are derived by the marginals
+            others = {} if residue_class == 2 else {1 - residue_class: self.storage.get_cell((1 - residue_class,) + cell)}
+        self.marginals.update_cell(residue_class, cell, old, value, others)
+        
+    def _write_column(self, residue_class: int, token: int, depth: int, value: float) -> None:
+        """Set every layer of one (token, depth) to `value` (see `_write`)."""
+        layers = np.arange(self.layers)
+        index = (layers, token, depth)
+        with self.storage.guard((residue_class,) + index):
+            old = self.storage.get((residue_class,) + index)
+            new = np.full(self.layers, value, dtype=self.storage.dtype)
+            self.storage.put((residue_class,) + index, new)
+            # Products with the collapse plane are derived by the marginals
+            others = {} if residue_class == 2 else {1 - residue_class: self.storage.get((1 - residue_class,) + index)}
+        self.marginals.update_column(residue_class, token, depth, old, new, others)
         
     def record_attribution_void(self, 
                                layer: int, 
@@ -84,25 +1292,25 @@ class SymbolicResidueTensor:
             
         # Bounds checking
         layer = min(max(0, layer), self.layers - 1)
-        token_position = min(max(0, token_position), self.tokens - 1)
+        token_position = self._token_positions(token_position)
         depth = min(max(0, depth), self.depths - 1)
         
         # Record in tensor
-        self.tensor[0, layer, token_position, depth] = magnitude
+        self._reserve_events("attribution_void", 1, 0, metadata)
+        self._write_cell(0, (layer, token_position, depth), float(magnitude))
         
         # Record detailed information
-        void = ResidueComponent(
-            name="attribution_void",
-            data=np.array([magnitude]),
-            metadata={
-                "layer": layer,
-                "token_position": token_position,
-                "depth": depth,
-                "timestamp": self.config.get("current_step", 0),
-                **metadata
-            }
+        timestamp = self.config.get("current_step", 0)
+        self.events["attribution_void"].append(
+            layer=layer,
+            token_position=token_position,
+            depth=depth,
+            timestamp=timestamp,
+            data=(magnitude,),
+            metadata=metadata
         )
-        self.attribution_voids.append(void)
+        self._log_events("attribution_void", "set", metadata, layer=[layer], token_position=[token_position],
+                         depth=[depth], magnitude=[magnitude], timestamp=[timestamp])
         
     def record_token_hesitation(self,
                                token_position: int,
@@ -126,27 +1334,28 @@ class SymbolicResidueTensor:
             metadata = {}
             
         # Bounds checking
-        token_position = min(max(0, token_position), self.tokens - 1)
+        token_position = self._token_positions(token_position)
         depth = min(max(0, depth), self.depths - 1)
         
         # Calculate overall hesitation magnitude (using all three components)
         magnitude = np.sqrt(entropy**2 + oscillation**2 + splitting**2)
         
         # Record in tensor (average across all layers)
-        self.tensor[1, :, token_position, depth] = magnitude / self.layers
+        self._reserve_events("token_hesitation", 1, 0, metadata)
+        self._write_column(1, token_position, depth, magnitude / self.layers)
         
         # Record detailed information
-        hesitation = ResidueComponent(
-            name="token_hesitation",
-            data=np.array([entropy, oscillation, splitting]),
-            metadata={
-                "token_position": token_position,
-                "depth": depth,
-                "timestamp": self.config.get("current_step", 0),
-                **metadata
-            }
+        timestamp = self.config.get("current_step", 0)
+        self.events["token_hesitation"].append(
+            token_position=token_position,
+            depth=depth,
+            timestamp=timestamp,
+            data=(entropy, oscillation, splitting),
+            metadata=metadata
         )
-        self.token_hesitations.append(hesitation)
+        self._log_events("token_hesitation", "set", metadata, token_position=[token_position], depth=[depth],
+                         entropy=[entropy], oscillation=[oscillation], splitting=[splitting],
+                         timestamp=[timestamp])
         
     def record_recursive_collapse(self,
                                 depth: int,
@@ -172,23 +1381,182 @@ class SymbolicResidueTensor:
         # Bounds checking
         depth = min(max(0, depth), self.depths - 1)
         
-        # Record in tensor (across all tokens and relevant layers)
-        for circuit in affected_circuits:
-            if 0 <= circuit < self.layers:
-                self.tensor[2, circuit, :, depth] = severity
+        # Record in tensor (once per relevant layer, covering every token)
+        self._reserve_events("recursive_collapse", 1, len(affected_circuits), metadata)
+        for circuit in dict.fromkeys(c for c in affected_circuits if 0 <= c < self.layers):
+            self._write_cell(2, (int(circuit), 0, depth), float(severity))
         
         # Record detailed information
-        collapse = ResidueComponent(
-            name="recursive_collapse",
-            data=np.array([coherence, collapse_threshold, severity]),
-            metadata={
-                "depth": depth,
-                "affected_circuits": affected_circuits,
-                "timestamp": self.config.get("current_step", 0),
-                **metadata
-            }
+        timestamp = self.config.get("current_step", 0)
+        self.events["recursive_collapse"].append(
+            depth=depth,
+            timestamp=timestamp,
+            data=(coherence, collapse_threshold, severity),
+            circuits=list(affected_circuits),
+            metadata=metadata
         )
-        self.recursive_collapses.append(collapse)
+        self._log_events("recursive_collapse", "set", metadata, depth=[depth], coherence=[coherence],
+                         collapse_threshold=[collapse_threshold], severity=[severity],
+                         affected_circuits=[list(affected_circuits)], timestamp=[timestamp])
+        
+    def record_attribution_voids(self,
+                                 layers: np.ndarray,
+                                 token_positions: np.ndarray,
+                                 depths: np.ndarray,
+                                 magnitudes: np.ndarray,
+                                 metadata: Dict[str, Any] = None,
+                                 mode: str = "set",
+                                 timestamps: Optional[np.ndarray] = None) -> None:
+        """
+        Record many Attribution Voids (R_A) at once.
+        
+        Array-in form of `record_attribution_void`: indices are clamped and
+        scattered into the tensor in one vectorized pass.
+        
+        Args:
+            layers: Model layers where the voids occurred [n]
+            token_positions: Token positions in the sequence [n]
+            depths: Recursive depths [n]
+            magnitudes: Magnitudes of the attribution voids [n]
+            metadata: Additional information shared by all voids
+            mode: How voids combine with existing cells ("set", "max" or "add")
+            timestamps: Per-event timestamps [n] (default: the current step)
+        """
+        layers, token_positions, depths, magnitudes = np.broadcast_arrays(
+            np.asarray(layers, dtype=int), np.asarray(token_positions, dtype=int),
+            np.asarray(depths, dtype=int), np.asarray(magnitudes, dtype=float))
+        
+        # Bounds checking
+        layers = np.clip(layers.ravel(), 0, self.layers - 1)
+        token_positions = self._token_positions(token_positions.ravel())
+        depths = np.clip(depths.ravel(), 0, self.depths - 1)
+        magnitudes = magnitudes.ravel()
+        
+        # Record in tensor
+        self._reserve_events("attribution_void", len(magnitudes), 0, metadata)
+        self._write(0, (layers, token_positions, depths), magnitudes, mode=mode)
+        
+        # Record detailed information
+        timestamps = self._timestamps(timestamps)
+        self.events["attribution_void"].extend(
+            layer=layers,
+            token_position=token_positions,
+            depth=depths,
+            timestamp=timestamps,
+            data=magnitudes[:, None],
+            metadata=metadata
+        )
+        self._log_events("attribution_void", mode, metadata, layer=layers, token_position=token_positions,
+                         depth=depths, magnitude=magnitudes, timestamp=timestamps)
+        
+    def record_token_hesitations(self,
+                                 token_positions: np.ndarray,
+                                 entropies: np.ndarray,
+                                 oscillations: np.ndarray,
+                                 splittings: np.ndarray,
+                                 depths: np.ndarray,
+                                 metadata: Dict[str, Any] = None,
+                                 mode: str = "set",
+                                 timestamps: Optional[np.ndarray] = None) -> None:
+        """
+        Record many Token Hesitations (R_T) at once.
+        
+        Array-in form of `record_token_hesitation`.
+        
+        Args:
+            token_positions: Token positions in the sequence [n]
+            entropies: Entropies of the token probability distributions [n]
+            oscillations: Oscillations between top candidates [n]
+            splittings: Splitting into distinct probability clusters [n]
+            depths: Recursive depths [n]
+            metadata: Additional information shared by all hesitations
+            mode: How hesitations combine with existing cells ("set", "max" or "add")
+            timestamps: Per-event timestamps [n] (default: the current step)
+        """
+        token_positions, entropies, oscillations, splittings, depths = np.broadcast_arrays(
+            np.asarray(token_positions, dtype=int), np.asarray(entropies, dtype=float),
+            np.asarray(oscillations, dtype=float), np.asarray(splittings, dtype=float),
+            np.asarray(depths, dtype=int))
+        
+        # Bounds checking
+        token_positions = self._token_positions(token_positions.ravel())
+        depths = np.clip(depths.ravel(), 0, self.depths - 1)
+        components = np.stack([entropies.ravel(), oscillations.ravel(), splittings.ravel()], axis=1)
+        
+        # Overall hesitation magnitude, averaged across all layers
+        magnitudes = np.sqrt(np.sum(components ** 2, axis=1))
+        self._reserve_events("token_hesitation", len(magnitudes), 0, metadata)
+        self._write(1, (np.arange(self.layers)[None, :], token_positions[:, None], depths[:, None]),
+                    (magnitudes / self.layers)[:, None], mode=mode)
+        
+        # Record detailed information
+        timestamps = self._timestamps(timestamps)
+        self.events["token_hesitation"].extend(
+            token_position=token_positions,
+            depth=depths,
+            timestamp=timestamps,
+            data=components,
+            metadata=metadata
+        )
+        self._log_events("token_hesitation", mode, metadata, token_position=token_positions, depth=depths,
+                         entropy=components[:, 0], oscillation=components[:, 1], splitting=components[:, 2],
+                         timestamp=timestamps)
+        
+    def record_recursive_collapses(self,
+                                   depths: np.ndarray,
+                                   coherences: np.ndarray,
+                                   collapse_thresholds: np.ndarray,
+                                   severities: np.ndarray,
+                                   affected_circuits: List[List[int]],
+                                   metadata: Dict[str, Any] = None,
+                                   mode: str = "set",
+                                   timestamps: Optional[np.ndarray] = None) -> None:
+        """
+        Record many Recursive Collapses (R_R) at once.
+        
+        Array-in form of `record_recursive_collapse`.
+        
+        Args:
+            depths: Recursive depths where collapses occurred [n]
+            coherences: Coherence values at collapse [n]
+            collapse_thresholds: Thresholds that were crossed [n]
+            severities: Severities of the collapses [n]
+            affected_circuits: Circuits affected by each collapse (n lists)
+            metadata: Additional information shared by all collapses
+            mode: How collapses combine with existing cells ("set", "max" or "add")
+            timestamps: Per-event timestamps [n] (default: the current step)
+        """
+        depths, coherences, collapse_thresholds, severities = np.broadcast_arrays(
+            np.asarray(depths, dtype=int), np.asarray(coherences, dtype=float),
+            np.asarray(collapse_thresholds, dtype=float), np.asarray(severities, dtype=float))
+        depths = np.clip(depths.ravel(), 0, self.depths - 1)
+        severities = severities.ravel()
+        if len(affected_circuits) != len(depths):
+            raise ValueError("Affected circuits must be given for every collapse")
+        
+        # Flatten (collapse, circuit) pairs, dropping circuits outside the model
+        counts = [len(circuits) for circuits in affected_circuits]
+        circuits = np.fromiter((c for cs in affected_circuits for c in cs), dtype=int, count=sum(counts))
+        owner = np.repeat(np.arange(len(depths)), counts)
+        valid = (circuits >= 0) & (circuits < self.layers)
+        circuits, owner = circuits[valid], owner[valid]
+        
+        # Record in tensor (once per relevant layer, covering every token)
+        self._reserve_events("recursive_collapse", len(depths), sum(counts), metadata)
+        self._write(2, (circuits, 0, depths[owner]), severities[owner], mode=mode)
+        
+        # Record detailed information
+        timestamps = self._timestamps(timestamps)
+        self.events["recursive_collapse"].extend(
+            depth=depths,
+            timestamp=timestamps,
+            data=np.stack([coherences.ravel(), collapse_thresholds.ravel(), severities], axis=1),
+            circuits=[list(c) for c in affected_circuits],
+            metadata=metadata
+        )
+        self._log_events("recursive_collapse", mode, metadata, depth=depths, coherence=coherences.ravel(),
+                         collapse_threshold=collapse_thresholds.ravel(), severity=severities,
+                         affected_circuits=affected_circuits, timestamp=timestamps)
         
     def measure_attribution_entropy(self, attribution_matrix: np.ndarray) -> Tuple[float, List[int]]:
         """
@@ -200,17 +1568,84 @@ class SymbolicResidueTensor:
         Returns:
             Tuple of (entropy, void_positions) where void_positions is a list of token positions
         """
-        # Normalize attribution matrix
-        attr_normalized = attribution_matrix / (np.sum(attribution_matrix, axis=1, keepdims=True) + 1e-10)
+        mean_entropy, void_mask, _ = self.measure_attribution_entropy_batch(attribution_matrix, batch_dims=0)
         
-        # Calculate entropy for each layer
-        entropies = -np.sum(attr_normalized * np.log2(attr_normalized + 1e-10), axis=1)
+        return float(mean_entropy), list(np.flatnonzero(void_mask))
+        
+    def measure_attribution_entropy_batch(self,
+                                          attributions: np.ndarray,
+                                          batch_dims: Optional[int] = None,
+                                          dtype: Optional[Union[str, np.dtype]] = None,
+                                          inplace: bool = False,
+                                          row_chunk: int = 1024) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Measure attribution entropy over stacks of attribution maps.
+        
+        Generalizes `measure_attribution_entropy` to inputs such as
+        [batch, layers, heads, tokens]: entropy is taken over the last (token)
+        axis, and the void threshold (mean + 2 std of entropies) is computed per
+        batch element over all remaining axes. Rows are normalized and reduced in
+        chunks through reused scratch buffers, so no full-size temporaries are
+        created.
+        
+        Args:
+            attributions: Attribution values [*batch, *rows, tokens]
+            batch_dims: Number of leading batch dimensions (default: all but the last two)
+            dtype: Compute dtype, e.g. float32 (default: input float dtype or float64)
+            inplace: Normalize `attributions` in place (must be a writeable,
+                C-contiguous array of the compute dtype)
+            row_chunk: Number of rows normalized and reduced at once
+            
+        Returns:
+            Tuple of (mean_entropy [*batch], void_mask [*batch, *rows], entropies [*batch, *rows])
+        """
+        attributions = np.asarray(attributions)
+        if batch_dims is None:
+            batch_dims = max(0, attributions.ndim - 2)
+        if dtype is None:
+            dtype = attributions.dtype if np.issubdtype(attributions.dtype, np.floating) else np.float64
+        dtype = np.dtype(dtype)
+        if inplace and (attributions.dtype != dtype or not attributions.flags.c_contiguous
+                        or not attributions.flags.writeable):
+            raise ValueError("In-place normalization needs a writeable, C-contiguous array of the compute dtype")
+        
+        tokens = attributions.shape[-1]
+        rows = attributions.reshape(-1, tokens)
+        entropies = np.empty(len(rows), dtype=dtype)
+        
+        chunk_rows = min(row_chunk, len(rows))
+        work_buffer = np.empty((chunk_rows, tokens), dtype=dtype)
+        probs_buffer = None if inplace else np.empty_like(work_buffer)
+        
+        for start in range(0, len(rows), row_chunk):
+            chunk = rows[start:start + row_chunk]
+            totals = np.sum(chunk, axis=1, dtype=dtype) + 1e-10
+            
+            # Normalize attribution rows
+            if inplace:
+                probs = chunk
+                probs /= totals[:, None]
+            else:
+                probs = probs_buffer[:len(chunk)]
+                np.divide(chunk, totals[:, None], out=probs)
+                
+            # Entropy of each row
+            work = work_buffer[:len(chunk)]
+            np.add(probs, 1e-10, out=work)
+            np.log2(work, out=work)
+            work *= probs
+            entropies[start:start + len(chunk)] = -np.sum(work, axis=1)
+            
+        entropies = entropies.reshape(attributions.shape[:-1])
         
-        # Detect positions with abnormally high entropy
-        threshold = np.mean(entropies) + 2 * np.std(entropies)
-        void_positions = list(np.where(entropies > threshold)[0])
+        # Detect rows with abnormally high entropy (per batch element)
+        batch_shape = attributions.shape[:batch_dims]
+        per_batch = entropies.reshape(batch_shape + (-1,))
+        mean_entropy = np.mean(per_batch, axis=-1)
+        threshold = mean_entropy + 2 * np.std(per_batch, axis=-1)
+        void_mask = entropies > threshold.reshape(batch_shape + (1,) * (entropies.ndim - batch_dims))
         
-        return float(np.mean(entropies)), void_positions
+        return mean_entropy, void_mask, entropies
         
     def measure_token_hesitation(self, token_probabilities: np.ndarray) -> Dict[str, float]:
         """
@@ -228,10 +1663,10 @@ class SymbolicResidueTensor:
         # Calculate entropy (flatness of distribution)
         entropy = -np.sum(probs * np.log2(probs + 1e-10))
         
-        # Find top-k candidates
+        # Find top-k candidates (partial selection, ascending like a sorted tail)
         k = min(10, len(probs))
-        top_indices = np.argsort(probs)[-k:]
-        top_probs = probs[top_indices]
+        top_indices = np.argpartition(probs, len(probs) - k)[-k:]
+        top_probs = np.sort(probs[top_indices])
         
         # Calculate oscillation (difference between top candidates)
         if len(top_probs) >= 2:
@@ -254,6 +1689,111 @@ class SymbolicResidueTensor:
             "splitting": float(splitting)
         }
         
+    def measure_token_hesitation_batch(self,
+                                       token_scores: np.ndarray,
+                                       logits: bool = False,
+                                       top_k: int = 10,
+                                       vocab_chunk: int = 16384,
+                                       position_chunk: int = 32) -> Dict[str, np.ndarray]:
+        """
+        Measure hesitation for many token positions at once.
+        
+        Batched form of `measure_token_hesitation` over a [positions, vocab]
+        matrix. The vocabulary is processed in chunks (top-k candidates are
+        merged by partial selection, never a full sort) so temporaries stay at
+        [position_chunk, vocab_chunk]. With `logits=True` the rows are raw logits
+        and a fused, chunked log-softmax is used instead of normalizing.
+        
+        Args:
+            token_scores: Probabilities (or logits) [positions, vocab]
+            logits: Whether `token_scores` are logits
+            top_k: Number of top candidates used for oscillation and splitting
+            vocab_chunk: Vocabulary columns processed at once
+            position_chunk: Positions processed at once
+            
+        Returns:
+            Dictionary with "entropy", "oscillation" and "splitting" arrays [positions]
+        """
+        scores = np.asarray(token_scores)
+        if scores.ndim == 1:
+            scores = scores[None, :]
+        dtype = scores.dtype if np.issubdtype(scores.dtype, np.floating) else np.float64
+        positions, vocab = scores.shape
+        k = min(top_k, vocab)
+        
+        entropy = np.zeros(positions, dtype=dtype)
+        top_probs = np.zeros((positions, k), dtype=dtype)
+        
+        # Scratch buffers reused across chunks to avoid per-chunk temporaries
+        probs_buffer = np.empty((min(position_chunk, positions), min(vocab_chunk, vocab)), dtype=dtype)
+        work_buffer = np.empty_like(probs_buffer)
+        
+        for start in range(0, positions, position_chunk):
+            block = scores[start:start + position_chunk].astype(dtype, copy=False)
+            if logits:
+                log_normalizer = self._chunked_logsumexp(block, vocab_chunk)
+            else:
+                total = np.sum(block, axis=1, dtype=dtype) + 1e-10
+                
+            block_entropy = np.zeros(len(block), dtype=dtype)
+            candidates = None
+            for v in range(0, vocab, vocab_chunk):
+                chunk = block[:, v:v + vocab_chunk]
+                probs = probs_buffer[:chunk.shape[0], :chunk.shape[1]]
+                work = work_buffer[:chunk.shape[0], :chunk.shape[1]]
+                if logits:
+                    np.subtract(chunk, log_normalizer[:, None], out=work)  # log-probabilities
+                    np.exp(work, out=probs)
+                    work *= probs
+                    block_entropy -= np.sum(work, axis=1) / np.log(2)
+                else:
+                    np.divide(chunk, total[:, None], out=probs)
+                    np.add(probs, 1e-10, out=work)
+                    np.log2(work, out=work)
+                    work *= probs
+                    block_entropy -= np.sum(work, axis=1)
+                    
+                # Keep the running top-k by partial selection
+                kc = min(k, probs.shape[1])
+                chunk_top = np.partition(probs, probs.shape[1] - kc, axis=1)[:, -kc:]
+                candidates = chunk_top if candidates is None else np.concatenate([candidates, chunk_top], axis=1)
+                if candidates.shape[1] > k:
+                    candidates = np.partition(candidates, candidates.shape[1] - k, axis=1)[:, -k:]
+                    
+            entropy[start:start + len(block)] = block_entropy
+            top_probs[start:start + len(block)] = np.sort(candidates, axis=1)
+            
+        # Oscillation and splitting exactly as in the single-position method
+        if k >= 2:
+            oscillation = top_probs[:, 0] - top_probs[:, 1]
+        else:
+            oscillation = np.zeros(positions, dtype=dtype)
+            
+        if k >= 3:
+            gaps = np.diff(top_probs, axis=1)
+            splitting = np.max(gaps, axis=1) / (np.mean(gaps, axis=1) + 1e-10)
+        else:
+            splitting = np.ones(positions, dtype=dtype)
+            
+        return {
+            "entropy": entropy,
+            "oscillation": oscillation,
+            "splitting": splitting
+        }
+        
+    @staticmethod
+    def _chunked_logsumexp(block: np.ndarray, vocab_chunk: int) -> np.ndarray:
+        """Row-wise log-sum-exp over vocabulary chunks (online rescaling)."""
+        running_max = np.full(len(block), -np.inf, dtype=block.dtype)
+        running_sum = np.zeros(len(block), dtype=block.dtype)
+        for v in range(0, block.shape[1], vocab_chunk):
+            chunk = block[:, v:v + vocab_chunk]
+            new_max = np.maximum(running_max, np.max(chunk, axis=1))
+            running_sum = (running_sum * np.exp(running_max - new_max) +
+                           np.sum(np.exp(chunk - new_max[:, None]), axis=1))
+            running_max = new_max
+        return running_max + np.log(running_sum)
+        
     def detect_recursive_collapse(self, 
                                 coherence_values: List[float], 
                                 threshold: float = 0.7) -> Tuple[bool, int, float]:
@@ -280,6 +1820,47 @@ class SymbolicResidueTensor:
         # No collapse detected
         return False, len(coherence_values), 0.0
         
+    def detect_recursive_collapse_batch(self,
+                                        coherence_values: np.ndarray,
+                                        threshold: Union[float, np.ndarray] = 0.7
+                                        ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Detect recursive collapse for many coherence sequences at once.
+        
+        Vectorized form of `detect_recursive_collapse` over the rows of an [N, D]
+        matrix. The threshold broadcasts against the matrix (scalar, per-depth [D],
+        per-row [N, 1] or full [N, D]).
+        
+        Args:
+            coherence_values: Coherence values [N, D] across recursive depths
+            threshold: Coherence threshold below which collapse occurs
+            
+        Returns:
+            Tuple of (collapse_detected [N], collapse_depth [N], severity [N])
+        """
+        coherence_values = np.asarray(coherence_values, dtype=float)
+        if coherence_values.ndim != 2:
+            raise ValueError("Coherence values must have shape [N, D]")
+        threshold = np.broadcast_to(np.asarray(threshold, dtype=float), coherence_values.shape)
+        
+        n_rows, n_depths = coherence_values.shape
+        if n_depths == 0:
+            return np.zeros(n_rows, dtype=bool), np.zeros(n_rows, dtype=int), np.zeros(n_rows)
+        
+        # Find first depth where coherence falls below threshold
+        below = coherence_values < threshold
+        collapse_detected = below.any(axis=1)
+        first = below.argmax(axis=1)
+        collapse_depth = np.where(collapse_detected, first, n_depths)
+        
+        # Severity as how far below threshold at the first crossing
+        rows = np.arange(n_rows)
+        crossing_threshold = threshold[rows, first]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            severity = (crossing_threshold - coherence_values[rows, first]) / crossing_threshold
+        
+        return collapse_detected, collapse_depth, np.where(collapse_detected, severity, 0.0)
+        
     def analyze_residue_pattern(self) -> Dict[str, Any]:
         """
         Analyze the residue tensor to identify patterns.
@@ -290,33 +1871,28 @@ class SymbolicResidueTensor:
         results = {}
         
         # Check if tensor has been populated
-        if np.max(self.tensor) == 0:
+        marginals = self.marginals
+        if marginals.positive == 0:
             return {"error": "No residue data recorded"}
         
         # 1. Spatial distribution analysis
-        spatial_distribution = np.sum(self.tensor, axis=(1, 3))  # Sum over layers and depths
+        spatial_distribution = marginals.token[:, :marginals.extent]  # Sum over layers and depths
         results["spatial_concentration"] = float(np.max(spatial_distribution) / (np.mean(spatial_distribution) + 1e-10))
         results["spatial_entropy"] = float(-np.sum((spatial_distribution / (np.sum(spatial_distribution) + 1e-10)) * 
                                            np.log2(spatial_distribution / (np.sum(spatial_distribution) + 1e-10) + 1e-10)))
         
         # 2. Temporal evolution (approximated by depth)
-        temporal_evolution = np.sum(self.tensor, axis=(1, 2))  # Sum over layers and tokens
-        results["temporal_gradient"] = float(np.gradient(temporal_evolution).mean())
+        temporal_evolution = marginals.depth  # Sum over layers and tokens
+        results["temporal_gradient"] = float(np.gradient(temporal_evolution, axis=-1).mean())
         
-        # 3. Magnitude spectrum
-        magnitude_spectrum = np.sort(self.tensor.flatten())
-        results["magnitude_median"] = float(np.median(magnitude_spectrum))
-        results["magnitude_variance"] = float(np.var(magnitude_spectrum))
+        # 3. Magnitude spectrum (selection over non-zero cells, no full sort)
+        results["magnitude_median"] = marginals.median(self.storage)
+        results["magnitude_variance"] = marginals.variance()
         
         # 4. Phase relationships between residue types
-        attribution_pattern = self.tensor[0].flatten()
-        hesitation_pattern = self.tensor[1].flatten()
-        collapse_pattern = self.tensor[2].flatten()
-        
-        # Calculate correlations between residue types
-        results["attr_hesitation_corr"] = float(np.corrcoef(attribution_pattern, hesitation_pattern)[0, 1])
-        results["attr_collapse_corr"] = float(np.corrcoef(attribution_pattern, collapse_pattern)[0, 1])
-        results["hesitation_collapse_corr"] = float(np.corrcoef(hesitation_pattern, collapse_pattern)[0, 1])
+        results["attr_hesitation_corr"] = marginals.correlation(0, 1)
+        results["attr_collapse_corr"] = marginals.correlation(0, 2)
+        results["hesitation_collapse_corr"] = marginals.correlation(1, 2)
         
         # 5. Residue signature classification
         signature = self.classify_residue_signature()
@@ -326,199 +1902,557 @@ class SymbolicResidueTensor:
         
         return results
         
-    def classify_residue_signature(self) -> Dict[str, Any]:
+    def residue_features(self) -> np.ndarray:
         """
-        Classify the residue pattern into a known signature.
+        Calculate the feature vector used for signature classification.
         
         Returns:
-            Dictionary with signature classification
+            Feature vector (class ratios, normalized class totals, depth slope)
         """
         # Calculate feature vector for classification
         features = []
         
         # Feature 1: Ratio of residue types
-        total = np.sum(self.tensor) + 1e-10
-        attr_ratio = np.sum(self.tensor[0]) / total
-        hesit_ratio = np.sum(self.tensor[1]) / total
-        collapse_ratio = np.sum(self.tensor[2]) / total
+        class_totals = self.marginals.total
+        total = np.sum(class_totals) + 1e-10
+        attr_ratio = class_totals[0] / total
+        hesit_ratio = class_totals[1] / total
+        collapse_ratio = class_totals[2] / total
         features.extend([attr_ratio, hesit_ratio, collapse_ratio])
         
         # Feature 2: Layer distribution
-        layer_dist = np.sum(self.tensor, axis=(1, 2, 3))
+        layer_dist = class_totals
         features.extend(layer_dist / (np.sum(layer_dist) + 1e-10))
         
         # Feature 3: Depth progression
-        depth_progression = np.sum(self.tensor, axis=(0, 1, 2))
+        depth_progression = self.marginals.depth.sum(axis=0)
         depth_slope = np.polyfit(np.arange(len(depth_progression)), depth_progression, 1)[0]
         features.append(depth_slope)
         
-        # Define known signatures
-        signatures = {
-            "attribution_gap": np.array([0.7, 0.2, 0.1, 0.6, 0.3, 0.1, 0.2]),
-            "phase_misalignment": np.array([0.2, 0.3, 0.5, 0.2, 0.2, 0.6, 0.8]),
-            "boundary_erosion": np.array([0.4, 0.4, 0.2, 0.2, 0.6, 0.2, 0.1]),
-            "temporal_instability": np.array([0.3, 0.6, 0.1, 0.4, 0.4, 0.2, -0.5]),
-            "attractor_dissolution": np.array([0.2, 0.3, 0.5, 0.3, 0.3, 0.4, 0.3])
-        }
+        return np.array(features)
+        
+    def register_signature(self, name: str, signature: np.ndarray) -> None:
+        """
+        Register an additional (or replace an existing) reference signature.
+        
+        Args:
+            name: Signature name reported by classification
+            signature: Reference feature vector (zero-padded to a common length)
+        """
+        signatures = dict(zip(self.signature_names, self._signature_vectors))
+        signatures[name] = np.asarray(signature, dtype=float)
+        self._compile_signatures(signatures)
+        
+    def _compile_signatures(self, signatures: Dict[str, np.ndarray]) -> None:
+        """Build the padded, pre-normalized signature matrix."""
+        self.signature_names = list(signatures)
+        self._signature_vectors = [np.asarray(v, dtype=float) for v in signatures.values()]
+        width = max(len(v) for v in self._signature_vectors)
+        matrix = np.zeros((len(self._signature_vectors), width))
+        for i, vector in enumerate(self._signature_vectors):
+            matrix[i, :len(vector)] = vector
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        self.signature_matrix = matrix / np.where(norms > 0, norms, 1.0)
+        
+    def classify_many(self, features: np.ndarray) -> Dict[str, Any]:
+        """
+        Classify many feature vectors against the reference signatures at once.
         
-        # Convert features to numpy array
-        feature_vector = np.array(features)
+        Cosine distances to every signature come from one matrix multiply with
+        the pre-normalized signature matrix. Zero vectors get distance 1.
         
-        # Calculate distances to known signatures
-        distances = {}
-        for name, signature in signatures.items():
-            # Ensure same length by padding
-            max_len = max(len(feature_vector), len(signature))
-            padded_feature = np.pad(feature_vector, (0, max_len - len(feature_vector)))
-            padded_signature = np.pad(signature, (0, max_len - len(signature)))
+        Args:
+            features: Feature vectors [N, features] (e.g. from `residue_features`)
             
-            # Calculate cosine distance
-            distances[name] = distance.cosine(padded_feature, padded_signature)
+        Returns:
+            Dictionary with "signatures" (closest name per row), "confidences" [N],
+            "distances" [N, signatures] and "signature_names"
+        """
+        features = np.atleast_2d(np.asarray(features, dtype=float))
+        width = max(features.shape[1], self.signature_matrix.shape[1])
+        
+        # Ensure same length by padding (zeros do not change cosine distance)
+        padded_features = np.zeros((len(features), width))
+        padded_features[:, :features.shape[1]] = features
+        padded_signatures = np.zeros((len(self.signature_matrix), width))
+        padded_signatures[:, :self.signature_matrix.shape[1]] = self.signature_matrix
+        
+        # Calculate cosine distances
+        norms = np.linalg.norm(padded_features, axis=1, keepdims=True)
+        distances = 1.0 - (padded_features / np.where(norms > 0, norms, 1.0)) @ padded_signatures.T
+        distances[norms[:, 0] == 0] = 1.0
+        
+        # Find closest signature and its confidence (inverse of distance)
+        closest = np.argmin(distances, axis=1)
+        min_distance = distances[np.arange(len(distances)), closest]
+        
+        return {
+            "signatures": np.array(self.signature_names, dtype=object)[closest],
+            "confidences": 1.0 / (1.0 + min_distance),
+            "distances": distances,
+            "signature_names": list(self.signature_names)
+        }
         
-        # Find closest signature
-        primary_signature = min(distances, key=distances.get)
-        min_distance = distances[primary_signature]
+    def classify_residue_signature(self) -> Dict[str, Any]:
+        """
+        Classify the residue pattern into a known signature.
         
-        # Calculate confidence (inverse of distance)
-        confidence = 1.0 / (1.0 + min_distance)
+        Returns:
+            Dictionary with signature classification
+        """
+        feature_vector = self.residue_features()
+        classification = self.classify_many(feature_vector[None, :])
+        distances = classification["distances"][0]
         
         # Return classification
         return {
-            "primary_signature": primary_signature,
-            "confidence": float(confidence),
+            "primary_signature": classification["signatures"][0],
+            "confidence": float(classification["confidences"][0]),
             "details": {
-                "distances": {k: float(v) for k, v in distances.items()},
+                "distances": {name: float(d) for name, d in zip(classification["signature_names"], distances)},
                 "feature_vector": feature_vector.tolist()
             }
         }
         
     def visualize_residue(self, 
                         output_path: Optional[str] = None,
-                        show_plot: bool = True) -> None:
+                        show_plot: bool = True,
+                        pooling: Optional[str] = 'max') -> None:
         """
         Visualize the residue tensor.
         
+        Panels are drawn from the cached marginals (never the full tensor), with
+        the token axis pooled down to the output pixel width. Without
+        `show_plot`, rendering is headless and reuses this tensor's figure.
+        
         Args:
             output_path: Optional path to save visualization
             show_plot: Whether to display the plot
+            pooling: Token pooling method ("max" or "mean", None for full resolution)
         """
-        fig = plt.figure(figsize=(15, 10))
-        
-        # 1. Heatmap of Attribution Voids
-        ax1 = fig.add_subplot(231)
-        attribution_heatmap = np.sum(self.tensor[0], axis=2)  # Sum over depths
-        im1 = ax1.imshow(attribution_heatmap, cmap='Blues')
-        ax1.set_title('Attribution Voids')
-        ax1.set_xlabel('Token Position')
-        ax1.set_ylabel('Layer')
-        plt.colorbar(im1, ax=ax1)
-        
-        # 2. Heatmap of Token Hesitations
-        ax2 = fig.add_subplot(232)
-        hesitation_heatmap = np.sum(self.tensor[1], axis=0)  # Sum over layers
-        im2 = ax2.imshow(hesitation_heatmap, cmap='Reds')
-        ax2.set_title('Token Hesitations')
-        ax2.set_xlabel('Token Position')
-        ax2.set_ylabel('Recursive Depth')
-        plt.colorbar(im2, ax=ax2)
-        
-        # 3. Heatmap of Recursive Collapses
-        ax3 = fig.add_subplot(233)
-        collapse_heatmap = np.sum(self.tensor[2], axis=1)  # Sum over tokens
-        im3 = ax3.imshow(collapse_heatmap, cmap='Greens')
-        ax3.set_title('Recursive Collapses')
-        ax3.set_xlabel('Recursive Depth')
-        ax3.set_ylabel('Layer')
-        plt.colorbar(im3, ax=ax3)
-        
-        # 4. Line plot of residue by depth
-        ax4 = fig.add_subplot(234)
-        depth_sums = np.sum(self.tensor, axis=(1, 2))  # Sum over layers and tokens
-        ax4.plot(range(self.depths), depth_sums[0], 'b-', label='Attribution Voids')
-        ax4.plot(range(self.depths), depth_sums[1], 'r-', label='Token Hesitations')
-        ax4.plot(range(self.depths), depth_sums[2], 'g-', label='Recursive Collapses')
-        ax4.set_title('Residue by Recursive Depth')
-        ax4.set_xlabel('Recursive Depth')
-        ax4.set_ylabel('Total Residue')
-        ax4.legend()
-        
-        # 5. Bar chart of residue by layer
-        ax5 = fig.add_subplot(235)
-        layer_sums = np.sum(self.tensor, axis=(2, 3))  # Sum over tokens and depths
-        ax5.bar(range(self.layers), layer_sums[0], color='blue', alpha=0.3, label='Attribution Voids')
-        ax5.bar(range(self.layers), layer_sums[1], bottom=layer_sums[0], color='red', alpha=0.3, label='Token Hesitations')
-        ax5.bar(range(self.layers), layer_sums[2], bottom=layer_sums[0]+layer_sums[1], color='green', alpha=0.3, label='Recursive Collapses')
-        ax5.set_title('Residue by Layer')
-        ax5.set_xlabel('Layer')
-        ax5.set_ylabel('Total Residue')
-        ax5.legend()
-        
-        # 6. Pie chart of residue type distribution
-        ax6 = fig.add_subplot(236)
-        residue_totals = [np.sum(self.tensor[0]), np.sum(self.tensor[1]), np.sum(self.tensor[2])]
-        ax6.pie(residue_totals, labels=['Attribution Voids', 'Token Hesitations', 'Recursive Collapses'],
-                autopct='%1.1f%%', startangle=90)
-        ax6.set_title('Residue Type Distribution')
-        
-        plt.tight_layout()
+        from residue_render import ResidueRenderer, draw_residue_panels  # Imported only when plotting
+        
+        if self._renderer is None or self._renderer.pooling != pooling:
+            self._renderer = ResidueRenderer(pooling=pooling)
+        panels = self._renderer.panels(self.marginals)
+        
+        if not show_plot:
+            if output_path:
+                self._renderer.render(panels, output_path)
+            return
+            
+        import matplotlib.pyplot as plt
+        
+        fig = plt.figure(figsize=self._renderer.figsize)
+        draw_residue_panels(fig, panels)
         
         # Save if output path provided
         if output_path:
-            plt.savefig(output_path, dpi=300, bbox_inches='tight')
+            fig.savefig(output_path, dpi=self._renderer.dpi, bbox_inches='tight')
+            
+        plt.show()
+        plt.close(fig)
+    
+    MERGE_POLICIES = ("sum", "max", "last")
+    
+    def merge(self,
+              other: "SymbolicResidueTensor",
+              policies: Union[str, Dict[Union[int, str], str]] = "last") -> None:
+        """
+        Merge another residue tensor shard into this one.
+        
+        Cells are combined per residue class with an explicit policy:
+        "sum" adds the shards, "max" keeps the larger value, and "last" keeps
+        the value of whichever shard wrote the cell at the later step (from
+        event timestamps; ties go to `other`). Event logs are merged in
+        timestamp order and the cached marginals are updated incrementally.
+        
+        Args:
+            other: Shard with the same shape, or the same layers and depths when
+                this tensor's token axis is growable (left unchanged)
+            policies: One policy for every class, or a dictionary from residue
+                class (index or event name) to policy; unlisted classes use "last"
+        """
+        same_cells = np.delete(other.storage.shape, 2).tolist() == np.delete(self.storage.shape, 2).tolist()
+        if not same_cells or (other.storage.shape != self.storage.shape and not self.token_block):
+            raise ValueError(f"Cannot merge shard of shape {other.storage.shape} into {self.storage.shape}")
+        names = list(self.events)
+        if isinstance(policies, str):
+            policies = {name: policies for name in names}
+        policies = {names[c] if not isinstance(c, str) else c: p for c, p in policies.items()}
+        for name, policy in policies.items():
+            if name not in self.events:
+                raise ValueError(f"Unknown residue class: {name}")
+            if policy not in self.MERGE_POLICIES:
+                raise ValueError(f"Unknown merge policy: {policy}")
+        if other.storage.shape[2] > self.storage.shape[2]:
+            self._token_positions(other.storage.shape[2] - 1)
+                
+        cell_shape = self.storage.shape[1:]
+        incoming_index, incoming = other.storage.items()
+        own_index, own = self.storage.items()
+        for residue_class, name in enumerate(names):
+            policy = policies.get(name, "last")
+            mask = incoming_index[0] == residue_class
+            cells = tuple(axis[mask] for axis in incoming_index[1:])
+            if policy == "sum":
+                self._write(residue_class, cells, incoming[mask], mode="add")
+                continue
+            if policy == "max":
+                self._write(residue_class, cells, incoming[mask], mode="max")
+                continue
+                
+            # Last writer by step over the cells populated in either shard
+            own_mask = own_index[0] == residue_class
+            keys = np.union1d(np.ravel_multi_index(cells, cell_shape),
+                              np.ravel_multi_index(tuple(axis[own_mask] for axis in own_index[1:]), cell_shape))
+            cells = np.unravel_index(keys, cell_shape)
+            # The shard may have fewer token positions than this tensor
+            inside = cells[1] < other.storage.shape[2]
+            inside_cells = tuple(axis[inside] for axis in cells)
+            values = np.zeros(len(keys), dtype=self.storage.dtype)
+            values[inside] = other.storage.get((residue_class,) + inside_cells)
+            other_steps = np.full(len(keys), -1, dtype=np.int64)
+            other_steps[inside] = other._cell_steps(residue_class, inside_cells)
+            own_steps = self._cell_steps(residue_class, cells)
+            # Cells without events in either shard keep the non-zero value
+            take = (other_steps > own_steps) | ((other_steps == own_steps) & (values != 0))
+            self._write(residue_class, tuple(axis[take] for axis in cells), values[take])
             
-        # Show if requested
-        if show_plot:
-            plt.show()
+        for name, log in self.events.items():
+            log.merge(other.events[name])
+        self.history.extend(other.history)
+        self.config["current_step"] = max(self.config.get("current_step", 0), other.config.get("current_step", 0))
+        
+    def _cell_steps(self, residue_class: int, cells: Tuple[np.ndarray, np.ndarray, np.ndarray]) -> np.ndarray:
+        """
+        Latest event step that wrote each cell of one residue class (-1 if none).
+        
+        Hesitations cover every layer of their (token, depth) and collapses every
+        token of their (circuit, depth), so steps are looked up at that grain.
+        """
+        layers, tokens, depths = cells
+        log = self.events[list(self.events)[residue_class]]
+        records = log.records
+        if residue_class == 0:
+            shape = self.storage.shape[1:]
+            event_keys = np.ravel_multi_index((records["layer"], records["token_position"], records["depth"]), shape)
+            query = np.ravel_multi_index((layers, tokens, depths), shape)
+            steps = records["timestamp"]
+        elif residue_class == 1:
+            shape = self.storage.shape[2:]
+            event_keys = np.ravel_multi_index((records["token_position"], records["depth"]), shape)
+            query = np.ravel_multi_index((tokens, depths), shape)
+            steps = records["timestamp"]
         else:
-            plt.close()
+            shape = (self.storage.shape[1], self.storage.shape[3])
+            rows, circuits = log.expand_circuits()
+            valid = (circuits >= 0) & (circuits < shape[0])
+            rows, circuits = rows[valid], circuits[valid]
+            event_keys = np.ravel_multi_index((circuits, records["depth"][rows]), shape)
+            query = np.ravel_multi_index((layers, depths), shape)
+            steps = records["timestamp"][rows]
+            
+        # Maximum step per key, then a sorted lookup of the queried cells
+        order = np.lexsort((steps, event_keys))[::-1]
+        keys, last = np.unique(event_keys[order], return_index=True)
+        latest = steps[order][last]
+        result = np.full(len(query), -1, dtype=np.int64)
+        if len(keys):
+            position = np.minimum(np.searchsorted(keys, query), len(keys) - 1)
+            found = keys[position] == query
+            result[found] = latest[position[found]]
+        return result
+        
+    WIRE_MAGIC = b"RSDWIRE1"
+    
+    def to_bytes(self, compress: bool = True) -> bytes:
+        """
+        Serialize the tensor for shipping between processes or nodes.
+        
+        Only non-zero cells are sent (as sorted flat keys and values), together
+        with the event columns and a JSON header; nothing is pickled. Marginals
+        are rebuilt from the cells on arrival.
+        
+        Args:
+            compress: zlib-compress the array payload
+            
+        Returns:
+            Serialized shard
+        """
+        import zlib
+        
+        (index, values) = self.storage.items()
+        keys = np.ravel_multi_index(index, self.storage.shape)
+        order = np.argsort(keys)
+        arrays = {"cell_keys": keys[order].astype(np.int64), "cell_values": values[order]}
+        for name, log in self.events.items():
+            arrays[name] = log.records
+            arrays[f"{name}.circuits"] = log._circuits[:log._circuit_size]
+            
+        config = dict(self.config)
+        config["storage"] = self.storage.kind
+        config["token_block"] = self.token_block
+        layout, offset = [], 0
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            arrays[name] = array
+            layout.append([name, np.lib.format.dtype_to_descr(array.dtype), list(array.shape), offset])
+            offset += array.nbytes
+        header = json.dumps({
+            "shape": list(self.storage.shape),
+            "config": config,
+            "history": self.history,
+            "metadata": {name: log._metadata for name, log in self.events.items()},
+            "arrays": layout,
+        }, default=_json_default).encode()
+        
+        body = b"".join(array.tobytes() for array in arrays.values())
+        if compress:
+            body = zlib.compress(body, 1)
+        return self.WIRE_MAGIC + struct.pack("<?I", compress, len(header)) + header + body
+        
+    @classmethod
+    def from_bytes(cls, data: bytes, config: Optional[Dict] = None) -> "SymbolicResidueTensor":
+        """
+        Rebuild a tensor serialized with `to_bytes`.
+        
+        Args:
+            data: Serialized shard
+            config: Config overrides (e.g. a different storage backend)
+            
+        Returns:
+            New residue tensor
+        """
+        import zlib
+        
+        if data[:len(cls.WIRE_MAGIC)] != cls.WIRE_MAGIC:
+            raise ValueError("Not a serialized residue tensor")
+        offset = len(cls.WIRE_MAGIC)
+        compressed, header_size = struct.unpack_from("<?I", data, offset)
+        offset += struct.calcsize("<?I")
+        header = json.loads(data[offset:offset + header_size])
+        body = data[offset + header_size:]
+        if compressed:
+            body = zlib.decompress(body)
+            
+        arrays = {}
+        for name, descr, shape, start in header["arrays"]:
+            dtype = np.lib.format.descr_to_dtype(descr)
+            count = int(np.prod(shape))
+            arrays[name] = np.frombuffer(body, dtype=dtype, count=count, offset=start).reshape(shape).copy()
+            
+        shape = tuple(header["shape"])
+        residue_tensor = cls({**header["config"], **(config or {}),
+                              "layers": shape[1], "tokens": shape[2], "depths": shape[3]})
+        residue_tensor.storage.put(np.unravel_index(arrays["cell_keys"], shape), arrays["cell_values"])
+        residue_tensor.rebuild_marginals()
+        for name, log in residue_tensor.events.items():
+            log.restore(arrays[name], arrays[f"{name}.circuits"], header["metadata"][name])
+        residue_tensor.history = header["history"]
+        return residue_tensor
     
     def reset(self) -> None:
         """Reset the residue tensor and all tracking."""
         self.initialize_tensor()
-        self.attribution_voids = []
-        self.token_hesitations = []
-        self.recursive_collapses = []
+        for log in self.events.values():
+            log.clear()
         self.history = []
     
-    def save(self, file_path: str) -> None:
+    SAVE_FORMAT = "symbolic-residue-tensor"
+    SAVE_VERSION = 1
+    
+    def save(self, file_path: str, analysis: Union[bool, Dict[str, Any]] = True) -> None:
         """
-        Save the residue tensor and analysis to a file.
+        Save the residue tensor to a directory of arrays with a JSON header.
+        
+        Nothing is pickled: the tensor cells, event columns and cached marginals
+        are plain .npy/.npz files (memory-mappable on load), and the header holds
+        the shape, config, history, event metadata and optional analysis.
         
         Args:
-            file_path: Path to save file
+            file_path: Directory to save into (created if missing)
+            analysis: True to run and store `analyze_residue_pattern`, False to skip
+                it, or a precomputed analysis dictionary to store as-is
         """
-        save_data = {
-            "tensor": self.tensor,
-            "attribution_voids": self.attribution_voids,
-            "token_hesitations": self.token_hesitations,
-            "recursive_collapses": self.recursive_collapses,
+        os.makedirs(file_path, exist_ok=True)
+        if analysis is True:
+            analysis = self.analyze_residue_pattern()
+        
+        self.storage.save(file_path)
+        self.marginals.save(os.path.join(file_path, "marginals.npz"))
+        events = {}
+        for name, log in self.events.items():
+            np.save(os.path.join(file_path, f"{name}.npy"), log.records, allow_pickle=False)
+            np.save(os.path.join(file_path, f"{name}.circuits.npy"), log._circuits[:log._circuit_size],
+                    allow_pickle=False)
+            events[name] = {"count": len(log), "metadata": log._metadata}
+        
+        config = dict(self.config)
+        config["storage"] = self.storage.kind
+        config["token_block"] = self.token_block
+        header = {
+            "format": self.SAVE_FORMAT,
+            "version": self.SAVE_VERSION,
+            "shape": list(self.storage.shape),
+            "dtype": self.storage.dtype.str,
+            "storage": self.storage.kind,
+            "config": config,
             "history": self.history,
-            "config": self.config,
-            "analysis": self.analyze_residue_pattern()
+            "events": events,
+            "analysis": analysis or None
         }
         
-        np.save(file_path, save_data, allow_pickle=True)
+        # The header is written last and marks the save as complete
+        with open(os.path.join(file_path, "header.json"), "w") as f:
+            json.dump(header, f, indent=2, default=_json_default)
     
-    def load(self, file_path: str) -> None:
+    def load(self,
+             file_path: str,
+             mmap: bool = False,
+             residue_classes: Optional[List[Union[int, str]]] = None,
+             layers: Optional[Tuple[int, int]] = None) -> None:
         """
-        Load residue tensor and analysis from a file.
+        Load a residue tensor saved by `save` (or a legacy pickled .npy file).
         
         Args:
-            file_path: Path to load file
+            file_path: Saved tensor directory (or legacy .npy file)
+            mmap: Memory-map tensor and event arrays instead of reading them
+                (dense cells are mapped copy-on-write, so recording still works)
+            residue_classes: Only load these residue classes, by index or event
+                name (cells and events of other classes are left empty)
+            layers: Only load this inclusive (low, high) layer range; Attribution
+                Voids outside it are skipped (other events have no layer)
         """
+        if os.path.isfile(file_path):
+            self._load_legacy(file_path)
+            return
+            
+        header = self.read_header(file_path)
+        names = list(self.events)
+        classes = None
+        if residue_classes is not None:
+            classes = sorted(names.index(c) if isinstance(c, str) else int(c) for c in residue_classes)
+        partial = classes is not None or layers is not None
+        
+        self.config = header["config"]
+        self.token_block = self.config.get("token_block", self.DEFAULT_TOKEN_BLOCK)
+        self.storage_class = RESIDUE_STORAGE_BACKENDS[header["storage"]]
+        self.history = header["history"]
+        self.saved_analysis = header["analysis"] if not partial else None
+        shape = tuple(header["shape"])
+        self.layers, self.tokens, self.depths = shape[1:]
+        
+        self.storage = self.storage_class.load(file_path, shape, mmap=mmap, classes=classes, layers=layers)
+        
+        # Saved marginals are only valid for the full tensor
+        self.marginals = None if partial else ResidueMarginals.load(os.path.join(file_path, "marginals.npz"), shape,
+                                                                    growable=bool(self.token_block))
+        if self.marginals is None:
+            self.rebuild_marginals()
+        
+        mode = "c" if mmap else None
+        for residue_class, (name, log) in enumerate(self.events.items()):
+            records = np.load(os.path.join(file_path, f"{name}.npy"), mmap_mode=mode)
+            circuits = np.load(os.path.join(file_path, f"{name}.circuits.npy"), mmap_mode=mode)
+            if classes is not None and residue_class not in classes:
+                records = records[:0]
+            if layers is not None and "layer" in records.dtype.names:
+                records = records[(records["layer"] >= layers[0]) & (records["layer"] <= layers[1])]
+            log.restore(records, circuits, header["events"][name]["metadata"])
+            
+    @staticmethod
+    def read_header(file_path: str) -> Dict[str, Any]:
+        """
+        Read the JSON header of a saved residue tensor without loading any arrays.
+        
+        Args:
+            file_path: Saved tensor directory
+            
+        Returns:
+            Header dictionary (shape, config, event counts, analysis, ...)
+        """
+        with open(os.path.join(file_path, "header.json")) as f:
+            header = json.load(f)
+        if header.get("format") != SymbolicResidueTensor.SAVE_FORMAT:
+            raise ValueError(f"Not a saved residue tensor: {file_path}")
+        if header["version"] > SymbolicResidueTensor.SAVE_VERSION:
+            raise ValueError(f"Unsupported residue tensor format version {header['version']}")
+        return header
+        
+    @staticmethod
+    def load_analysis(file_path: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the analysis cached in a saved residue tensor, if any.
+        
+        Args:
+            file_path: Saved tensor directory (or legacy .npy file)
+            
+        Returns:
+            Analysis dictionary, or None if it was not stored at save time
+        """
+        if os.path.isfile(file_path):
+            return np.load(file_path, allow_pickle=True).item().get("analysis")
+        return SymbolicResidueTensor.read_header(file_path)["analysis"]
+    
+    def _load_legacy(self, file_path: str) -> None:
+        """Load a pickled .npy file written by older versions of `save`."""
         load_data = np.load(file_path, allow_pickle=True).item()
         
+        # Legacy saves predate the growable token axis
+        self.token_block = load_data["config"].get("token_block", 0)
         self.tensor = load_data["tensor"]
         self.attribution_voids = load_data["attribution_voids"]
         self.token_hesitations = load_data["token_hesitations"]
         self.recursive_collapses = load_data["recursive_collapses"]
         self.history = load_data["history"]
         self.config = load_data["config"]
+        self.saved_analysis = load_data.get("analysis")
         
         # Update dimensions
-        self.layers = self.tensor.shape[1]
-        self.tokens = self.tensor.shape[2]
-        self.depths = self.tensor.shape[3]
+        self.layers = self.storage.shape[1]
+        self.tokens = self.storage.shape[2]
+        self.depths = self.storage.shape[3]
+
+
+def reduce_residue_shards(shards: List[Union["SymbolicResidueTensor", bytes]],
+                          policies: Union[str, Dict[Union[int, str], str]] = "last") -> "SymbolicResidueTensor":
+    """
+    Tree-reduce residue tensor shards into one tensor.
+    
+    Adjacent shards are merged pairwise, level by level, keeping their order.
+    Shards may be tensors (the leftmost of each pair is merged into in place) or
+    bytes from `SymbolicResidueTensor.to_bytes`.
+    
+    Args:
+        shards: Shards in order (later shards win "last" ties)
+        policies: Merge policies (see `SymbolicResidueTensor.merge`)
+        
+    Returns:
+        Merged residue tensor
+    """
+    tensors = [SymbolicResidueTensor.from_bytes(shard) if isinstance(shard, (bytes, bytearray)) else shard
+               for shard in shards]
+    if not tensors:
+        raise ValueError("No residue shards to reduce")
+    while len(tensors) > 1:
+        merged = []
+        for left, right in zip(tensors[0::2], tensors[1::2]):
+            left.merge(right, policies)
+            merged.append(left)
+        if len(tensors) % 2:
+            merged.append(tensors[-1])
+        tensors = merged
+    return tensors[0]
+
+
+def _json_default(value: Any) -> Any:
+    """Convert numpy values (and anything else) for the JSON header."""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return repr(value)
 
 
 # Example usage
@@ -0,0 +1,57 @@
+"""Error handling of the AsyncResidueRecorder drain task."""
+
+import asyncio
+
+import pytest
+
+from recorders import AsyncResidueRecorder
+from tensor import SymbolicResidueTensor
+
+CONFIG = {"layers": 4, "tokens": 16, "depths": 3, "token_block": 0, "current_step": 0}
+
+
+def test_bad_event_keeps_draining():
+    residue_tensor = SymbolicResidueTensor(dict(CONFIG))
+
+    async def run():
+        recorder = AsyncResidueRecorder(residue_tensor, batch_size=8)
+        await recorder.start()
+        for position in range(5):
+            await recorder.record_attribution_void(1, position, 0, 0.5)
+        await recorder.record_attribution_void("not a layer", 0, 0, 0.5)
+        for position in range(5, 10):
+            await recorder.record_attribution_void(1, position, 0, 0.5)
+
+        with pytest.raises(ValueError):
+            await asyncio.wait_for(recorder.join(), 5)
+        assert len(residue_tensor.events["attribution_void"]) == 10
+
+        # The error is raised once; later batches are still applied
+        for position in range(10, 16):
+            await recorder.record_attribution_void(2, position, 1, 0.5)
+        await asyncio.wait_for(recorder.join(), 5)
+        assert len(residue_tensor.events["attribution_void"]) == 16
+        assert "error" not in await recorder.snapshot()
+        await asyncio.wait_for(recorder.close(), 5)
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize("method", ["snapshot", "close"])
+def test_error_surfaces_from(method):
+    residue_tensor = SymbolicResidueTensor(dict(CONFIG))
+
+    async def run():
+        recorder = AsyncResidueRecorder(residue_tensor)
+        await recorder.start()
+        await recorder.record_recursive_collapse(1, 0.2, 0.5, 0.9, [0, "x"])
+        await recorder.record_attribution_void(1, 2, 0, 0.5)
+        await asyncio.wait_for(recorder._queue.join(), 5)
+
+        with pytest.raises(ValueError):
+            await asyncio.wait_for(getattr(recorder, method)(), 5)
+        assert len(residue_tensor.events["attribution_void"]) == 1
+        await asyncio.wait_for(recorder.close(), 5)
+        assert recorder._drainer is None
+
+    asyncio.run(run())
@@ -0,0 +1,153 @@
+"""Stress tests of ConcurrentRecorder against single-threaded recording."""
+
+import threading
+
+import numpy as np
+import pytest
+
+from recorders import ConcurrentRecorder
+from tensor import ResidueMarginals, SymbolicResidueTensor
+
+THREADS = 8
+STEPS = 300
+CONFIG = {"layers": THREADS, "tokens": 8 * THREADS, "depths": 4, "token_block": 0, "current_step": -1}
+
+
+def _events(thread: int):
+    """Events of one thread, as (kind, step, args) in recording order.
+
+    Each thread owns layer/circuit `thread` and tokens [8 * thread, 8 * thread + 8),
+    so threads never write the same cell and the result does not depend on how
+    their batches interleave.
+    """
+    rng = np.random.default_rng(thread)
+    tokens = 8 * thread
+    metadata = {"thread": thread}
+    for step in range(STEPS):
+        yield "void", step, (thread, tokens + int(rng.integers(8)), int(rng.integers(4)), float(rng.random()),
+                             metadata if step % 3 == 0 else None)
+        yield "hesitation", step, (tokens + int(rng.integers(8)), float(rng.random()), float(rng.random()),
+                                   float(rng.random()), int(rng.integers(4)), None)
+        if step % 10 == 0:
+            yield "collapse", step, (int(rng.integers(4)), 0.3, 0.7, float(rng.random()), [thread], metadata)
+
+
+def _record(recorder, kind, step, args):
+    if kind == "void":
+        recorder.record_attribution_void(*args, step=step)
+    elif kind == "hesitation":
+        recorder.record_token_hesitation(*args, step=step)
+    else:
+        recorder.record_recursive_collapse(*args, step=step)
+
+
+def _reference() -> SymbolicResidueTensor:
+    residue_tensor = SymbolicResidueTensor(dict(CONFIG))
+    methods = {"void": residue_tensor.record_attribution_void,
+               "hesitation": residue_tensor.record_token_hesitation,
+               "collapse": residue_tensor.record_recursive_collapse}
+    for thread in range(THREADS):
+        for kind, step, args in _events(thread):
+            residue_tensor.config["current_step"] = step
+            methods[kind](*args)
+    return residue_tensor
+
+
+def _sorted(records: np.ndarray) -> np.ndarray:
+    """Event rows as a float table in sorted order."""
+    # Circuit offsets and metadata ids depend on the order batches were applied
+    names = [name for name in records.dtype.names if name not in ("circuit_offset", "metadata")]
+    table = np.hstack([records[name].reshape(len(records), -1).astype(np.float64) for name in names])
+    return table[np.lexsort(table.T[::-1])]
+
+
+@pytest.mark.parametrize("batch_size", [1, 16, 256])
+def test_threaded_recording_matches_single_thread(batch_size):
+    residue_tensor = SymbolicResidueTensor(dict(CONFIG))
+    recorder = ConcurrentRecorder(residue_tensor, batch_size=batch_size)
+    barrier = threading.Barrier(THREADS)
+
+    def worker(thread: int) -> None:
+        barrier.wait()
+        for kind, step, args in _events(thread):
+            _record(recorder, kind, step, args)
+
+    threads = [threading.Thread(target=worker, args=(thread,)) for thread in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    recorder.flush()
+
+    reference = _reference()
+    for kind in reference.events:
+        assert len(residue_tensor.events[kind]) == len(reference.events[kind])
+        np.testing.assert_array_equal(_sorted(residue_tensor.events[kind].records),
+                                      _sorted(reference.events[kind].records))
+
+    np.testing.assert_allclose(residue_tensor.tensor.sum(axis=(1, 2, 3)), reference.tensor.sum(axis=(1, 2, 3)))
+    np.testing.assert_allclose(residue_tensor.tensor, reference.tensor)
+
+    expected = ResidueMarginals.from_storage(reference.storage)
+    for name in ("layer", "token", "depth", "layer_token", "token_depth", "layer_depth", "total", "cross"):
+        np.testing.assert_allclose(getattr(residue_tensor.marginals, name), getattr(expected, name), atol=1e-9)
+    assert residue_tensor.marginals.nonzero == expected.nonzero
+
+    # Flushes pass steps as timestamps and leave the driver's step alone
+    assert residue_tensor.config["current_step"] == CONFIG["current_step"]
+
+
+def test_flush_does_not_revert_driver_step():
+    residue_tensor = SymbolicResidueTensor(dict(CONFIG))
+    recorder = ConcurrentRecorder(residue_tensor, batch_size=1000)
+
+    class DriverLog:
+        """Event log that advances the step mid-flush, as a driving thread would."""
+
+        def __init__(self):
+            self.steps = []
+
+        def append(self, kind, step, mode, metadata, **columns):
+            self.steps.append(step)
+            residue_tensor.config["current_step"] = step + 1
+
+    event_log = DriverLog()
+    residue_tensor.attach_log(event_log)
+    residue_tensor.config["current_step"] = 100
+    for kind, step, args in _events(0):
+        _record(recorder, kind, step, args)
+    recorder.flush()
+
+    # Every logged batch sees the driver's step, and its last update survives
+    assert event_log.steps == list(range(100, 100 + len(event_log.steps)))
+    assert residue_tensor.config["current_step"] == 100 + len(event_log.steps)
+
+
+def test_failed_batch_is_not_replayed():
+    residue_tensor = SymbolicResidueTensor(dict(CONFIG))
+    recorder = ConcurrentRecorder(residue_tensor, batch_size=1000)
+
+    class FailingLog:
+        """Event log whose storage fails after the events were recorded."""
+
+        def append(self, kind, step, mode, metadata, **columns):
+            raise OSError("log device full")
+
+    residue_tensor.attach_log(FailingLog())
+    for position in range(10):
+        recorder.record_attribution_void(1, position, 0, 0.5, step=position)
+    with pytest.raises(OSError):
+        recorder.flush()
+    assert len(residue_tensor.events["attribution_void"]) == 10
+
+
+def test_invalid_events_are_skipped():
+    residue_tensor = SymbolicResidueTensor(dict(CONFIG))
+    recorder = ConcurrentRecorder(residue_tensor, batch_size=1000)
+    for position in range(10):
+        recorder.record_attribution_void("not a layer" if position == 4 else 1, position, 0, 0.5, step=position)
+    with pytest.raises(ValueError):
+        recorder.flush()
+    records = residue_tensor.events["attribution_void"].records
+    assert records["token_position"].tolist() == [0, 1, 2, 3, 5, 6, 7, 8, 9]
+    assert residue_tensor.tensor[0].sum() == pytest.approx(4.5)
@@ -0,0 +1,30 @@
+"""Startup budget: importing the core modules must stay fast and NumPy-only."""
+
+import json
+import os
+import subprocess
+import sys
+
+# Generous against the ~0.02 s measured locally, so only real regressions fail
+IMPORT_BUDGET = 1.0
+HEAVY_MODULES = ("torch", "matplotlib", "scipy")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, sys, time
+import numpy  # Baseline dependency, not counted against the budget
+start = time.perf_counter()
+import delta_p, tensor
+elapsed = time.perf_counter() - start
+print(json.dumps({"elapsed": elapsed, "loaded": [m for m in %r if m in sys.modules]}))
+"""
+
+
+def test_import_budget_and_lazy_dependencies():
+    result = subprocess.run([sys.executable, "-c", PROBE % (HEAVY_MODULES,)], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+
+    assert report["loaded"] == [], f"Heavy modules imported at startup: {report['loaded']}"
+    assert report["elapsed"] < IMPORT_BUDGET, f"Import took {report['elapsed']:.3f} s"
@@ -0,0 +1,84 @@
+"""Persistence and crash recovery of the ResidueIndex format."""
+
+import os
+
+import numpy as np
+import pytest
+
+from residue_index import ResidueIndex
+
+DIM = 7
+
+
+def _vectors(n: int, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).standard_normal((n, DIM))
+
+
+def _fill(directory: str, batches=(5, 3, 1, 1, 8, 2)) -> np.ndarray:
+    index = ResidueIndex(directory, dim=DIM, hash_bits=4)
+    vectors = []
+    for seed, n in enumerate(batches):
+        batch = _vectors(n, seed)
+        index.add(batch, [{"run": len(index) + i} for i in range(n)])
+        vectors.append(batch)
+    return np.vstack(vectors)
+
+
+def test_reopen_search_and_keys(tmp_path):
+    vectors = _fill(str(tmp_path))
+    index = ResidueIndex(str(tmp_path))
+    assert len(index) == len(vectors)
+    assert index.hash_bits == 4
+    np.testing.assert_allclose(index.vectors, index.normalize(vectors.astype(np.float32)), atol=1e-6)
+
+    # Segments are merged like a binary counter and cover every row once
+    sizes = [int(offsets[-1]) for _, _, offsets in index.segments]
+    assert sum(sizes) == len(vectors) and len(sizes) <= int(np.log2(len(vectors))) + 1
+    rows = np.concatenate([index.segment(i)[0] for i in range(len(index.segments))])
+    assert sorted(rows.tolist()) == list(range(len(vectors)))
+
+    for approximate in (False, True):
+        found, similarities = index.search(vectors, k=1, approximate=approximate, probes=index.n_cells)
+        assert found[:, 0].tolist() == list(range(len(vectors)))
+        np.testing.assert_allclose(similarities[:, 0], 1.0, atol=1e-5)
+    assert index.key(3) == {"run": 3}
+    assert index.key(-1) == {"run": len(vectors) - 1}
+    assert index.nearest(vectors[5], k=1)[0]["key"] == {"run": 5}
+    with pytest.raises(IndexError):
+        index.key(len(vectors))
+
+
+def test_interrupted_add_is_discarded(tmp_path):
+    vectors = _fill(str(tmp_path))
+    index = ResidueIndex(str(tmp_path))
+
+    def crash():
+        raise OSError("crashed before the commit point")
+
+    # An add (and merge) interrupted before its header is written leaves rows, keys and a segment behind
+    index._write_header = crash
+    with pytest.raises(OSError):
+        index.add(_vectors(7, seed=9), [{"run": "lost"}] * 7)
+
+    index = ResidueIndex(str(tmp_path))
+    assert len(index) == len(vectors)
+    assert os.path.getsize(os.path.join(tmp_path, "vectors.f32")) == len(vectors) * DIM * 4
+    committed = {f"segment-{segment_id}{extension}" for _, segment_id, _ in index.segments
+                 for extension in (".i64", ".f32")}
+    assert {name for name in os.listdir(tmp_path) if name.startswith("segment-")} == committed
+
+    index.add(_vectors(2, seed=10), [{"run": "new"}] * 2)
+    index = ResidueIndex(str(tmp_path))
+    assert len(index) == len(vectors) + 2
+    assert index.key(len(vectors) - 1) == {"run": len(vectors) - 1}
+    assert index.key(len(vectors)) == {"run": "new"}
+    found, _ = index.search(_vectors(2, seed=10), k=1, approximate=True, probes=index.n_cells)
+    assert found[:, 0].tolist() == [len(vectors), len(vectors) + 1]
+
+
+def test_dimension_is_checked(tmp_path):
+    _fill(str(tmp_path), batches=(2,))
+    with pytest.raises(ValueError):
+        ResidueIndex(str(tmp_path), dim=DIM + 1)
+    with pytest.raises(ValueError):
+        ResidueIndex(str(tmp_path / "missing"))
@@ -0,0 +1,94 @@
+"""Replay and compaction of the ResidueLog event format."""
+
+import numpy as np
+import pytest
+
+from residue_log import ResidueLog
+from tensor import SymbolicResidueTensor
+
+CONFIG = {"layers": 6, "tokens": 16, "depths": 4, "current_step": 0}
+
+
+def _record(residue_tensor: SymbolicResidueTensor, steps: range, seed: int = 0) -> None:
+    rng = np.random.default_rng(seed)
+    for step in steps:
+        residue_tensor.config["current_step"] = step
+        residue_tensor.record_attribution_voids(rng.integers(0, 6, 4), rng.integers(0, 40, 4), rng.integers(0, 4, 4),
+                                                rng.random(4), metadata={"step": step}, mode="add")
+        residue_tensor.record_token_hesitation(int(rng.integers(40)), 0.2, 0.1, float(rng.random()),
+                                               int(rng.integers(4)))
+        if step % 5 == 0:
+            residue_tensor.record_recursive_collapses([1, 2], [0.3, 0.2], [0.7, 0.7], rng.random(2),
+                                                      [[0, 3], [5]], mode="max")
+
+
+def _assert_same(residue_tensor: SymbolicResidueTensor, expected: SymbolicResidueTensor) -> None:
+    np.testing.assert_allclose(residue_tensor.tensor, expected.tensor)
+    for name in expected.events:
+        np.testing.assert_array_equal(residue_tensor.events[name].records, expected.events[name].records)
+    for view in ("attribution_voids", "token_hesitations", "recursive_collapses"):
+        assert [repr(c) for c in getattr(residue_tensor, view)] == [repr(c) for c in getattr(expected, view)]
+
+
+def test_replay_matches_live_tensor(tmp_path):
+    log = ResidueLog(str(tmp_path), CONFIG, segment_bytes=4096)
+    residue_tensor = SymbolicResidueTensor(dict(CONFIG))
+    residue_tensor.attach_log(log)
+    _record(residue_tensor, range(60))
+    log.close()
+    assert len(log.segments()) > 1
+
+    _assert_same(ResidueLog(str(tmp_path)).replay(), residue_tensor)
+
+
+def test_replay_until_step(tmp_path):
+    log = ResidueLog(str(tmp_path), CONFIG)
+    residue_tensor = SymbolicResidueTensor(dict(CONFIG))
+    residue_tensor.attach_log(log)
+    _record(residue_tensor, range(30))
+    log.close()
+
+    expected = SymbolicResidueTensor(dict(CONFIG))
+    _record(expected, range(21))
+    replayed = log.replay(until_step=20)
+    _assert_same(replayed, expected)
+    assert replayed.config["current_step"] == 20
+
+
+def test_compact_then_restart(tmp_path):
+    log = ResidueLog(str(tmp_path), CONFIG, segment_bytes=4096)
+    residue_tensor = SymbolicResidueTensor(dict(CONFIG))
+    residue_tensor.attach_log(log)
+    _record(residue_tensor, range(40))
+    compacted = log.compact()
+    assert compacted > 0 and log.segments() == []
+
+    # A restarted writer appends after the snapshot
+    log = ResidueLog(str(tmp_path))
+    residue_tensor.attach_log(log)
+    _record(residue_tensor, range(40, 50), seed=1)
+    log.sync()
+
+    _assert_same(log.replay(), residue_tensor)
+    with pytest.raises(ValueError):
+        log.replay(until_step=10)
+
+
+def test_torn_tail_is_ignored(tmp_path):
+    log = ResidueLog(str(tmp_path), CONFIG)
+    residue_tensor = SymbolicResidueTensor(dict(CONFIG))
+    residue_tensor.attach_log(log)
+    _record(residue_tensor, range(10))
+    log.close()
+    expected = log.replay()
+
+    # A crash mid-append leaves a partial entry at the end of the segment
+    residue_tensor.record_attribution_void(1, 2, 0, 0.5)
+    log.sync()
+    path = log._segment_path(log.segments()[-1])
+    with open(path, "rb") as f:
+        data = f.read()
+    with open(path, "wb") as f:
+        f.write(data[:-5])
+
+    _assert_same(ResidueLog(str(tmp_path)).replay(), expected)
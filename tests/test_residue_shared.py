@@ -0,0 +1,66 @@
+"""Multi-process writes into a SharedResidueBuffer."""
+
+import multiprocessing
+
+import numpy as np
+import pytest
+
+from residue_shared import SharedResidueBuffer
+
+WRITERS = 4
+ADDS = 2000
+CONFIG = {"layers": 2, "tokens": 4 * WRITERS, "depths": 2}
+
+
+def _adding_writer(spec, slot, locks):
+    """Add 1.0 to a cell owned by writer 0 and to one of this writer's own cells."""
+    buffer = SharedResidueBuffer.attach(spec)
+    low = 4 * slot
+    residue_tensor = buffer.writer(slot, region={"tokens": (low, low + 3)}, locks=locks)
+    for _ in range(ADDS):
+        residue_tensor.record_attribution_voids([0, 1], [0, low + 1], [0, 1], [1.0, 1.0], mode="add")
+    buffer.close()
+
+
+def test_overlapping_add_keeps_exact_totals():
+    buffer = SharedResidueBuffer.create(CONFIG, WRITERS, event_capacity=2 * ADDS)
+    try:
+        locks = [multiprocessing.Lock() for _ in range(WRITERS)]
+        processes = [multiprocessing.Process(target=_adding_writer, args=(buffer.spec, slot, locks))
+                     for slot in range(WRITERS)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        assert all(process.exitcode == 0 for process in processes)
+
+        reader = buffer.reader()
+        tensor = reader.tensor
+        # Overlapping adds hold writer 0's lock too, so none of them is lost
+        assert tensor[0, 0, 0, 0] == WRITERS * ADDS
+        for slot in range(WRITERS):
+            assert tensor[0, 1, 4 * slot + 1, 1] == ADDS
+        assert len(reader.attribution_voids) == 2 * WRITERS * ADDS
+        np.testing.assert_allclose(reader.marginals.total, [2 * WRITERS * ADDS, 0, 0])
+        reader = None
+    finally:
+        buffer.close()
+        buffer.unlink()
+
+
+def test_write_outside_region_without_locks_is_rejected():
+    buffer = SharedResidueBuffer.create(CONFIG, WRITERS, event_capacity=8)
+    try:
+        residue_tensor = buffer.writer(1, region={"tokens": (4, 7)})
+        residue_tensor.record_attribution_void(0, 5, 0, 1.0)
+        with pytest.raises(ValueError):
+            residue_tensor.record_attribution_void(0, 0, 0, 1.0)
+        assert buffer.arrays["tensor"].sum() == 1.0
+        assert len(residue_tensor.events["attribution_void"]) == 1
+
+        with pytest.raises(ValueError):
+            buffer.writer(0, locks=[multiprocessing.Lock()])
+        residue_tensor = None
+    finally:
+        buffer.close()
+        buffer.unlink()
@@ -0,0 +1,138 @@
+"""Round trips of SymbolicResidueTensor through its directory save and wire formats."""
+
+import numpy as np
+import pytest
+
+from tensor import ResidueMarginals, SparseResidueStorage, SymbolicResidueTensor
+
+CONFIG = {"layers": 6, "tokens": 16, "depths": 4, "current_step": 0}
+MARGINALS = ("layer", "token", "depth", "layer_token", "token_depth", "layer_depth", "total", "cross")
+
+
+def _record(residue_tensor: SymbolicResidueTensor, seed: int = 0, steps: int = 40) -> SymbolicResidueTensor:
+    """Record a mix of scalar and batch events, one step at a time."""
+    rng = np.random.default_rng(seed)
+    for step in range(steps):
+        residue_tensor.config["current_step"] = step
+        residue_tensor.record_attribution_void(int(rng.integers(6)), int(rng.integers(40)), int(rng.integers(4)),
+                                               float(rng.random()), metadata={"step": step})
+        residue_tensor.record_token_hesitations(rng.integers(0, 40, 3), rng.random(3), rng.random(3),
+                                                rng.random(3), rng.integers(0, 4, 3), mode="max")
+        if step % 7 == 0:
+            residue_tensor.record_recursive_collapse(int(rng.integers(4)), 0.3, 0.7, float(rng.random()),
+                                                     [int(c) for c in rng.integers(0, 6, 2)])
+    return residue_tensor
+
+
+def _assert_same(residue_tensor: SymbolicResidueTensor, expected: SymbolicResidueTensor) -> None:
+    np.testing.assert_allclose(residue_tensor.tensor, expected.tensor)
+    for name in expected.events:
+        np.testing.assert_array_equal(residue_tensor.events[name].records, expected.events[name].records)
+    # Components also carry the metadata and affected circuits
+    for view in ("attribution_voids", "token_hesitations", "recursive_collapses"):
+        assert [repr(c) for c in getattr(residue_tensor, view)] == [repr(c) for c in getattr(expected, view)]
+    for name in MARGINALS:
+        np.testing.assert_allclose(getattr(residue_tensor.marginals, name), getattr(expected.marginals, name),
+                                   atol=1e-9)
+    assert residue_tensor.marginals.nonzero == expected.marginals.nonzero
+
+
+@pytest.mark.parametrize("storage", ["dense", "sparse"])
+@pytest.mark.parametrize("mmap", [False, True])
+def test_save_load(tmp_path, storage, mmap):
+    residue_tensor = _record(SymbolicResidueTensor(dict(CONFIG, storage=storage)))
+    residue_tensor.save(str(tmp_path / "run"))
+
+    loaded = SymbolicResidueTensor()
+    loaded.load(str(tmp_path / "run"), mmap=mmap)
+    _assert_same(loaded, residue_tensor)
+    assert loaded.saved_analysis["primary_signature"] == residue_tensor.analyze_residue_pattern()["primary_signature"]
+
+    # Marginals rebuilt from the cells match the saved ones
+    rebuilt = ResidueMarginals.from_storage(loaded.storage, growable=True)
+    for name in MARGINALS:
+        np.testing.assert_allclose(getattr(rebuilt, name), getattr(loaded.marginals, name), atol=1e-9)
+
+
+def test_sparse_growable_save_load_record(tmp_path):
+    residue_tensor = _record(SymbolicResidueTensor(dict(CONFIG, storage="sparse", token_block=8)), steps=20)
+    residue_tensor.save(str(tmp_path / "run"))
+
+    # The loading instance's own settings do not override the saved ones
+    loaded = SymbolicResidueTensor({"token_block": 0})
+    loaded.load(str(tmp_path / "run"), mmap=True)
+    assert loaded.token_block == 8
+    assert isinstance(loaded.storage, SparseResidueStorage)
+
+    # Recording after the load keeps growing the token axis like the original
+    for residue in (residue_tensor, loaded):
+        _record(residue, seed=1, steps=10)
+        residue.record_attribution_void(2, 500, 1, 0.25)
+    assert loaded.tokens == residue_tensor.tokens >= 501
+    _assert_same(loaded, residue_tensor)
+    assert loaded.tensor[2, :, 500].any()
+
+
+def test_partial_load(tmp_path):
+    residue_tensor = _record(SymbolicResidueTensor(dict(CONFIG)))
+    residue_tensor.save(str(tmp_path / "run"))
+
+    loaded = SymbolicResidueTensor()
+    loaded.load(str(tmp_path / "run"), residue_classes=["attribution_void"], layers=(2, 4))
+    expected = np.zeros_like(residue_tensor.tensor)
+    expected[0, 2:5] = residue_tensor.tensor[0, 2:5]
+    np.testing.assert_allclose(loaded.tensor, expected)
+    assert len(loaded.token_hesitations) == 0
+    assert all(2 <= layer <= 4 for layer in loaded.events["attribution_void"].records["layer"])
+    assert loaded.saved_analysis is None
+
+
+@pytest.mark.parametrize("storage", ["dense", "sparse"])
+@pytest.mark.parametrize("compress", [False, True])
+def test_wire_round_trip(storage, compress):
+    residue_tensor = _record(SymbolicResidueTensor(dict(CONFIG, storage=storage)))
+    received = SymbolicResidueTensor.from_bytes(residue_tensor.to_bytes(compress=compress))
+    _assert_same(received, residue_tensor)
+    assert received.token_block == residue_tensor.token_block
+    assert received.storage.kind == storage
+
+    with pytest.raises(ValueError):
+        SymbolicResidueTensor.from_bytes(b"not a shard")
+
+
+@pytest.mark.parametrize("policy, expected", [("sum", 0.7), ("max", 0.5), ("last", 0.2)])
+def test_merge_policies(policy, expected):
+    first = SymbolicResidueTensor(dict(CONFIG, current_step=1))
+    first.record_attribution_void(1, 2, 0, 0.5)
+    first.record_recursive_collapse(1, 0.3, 0.7, 0.4, [3])
+    second = SymbolicResidueTensor(dict(CONFIG, current_step=3))
+    second.record_attribution_void(1, 2, 0, 0.2)
+    second.record_attribution_void(4, 30, 2, 0.1)
+    second.record_recursive_collapse(1, 0.3, 0.7, 0.1, [3])
+
+    merged = SymbolicResidueTensor.from_bytes(first.to_bytes())
+    merged.merge(SymbolicResidueTensor.from_bytes(second.to_bytes()), policy)
+    tensor = merged.tensor
+    assert tensor[0, 1, 2, 0] == pytest.approx(expected)
+    assert tensor[0, 4, 30, 2] == pytest.approx(0.1)
+    # Collapses of both shards cover the merged token extent
+    collapse = {"sum": 0.5, "max": 0.4, "last": 0.1}[policy]
+    np.testing.assert_allclose(tensor[2, 3, :merged.marginals.extent, 1], collapse)
+    assert len(merged.attribution_voids) == 3
+    assert merged.config["current_step"] == 3
+
+    rebuilt = ResidueMarginals.from_storage(merged.storage, growable=True)
+    for name in MARGINALS:
+        np.testing.assert_allclose(getattr(merged.marginals, name), getattr(rebuilt, name), atol=1e-12)
+
+
+def test_merge_last_prefers_later_step():
+    first = SymbolicResidueTensor(dict(CONFIG, current_step=5))
+    first.record_attribution_void(1, 2, 0, 0.5)
+    second = SymbolicResidueTensor(dict(CONFIG, current_step=3))
+    second.record_attribution_void(1, 2, 0, 0.2)
+    first.merge(second, {"attribution_void": "last"})
+    assert first.tensor[0, 1, 2, 0] == pytest.approx(0.5)
+
+    with pytest.raises(ValueError):
+        first.merge(second, "average")
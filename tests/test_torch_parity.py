@@ -0,0 +1,80 @@
+"""Parity of the torch backend with the NumPy path of the batch coherence APIs."""
+
+import numpy as np
+import pytest
+
+from delta_p import RecursiveCoherenceFunction
+
+torch = pytest.importorskip("torch")
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(0)
+
+
+def test_measure_coherence_batch(rng):
+    rcf = RecursiveCoherenceFunction()
+    phase_vectors = rng.normal(size=(6, 4, 3))
+    phase_vectors[0, 0] = 0.0  # Zero vector
+    coherence_motions = rng.normal(size=(6, 4, 3))
+    scalars = [rng.random((6, 4)) for _ in range(6)]
+    scalars[4][1, 2] = 0.0  # No capacity
+
+    expected = rcf.measure_coherence_batch(phase_vectors, coherence_motions, *scalars)
+    result = rcf.measure_coherence_batch(torch.from_numpy(phase_vectors), torch.from_numpy(coherence_motions),
+                                         *(torch.from_numpy(s) for s in scalars))
+
+    assert set(result) == set(expected)
+    for name, values in expected.items():
+        assert torch.is_tensor(result[name])
+        np.testing.assert_allclose(result[name].numpy(), values, rtol=0, atol=1e-12)
+
+
+def test_measure_coherence_batch_history(rng):
+    numpy_rcf, torch_rcf = RecursiveCoherenceFunction(), RecursiveCoherenceFunction()
+    inputs = [rng.normal(size=(3, 2, 4)), rng.normal(size=(3, 2, 4))] + [rng.random((3, 2)) for _ in range(6)]
+
+    numpy_rcf.measure_coherence_batch(*inputs, record_history=True)
+    torch_rcf.measure_coherence_batch(*(torch.from_numpy(x) for x in inputs), record_history=True)
+
+    np.testing.assert_allclose(torch_rcf.get_coherence_history(), numpy_rcf.get_coherence_history(), atol=1e-12)
+
+
+@pytest.mark.parametrize("block_size", [None, 3])
+def test_phase_alignment_matrix(rng, block_size):
+    rcf = RecursiveCoherenceFunction()
+    layers, targets = rng.normal(size=(7, 5)), rng.normal(size=(4, 5))
+    layers[2] = 0.0
+    targets[1] = 0.0
+
+    expected = rcf.phase_alignment_matrix(layers, targets, block_size=block_size)
+    result = rcf.phase_alignment_matrix(torch.from_numpy(layers), torch.from_numpy(targets), block_size=block_size)
+
+    assert torch.is_tensor(result)
+    np.testing.assert_allclose(result.numpy(), expected, rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize("weighted", [False, True])
+def test_symbolic_residue_matrix(rng, weighted):
+    rcf = RecursiveCoherenceFunction()
+    deviations, alignments = rng.random(6), rng.random((6, 9))
+    weights = rng.random(6) if weighted else None
+
+    expected = rcf.symbolic_residue_matrix(deviations, alignments, weights)
+    result = rcf.symbolic_residue_matrix(torch.from_numpy(deviations), torch.from_numpy(alignments),
+                                         None if weights is None else torch.from_numpy(weights))
+
+    assert torch.is_tensor(result)
+    np.testing.assert_allclose(result.numpy(), expected, rtol=0, atol=1e-12)
+
+
+def test_explicit_torch_backend_from_numpy_inputs(rng):
+    rcf = RecursiveCoherenceFunction({"backend": "torch"})
+    layers, targets = rng.normal(size=(3, 4)), rng.normal(size=(2, 4))
+
+    result = rcf.phase_alignment_matrix(layers, targets)
+
+    assert torch.is_tensor(result)
+    np.testing.assert_allclose(result.double().numpy(),
+                               RecursiveCoherenceFunction().phase_alignment_matrix(layers, targets), atol=1e-6)